@@ -4,9 +4,9 @@ import type { AlertRecord } from '../services/alertsService';
 
 const DEFAULT_PAGE_SIZE = 20;
 
-export const useAlerts = (initialPage = 1, initialPageSize = DEFAULT_PAGE_SIZE) => {
+export const useAlerts = (initialPageSize = DEFAULT_PAGE_SIZE) => {
     const [alerts, setAlerts] = useState<AlertRecord[]>([]);
-    const [page, setPage] = useState(initialPage);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const [pageSize] = useState(initialPageSize);
     const [total, setTotal] = useState(0);
     const [loading, setLoading] = useState(true);
@@ -14,7 +14,7 @@ export const useAlerts = (initialPage = 1, initialPageSize = DEFAULT_PAGE_SIZE)
     const [error, setError] = useState<string | null>(null);
     const controllerRef = useRef<AbortController | null>(null);
 
-    const loadPage = useCallback((targetPage: number, append = false) => {
+    const loadPage = useCallback((cursor: string | null, append = false) => {
         controllerRef.current?.abort();
         const controller = new AbortController();
         controllerRef.current = controller;
@@ -25,11 +25,11 @@ export const useAlerts = (initialPage = 1, initialPageSize = DEFAULT_PAGE_SIZE)
             setLoading(true);
         }
 
-        fetchAlerts(targetPage, pageSize, controller.signal)
-            .then(({ alerts: data, total: count }) => {
+        fetchAlerts(cursor, pageSize, controller.signal)
+            .then(({ alerts: data, total: count, next_cursor }) => {
                 setTotal(count);
                 setAlerts(prev => (append ? [...prev, ...data] : data));
-                setPage(targetPage);
+                setNextCursor(next_cursor);
             })
             .catch(err => {
                 if (err instanceof DOMException && err.name === 'AbortError') {
@@ -51,21 +51,20 @@ export const useAlerts = (initialPage = 1, initialPageSize = DEFAULT_PAGE_SIZE)
     }, [pageSize]);
 
     useEffect(() => {
-        loadPage(initialPage, false);
+        loadPage(null, false);
         return () => controllerRef.current?.abort();
-    }, [initialPage, loadPage]);
+    }, [loadPage]);
 
     const refresh = useCallback(() => {
-        loadPage(initialPage, false);
-    }, [initialPage, loadPage]);
+        loadPage(null, false);
+    }, [loadPage]);
 
-    const hasMore = alerts.length < total;
+    const hasMore = nextCursor !== null;
 
     const loadMore = useCallback(() => {
-        if (loading || loadingMore || !hasMore) return;
-        const nextPage = page + 1;
-        loadPage(nextPage, true);
-    }, [hasMore, loadPage, loading, loadingMore, page]);
+        if (loading || loadingMore || !nextCursor) return;
+        loadPage(nextCursor, true);
+    }, [loadPage, loading, loadingMore, nextCursor]);
 
     return {
         alerts,
@@ -73,7 +72,6 @@ export const useAlerts = (initialPage = 1, initialPageSize = DEFAULT_PAGE_SIZE)
         loadingMore,
         error,
         total,
-        page,
         pageSize,
         hasMore,
         refresh,
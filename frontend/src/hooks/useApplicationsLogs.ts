@@ -66,10 +66,11 @@ export const useApplicationsLogs = () => {
         return Array.from(known);
     }, [logFiles, selectedApp?.log_paths]);
 
-    const appendLiveLine = useCallback((entry: LogEvent) => {
-        if (!entry.message) return;
+    const appendLiveLines = useCallback((entries: LogEvent[]) => {
+        const visible = entries.filter(entry => entry.message);
+        if (visible.length === 0) return;
         setLiveLines(prev => {
-            const next = [...prev, entry];
+            const next = [...prev, ...visible];
             if (next.length > 500) {
                 return next.slice(-500);
             }
@@ -78,6 +79,15 @@ export const useApplicationsLogs = () => {
     }, []);
 
     const normalizeLiveEvent = useCallback((payload: unknown): LogEvent | null => {
+        if (payload && typeof payload === 'object' && (payload as any).type === 'dropped') {
+            const count = Number((payload as any).count) || 0;
+            return {
+                path: typeof (payload as any).path === 'string' ? (payload as any).path : '',
+                message: `${count} line${count === 1 ? '' : 's'} dropped, the stream is faster than this view`,
+                level: 'warn',
+                type: 'dropped',
+            };
+        }
         if (payload && typeof payload === 'object' && typeof (payload as any).message === 'string') {
             return {
                 path: typeof (payload as any).path === 'string' ? (payload as any).path : '',
@@ -229,10 +239,12 @@ export const useApplicationsLogs = () => {
                         parsed = payload;
                     }
                 }
-                const normalized = normalizeLiveEvent(parsed);
-                if (normalized) {
-                    appendLiveLine(normalized);
-                }
+                // The server sends frames with a batch of events.
+                const events = Array.isArray(parsed) ? parsed : [parsed];
+                const normalized = events
+                    .map(normalizeLiveEvent)
+                    .filter((entry): entry is LogEvent => entry !== null);
+                appendLiveLines(normalized);
             };
 
             if (typeof event.data === 'string') {
@@ -259,7 +271,7 @@ export const useApplicationsLogs = () => {
         return () => {
             socket.close();
         };
-    }, [appendLiveLine, liveEnabled, liveLevelFilter, liveSearchQuery, selectedApp?.id, selectedFile]);
+    }, [appendLiveLines, liveEnabled, liveLevelFilter, liveSearchQuery, normalizeLiveEvent, selectedApp?.id, selectedFile]);
 
     useEffect(() => {
         if (!liveContainerRef.current) return;
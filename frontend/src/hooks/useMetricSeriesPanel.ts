@@ -1,9 +1,9 @@
 import { useCallback, useEffect, useMemo, useRef, useState } from 'react';
 import { getMetricSeries } from '../services/api';
+import { subscribeMetricStream } from '../services/metricsStream';
 import type { MetricSample } from '../types';
 
 const DEFAULT_LOOKBACK_MS = 5 * 60 * 1000;
-const POLL_INTERVAL_MS = 5000;
 
 const createLocalDatetimeValue = (date: Date) => {
     const pad = (value: number) => value.toString().padStart(2, '0');
@@ -42,66 +42,40 @@ export const useMetricSeriesPanel = ({ hostname, metric }: UseMetricSeriesPanelA
     const [liveStart, setLiveStart] = useState(manualStart);
 
     const latestTimestampRef = useRef<string | null>(null);
-    const intervalRef = useRef<number | null>(null);
+    const unsubscribeRef = useRef<(() => void) | null>(null);
     const initialLiveRunRef = useRef(false);
     const [isLiveState, setIsLiveState] = useState(false);
 
     const stopLive = useCallback(() => {
-        if (intervalRef.current) {
-            window.clearInterval(intervalRef.current);
-            intervalRef.current = null;
+        if (unsubscribeRef.current) {
+            unsubscribeRef.current();
+            unsubscribeRef.current = null;
         }
         setIsLiveState(false);
     }, []);
 
-    const fetchLiveTick = useCallback(async () => {
-        const host = hostname?.trim();
-        if (!host) {
+    const appendLiveSamples = useCallback((incoming: MetricSample[]) => {
+        const referenceTs = latestTimestampRef.current;
+        const filtered = referenceTs
+            ? incoming.filter(sample => sample.ts > referenceTs)
+            : incoming;
+
+        if (!filtered.length) {
             return;
         }
 
-        const fromTs = latestTimestampRef.current ?? undefined;
-        const toTs = new Date().toISOString();
-        try {
-            const data = await getMetricSeries({
-                metric,
-                host,
-                fromTs,
-                toTs,
-            });
-            if (!data.length) {
-                latestTimestampRef.current = fromTs ?? toTs;
-                return;
+        setSamples(prev => {
+            const seen = new Set(prev.map(sample => sample.ts));
+            const unique = filtered.filter(sample => !seen.has(sample.ts));
+            if (!unique.length) {
+                return prev;
             }
+            return sortSamples([...prev, ...unique]);
+        });
 
-            const ordered = sortSamples(data);
-            const newestTs = ordered.at(-1)?.ts ?? toTs;
-            const referenceTs = latestTimestampRef.current;
-            const filtered = referenceTs
-                ? ordered.filter(sample => sample.ts > referenceTs)
-                : ordered;
-
-            if (filtered.length === 0) {
-                latestTimestampRef.current = newestTs;
-                return;
-            }
-
-            setSamples(prev => {
-                const seen = new Set(prev.map(sample => sample.ts));
-                const unique = filtered.filter(sample => !seen.has(sample.ts));
-                if (!unique.length) {
-                    return prev;
-                }
-                return sortSamples([...prev, ...unique]);
-            });
-
-            latestTimestampRef.current = newestTs;
-            setLastLoadedAt(new Date());
-        } catch (err) {
-            console.error(`Error updating ${metric} live metrics`, err);
-            setError('Live metrics could not be updated.');
-        }
-    }, [hostname, metric]);
+        latestTimestampRef.current = sortSamples(filtered).at(-1)?.ts ?? referenceTs;
+        setLastLoadedAt(new Date());
+    }, []);
 
     const startLive = useCallback(async () => {
         const host = hostname?.trim();
@@ -130,16 +104,16 @@ export const useMetricSeriesPanel = ({ hostname, metric }: UseMetricSeriesPanelA
             setLastLoadedAt(new Date());
             setIsLiveState(true);
 
-            intervalRef.current = window.setInterval(() => {
-                fetchLiveTick();
-            }, POLL_INTERVAL_MS);
+            unsubscribeRef.current = subscribeMetricStream(metric, host, points => {
+                appendLiveSamples(points.map(point => ({ ts: point.ts, value: point.value })));
+            });
         } catch (err) {
             console.error(`Error starting live ${metric} metrics`, err);
             setError('Live metrics could not be loaded.');
         } finally {
             setLiveLoading(false);
         }
-    }, [fetchLiveTick, hostname, liveStart, stopLive, metric]);
+    }, [appendLiveSamples, hostname, liveStart, stopLive, metric]);
 
     const handleManualFetch = useCallback(async () => {
         const host = hostname?.trim();
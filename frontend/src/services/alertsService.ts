@@ -18,9 +18,16 @@ export interface AlertRecord {
 
 export interface AlertsResponse {
     alerts: AlertRecord[];
-    page: number;
     page_size: number;
     total: number;
+    next_cursor: string | null;
+}
+
+export interface AlertFilters {
+    host?: string;
+    metric?: string;
+    status?: string;
+    level?: string;
 }
 
 type AlertPayload = Partial<AlertRecord> & Record<string, unknown>;
@@ -82,17 +89,13 @@ const coerceAlertRecord = (raw: unknown, index: number): AlertRecord => {
     };
 };
 
-const normalizeAlertsResponse = (
-    body: unknown,
-    page: number,
-    pageSize: number
-): AlertsResponse => {
+const normalizeAlertsResponse = (body: unknown, pageSize: number): AlertsResponse => {
     if (!body) {
         return {
             alerts: fallbackAlerts,
-            page,
             page_size: pageSize,
             total: fallbackAlerts.length,
+            next_cursor: null,
         };
     }
 
@@ -119,16 +122,16 @@ const normalizeAlertsResponse = (
     }
 
     const alerts = rawAlerts.map(coerceAlertRecord);
-    const payload = typeof body === 'object' && body !== null ? (body as Record<string, unknown>) : {};
+    const root = typeof body === 'object' && body !== null ? (body as Record<string, unknown>) : {};
+    const payload =
+        root.pagination && typeof root.pagination === 'object'
+            ? { ...root, ...(root.pagination as Record<string, unknown>) }
+            : root;
     const total =
         (typeof payload.total === 'number' ? payload.total : undefined) ??
         (typeof payload.total_count === 'number' ? payload.total_count : undefined) ??
         (typeof payload.count === 'number' ? payload.count : undefined) ??
         alerts.length;
-    const responsePage =
-        (typeof payload.page === 'number' ? payload.page : undefined) ??
-        (typeof payload.current_page === 'number' ? payload.current_page : undefined) ??
-        page;
     const responsePageSize =
         (typeof payload.page_size === 'number' ? payload.page_size : undefined) ??
         (typeof payload.per_page === 'number' ? payload.per_page : undefined) ??
@@ -137,20 +140,28 @@ const normalizeAlertsResponse = (
 
     return {
         alerts,
-        page: responsePage,
         page_size: responsePageSize,
         total,
+        next_cursor: typeof payload.next_cursor === 'string' ? payload.next_cursor : null,
     };
 };
 
 export const fetchAlerts = async (
-    page = 1,
+    cursor: string | null = null,
     pageSize = 50,
-    signal?: AbortSignal
+    signal?: AbortSignal,
+    filters: AlertFilters = {}
 ): Promise<AlertsResponse> => {
     const url = new URL(`${getBaseUrl()}/alerts`);
-    url.searchParams.set('page', String(page));
     url.searchParams.set('page_size', String(pageSize));
+    if (cursor) {
+        url.searchParams.set('cursor', cursor);
+    }
+    for (const [key, value] of Object.entries(filters)) {
+        if (value) {
+            url.searchParams.set(key, value);
+        }
+    }
 
     const response = await fetch(url.toString(), {
         signal,
@@ -164,5 +175,5 @@ export const fetchAlerts = async (
     }
 
     const body = await response.json();
-    return normalizeAlertsResponse(body, page, pageSize);
+    return normalizeAlertsResponse(body, pageSize);
 };
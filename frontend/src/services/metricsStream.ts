@@ -0,0 +1,153 @@
+import { getBaseUrl } from './api';
+
+export interface MetricStreamPoint {
+    ts: string;
+    metric: string;
+    value: number;
+    host: string;
+}
+
+type MetricStreamListener = (points: MetricStreamPoint[]) => void;
+
+interface MetricStreamSubscription {
+    pattern: string;
+    host: string | null;
+    listener: MetricStreamListener;
+}
+
+const RECONNECT_DELAY_MS = 3000;
+
+const buildMetricsWsUrl = () => {
+    const wsUrl = new URL(getBaseUrl());
+    wsUrl.protocol = wsUrl.protocol === 'https:' ? 'wss:' : 'ws:';
+    wsUrl.pathname = '/ws/metrics';
+    return wsUrl.toString();
+};
+
+const subscriptionKey = (pattern: string, host: string | null) => `${host ?? '*'}|${pattern}`;
+
+const globToRegExp = (pattern: string) =>
+    new RegExp(
+        `^${pattern
+            .replace(/[.+^${}()|[\]\\]/g, '\\$&')
+            .replace(/\*/g, '.*')
+            .replace(/\?/g, '.')}$`
+    );
+
+/**
+ * Single shared connection to /ws/metrics.
+ *
+ * Hooks register listeners by metric pattern and host; the server-side
+ * subscription is reference counted so identical subscriptions share it.
+ */
+class MetricsStreamClient {
+    private socket: WebSocket | null = null;
+    private subscriptions = new Set<MetricStreamSubscription>();
+    private refCounts = new Map<string, number>();
+    private reconnectTimer: number | null = null;
+
+    subscribe(pattern: string, host: string | null, listener: MetricStreamListener): () => void {
+        const matcher = globToRegExp(pattern);
+        const filtered: MetricStreamSubscription = {
+            pattern,
+            host,
+            listener: points => {
+                const matching = points.filter(
+                    point => matcher.test(point.metric) && (!host || point.host === host)
+                );
+                if (matching.length) {
+                    listener(matching);
+                }
+            },
+        };
+
+        this.subscriptions.add(filtered);
+        const key = subscriptionKey(pattern, host);
+        const count = this.refCounts.get(key) ?? 0;
+        this.refCounts.set(key, count + 1);
+
+        if (count === 0) {
+            this.send({ action: 'subscribe', metrics: [pattern], host });
+        }
+        this.ensureConnected();
+
+        return () => {
+            this.subscriptions.delete(filtered);
+            const remaining = (this.refCounts.get(key) ?? 1) - 1;
+            if (remaining > 0) {
+                this.refCounts.set(key, remaining);
+                return;
+            }
+            this.refCounts.delete(key);
+            this.send({ action: 'unsubscribe', metrics: [pattern], host });
+            if (!this.refCounts.size) {
+                this.close();
+            }
+        };
+    }
+
+    private ensureConnected() {
+        if (this.socket || typeof window === 'undefined') {
+            return;
+        }
+
+        const socket = new WebSocket(buildMetricsWsUrl());
+        this.socket = socket;
+
+        socket.addEventListener('open', () => {
+            for (const key of this.refCounts.keys()) {
+                const [host, pattern] = key.split('|', 2);
+                this.send({ action: 'subscribe', metrics: [pattern], host: host === '*' ? null : host });
+            }
+        });
+
+        socket.addEventListener('message', event => {
+            try {
+                const payload = JSON.parse(event.data as string);
+                if (payload?.type !== 'points' || !Array.isArray(payload.points)) {
+                    return;
+                }
+                for (const subscription of this.subscriptions) {
+                    subscription.listener(payload.points as MetricStreamPoint[]);
+                }
+            } catch (err) {
+                console.error('Invalid metrics stream message', err);
+            }
+        });
+
+        socket.addEventListener('close', () => {
+            if (this.socket === socket) {
+                this.socket = null;
+            }
+            if (this.refCounts.size && this.reconnectTimer === null) {
+                this.reconnectTimer = window.setTimeout(() => {
+                    this.reconnectTimer = null;
+                    this.ensureConnected();
+                }, RECONNECT_DELAY_MS);
+            }
+        });
+    }
+
+    private send(message: Record<string, unknown>) {
+        if (this.socket?.readyState === WebSocket.OPEN) {
+            this.socket.send(JSON.stringify(message));
+        }
+    }
+
+    private close() {
+        if (this.reconnectTimer !== null) {
+            window.clearTimeout(this.reconnectTimer);
+            this.reconnectTimer = null;
+        }
+        this.socket?.close();
+        this.socket = null;
+    }
+}
+
+export const metricsStream = new MetricsStreamClient();
+
+export const subscribeMetricStream = (
+    pattern: string,
+    host: string | null,
+    listener: MetricStreamListener
+) => metricsStream.subscribe(pattern, host, listener);
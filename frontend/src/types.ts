@@ -27,7 +27,7 @@ export interface LogEvent {
     level?: 'trace' | 'debug' | 'info' | 'warn' | 'error' | 'fatal';
     timestamp?: string;
     context?: string;
-    type: 'history' | 'live';
+    type: 'history' | 'live' | 'dropped';
 }
 
 export interface User {
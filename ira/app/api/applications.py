@@ -192,6 +192,26 @@ async def delete_application(
     return Response(status_code=204)
 
 
+@router.get("/{application_id}/purge")
+async def application_purge_progress(
+    application_id: UUID,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Report the progress of the background purge of a deleted application.
+
+    Returns:
+    - status: pending, running (in this process) or failed (retried later)
+    - remaining_rows: metrics rows still to delete
+    - 404 once the purge has completed
+    """
+    service = ApplicationsService(session)
+    progress = await service.get_purge_progress(application_id=application_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="No purge for this application")
+    return progress
+
+
 @router.get("/all/list/")
 async def applications_list(
     session: AsyncSession = Depends(get_session),
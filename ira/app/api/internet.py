@@ -4,7 +4,6 @@ from fastapi import APIRouter, Depends, Query
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.database import get_session
-from app.repositories.metric_point import MetricPointRepository
 from app.services.internet.internet_events_service import InternetEventsService
 
 
@@ -18,8 +17,7 @@ async def packet_loss_events(
     ts_to: datetime = Query(...),
     session: AsyncSession = Depends(get_session),
 ):
-    repository = MetricPointRepository(session)
-    service = InternetEventsService(repository)
+    service = InternetEventsService(session)
 
     return await service.get_packet_loss_events(
         host=host,
@@ -1,8 +1,11 @@
+from datetime import datetime
 from uuid import UUID
-from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.database import get_session
+from app.modules.logs.download import RangeNotSatisfiable
 from app.services.logs_service import ApplicationLogsService
 
 
@@ -32,6 +35,27 @@ async def application_log_file_ws(
         pass
 
 
+@router.websocket("/ws/applications/{application_id}")
+async def application_logs_ws(
+    websocket: WebSocket,
+    application_id: UUID,
+    levels: str | None = None,
+    search: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> None:
+    service = ApplicationLogsService(session)
+
+    try:
+        await service.stream_application_logs(
+            application_id=application_id,
+            websocket=websocket,
+            levels=levels,
+            search=search,
+        )
+    except WebSocketDisconnect:
+        pass
+
+
 @router.get("/applications/{application_id}/files")
 async def application_log_files(
     application_id: UUID,
@@ -63,6 +87,99 @@ async def application_log_file_history(
         limit=limit,
     )
 
+
+@router.get("/applications/{application_id}/files/range")
+async def application_log_file_range(
+    application_id: UUID,
+    file_path: str,
+    ts_from: datetime = Query(...),
+    ts_to: datetime = Query(...),
+    limit: int = Query(1000, ge=1, le=5000),
+    after_offset: int | None = Query(None, ge=0),
+    session: AsyncSession = Depends(get_session),
+):
+    service = ApplicationLogsService(session)
+
+    try:
+        return await service.get_application_log_file_range(
+            application_id=application_id,
+            file_path=file_path,
+            ts_from=ts_from,
+            ts_to=ts_to,
+            limit=limit,
+            after_offset=after_offset,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail=str(exc),
+        )
+
+
+@router.get("/applications/{application_id}/files/download")
+async def download_application_log_file(
+    application_id: UUID,
+    file_path: str,
+    request: Request,
+    gzip: bool = Query(False),
+    session: AsyncSession = Depends(get_session),
+):
+    service = ApplicationLogsService(session)
+
+    try:
+        download = await service.download_application_log_file(
+            application_id=application_id,
+            file_path=file_path,
+            range_header=request.headers.get("range"),
+            compress=gzip,
+        )
+    except RangeNotSatisfiable as exc:
+        raise HTTPException(
+            status_code=416,
+            detail=str(exc),
+            headers={"Content-Range": f"bytes */{exc.size}"},
+        )
+
+    if download is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Log file not found",
+        )
+
+    return StreamingResponse(
+        download.body,
+        status_code=download.status_code,
+        media_type=download.media_type,
+        headers=download.headers,
+    )
+
+@router.get("/search")
+async def search_logs(
+    q: str = Query(..., min_length=1),
+    application_id: UUID | None = None,
+    ts_from: datetime | None = None,
+    ts_to: datetime | None = None,
+    levels: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    session: AsyncSession = Depends(get_session),
+):
+    service = ApplicationLogsService(session)
+
+    try:
+        return await service.search_logs(
+            query=q,
+            application_id=application_id,
+            ts_from=ts_from,
+            ts_to=ts_to,
+            levels=levels,
+            limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail=str(exc),
+        )
+
 # @router.post("/applications/{application_id}/logs/rescan")
 # async def rescan_application_logs(
 #     application_id: UUID,
@@ -78,4 +195,3 @@ async def application_log_file_history(
 #         "added": added,
 #     }
 
-# TODO get logs from file with specific date range
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from app.core.metrics_stream import metrics_stream
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.websocket("/ws/metrics")
+async def metrics_ws(websocket: WebSocket, binary: bool = False) -> None:
+    """
+    Stream live metric points matching the client's subscriptions.
+
+    See app.core.metrics_stream for the subscribe/unsubscribe protocol.
+    Pass ``binary=true`` to receive the JSON payloads as binary frames.
+    """
+    await metrics_stream.connect(websocket, binary=binary)
+
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            await metrics_stream.handle_message(websocket, raw)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        metrics_stream.disconnect(websocket)
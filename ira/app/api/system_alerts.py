@@ -1,4 +1,13 @@
-from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
+from typing import Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.database import get_session
@@ -9,25 +18,45 @@ router = APIRouter(tags=["alerts"])
 
 
 @router.websocket("/ws/alerts")
-async def alerts_ws(websocket: WebSocket) -> None:
-    await ws_manager.connect("alerts", websocket)
+async def alerts_ws(websocket: WebSocket, binary: bool = False) -> None:
+    await ws_manager.connect("alerts", websocket, binary=binary)
 
     try:
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
+        pass
+    finally:
         ws_manager.disconnect("alerts", websocket)
 
 
 @router.get("/alerts")
 async def list_alerts(
-    page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=250),
+    cursor: Optional[str] = Query(None),
+    host: Optional[str] = Query(None),
+    metric: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    level: Optional[str] = Query(None),
     session: AsyncSession = Depends(get_session),
 ):
     """
-    Return paginated alerts stored in the database.
+    Return alerts stored in the database, newest first.
+
+    Pages are addressed by the opaque ``next_cursor`` of the previous
+    response; ``total`` may be an estimate (see ``total_estimated``).
     """
 
     service = SystemAlertsService(session)
-    return await service.get_system_alerts_paginated(page=page, page_size=page_size)
+
+    try:
+        return await service.get_system_alerts_paginated(
+            page_size=page_size,
+            cursor=cursor,
+            host=host,
+            metric=metric,
+            status=status,
+            level=level,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
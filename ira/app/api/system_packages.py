@@ -2,7 +2,11 @@ from typing import Optional
 from fastapi import APIRouter, Query
 from app.core.logger import get_logger
 
-from app.models.dto.system_packages import SystemPackagesSortBy, SystemPackagesSortDir
+from app.models.dto.system_packages import (
+    SystemPackagesMatch,
+    SystemPackagesSortBy,
+    SystemPackagesSortDir,
+)
 from app.modules.system.packages.types import AptAction
 from app.services.system.packages_service import SystemPackagesService
 
@@ -17,6 +21,7 @@ def get_packages_paginated(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=250),
     q: Optional[str] = Query(None),
+    match: SystemPackagesMatch = Query("contains"),
     sort_by: SystemPackagesSortBy = Query("name"),
     sort_dir: SystemPackagesSortDir = Query("asc"),
 ):
@@ -25,6 +30,7 @@ def get_packages_paginated(
         page=page,
         page_size=page_size,
         q=q,
+        match=match,
         sort_by=sort_by,
         sort_dir=sort_dir,
     )
@@ -1,24 +1,96 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime
+import socket
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List
+from uuid import UUID
 
-from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.database import AsyncSessionLocal
 from app.core.logger import get_logger
+from app.core.metrics_buffer import metrics_buffer
+from app.core.metrics_stream import metrics_stream
 from app.models.dto.application_metrics_create_dto import ApplicationMetricsCreateDTO
+from app.models.dto.metric_point_dto import MetricPointDTO
 from app.models.entities.application import Application
+from app.modules.logs.level_metrics import (
+    build_log_level_points,
+    log_level_aggregator,
+)
+from app.modules.logs.resolver import log_file_allowlist
+from app.services.applications.application_registry import application_registry
 from app.services.applications.applications_metrics import ApplicationMetricsService
 from app.services.collector.application_collector import collect_application_metrics
+from app.services.metrics.metrics_service import SystemMetricsService
 
 
 COLLECT_INTERVAL_SECONDS = 5
 
+# Numeric fields published as `app.<application_id>.<field>` metric points.
+STREAMED_FIELDS = (
+    "cpu_percent",
+    "memory_mb",
+    "memory_percent",
+    "uptime_seconds",
+    "threads",
+    "restart_count",
+)
+
 logger = get_logger(__name__)
 
 
+def build_application_metric_points(
+    metrics: List[ApplicationMetricsCreateDTO],
+    *,
+    ts: datetime,
+    host: str,
+) -> List[MetricPointDTO]:
+    points: List[MetricPointDTO] = []
+
+    for metric in metrics:
+        for field in STREAMED_FIELDS:
+            value = getattr(metric, field)
+            if value is None:
+                continue
+
+            points.append(
+                {
+                    "ts": ts,
+                    "metric": f"app.{metric.application_id}.{field}",
+                    "value": float(value),
+                    "host": host,
+                }
+            )
+
+    return points
+
+
+async def _active_log_files(
+    session: AsyncSession,
+    applications: List[Application],
+) -> Dict[UUID, List[str]]:
+    """Log files currently written by each application (rotations excluded)."""
+    files: Dict[UUID, List[str]] = {}
+
+    for application in applications:
+        base_paths = await application_registry.get_log_base_paths(
+            session,
+            application_id=application.id,
+        )
+        files[application.id] = await asyncio.to_thread(
+            log_file_allowlist.current_files,
+            base_paths,
+        )
+
+    return files
+
+
 async def application_metrics_scheduler() -> None:
+    host = socket.gethostname()
+
     logger.info("starting application metrics scheduler")
 
     while True:
@@ -28,11 +100,7 @@ async def application_metrics_scheduler() -> None:
             async with AsyncSessionLocal() as session:
                 service = ApplicationMetricsService(session)
 
-                statement = select(Application).where(
-                    Application.enabled.is_(True),
-                )
-
-                applications = (await session.exec(statement)).all()
+                applications = await application_registry.list_enabled(session)
                 # logger.info(
                 #     "application metrics scheduler: %d enabled applications found",
                 #     len(applications),
@@ -74,6 +142,40 @@ async def application_metrics_scheduler() -> None:
                     metrics=metrics_batch,
                     ts=now,
                 )
+                application_registry.apply_runtime_states(
+                    metrics_batch,
+                    seen_at=now.replace(tzinfo=timezone.utc),
+                )
+
+                log_counts: Dict[UUID, Counter] = {}
+                log_points: List[MetricPointDTO] = []
+                try:
+                    log_level_aggregator.sync(
+                        await _active_log_files(session, applications)
+                    )
+                    log_counts = log_level_aggregator.take()
+                    log_points = build_log_level_points(
+                        log_counts,
+                        ts=now.replace(tzinfo=timezone.utc),
+                        host=host,
+                    )
+                    await SystemMetricsService(session).store_points(log_points)
+                except Exception:
+                    # Application metrics are still published below; the
+                    # counts go out with the next tick.
+                    logger.exception("log level metrics failed")
+                    await session.rollback()
+                    log_level_aggregator.restore(log_counts)
+                    log_points = []
+
+            points = build_application_metric_points(
+                metrics_batch,
+                ts=now.replace(tzinfo=timezone.utc),
+                host=host,
+            )
+            points.extend(log_points)
+            metrics_buffer.append_points(points)
+            await metrics_stream.publish(points)
 
         except Exception:
             logger.exception("application metrics scheduler tick failed")
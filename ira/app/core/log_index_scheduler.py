@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import List
+from uuid import UUID
+
+from app.core.database import AsyncSessionLocal
+from app.core.logger import get_logger
+from app.modules.logs.resolver import log_file_allowlist
+from app.modules.logs.search_index import log_search_indexes
+from app.services.applications.application_registry import application_registry
+
+
+LOG_INDEX_ENABLED = os.getenv("IRA_LOG_INDEX_ENABLED", "false").lower() in ("1", "true", "yes")
+LOG_INDEX_INTERVAL_SECONDS = float(os.getenv("IRA_LOG_INDEX_INTERVAL_SECONDS", "10"))
+LOG_INDEX_RETENTION_DAYS = int(os.getenv("IRA_LOG_INDEX_RETENTION_DAYS", "7"))
+
+logger = get_logger(__name__)
+
+
+def _index_application(application_id: UUID, base_paths: List[str]) -> int:
+    files = sorted(
+        {
+            path
+            for base_path in base_paths
+            for path in log_file_allowlist.files(base_path)
+        }
+    )
+
+    index = log_search_indexes.get(application_id)
+    indexed = index.index_files(files)
+    index.prune(retention_days=LOG_INDEX_RETENTION_DAYS)
+    return indexed
+
+
+async def log_index_scheduler() -> None:
+    """
+    Keep the full-text log index of every application up to date.
+
+    Disabled unless IRA_LOG_INDEX_ENABLED is set.
+    """
+    if not LOG_INDEX_ENABLED:
+        return
+
+    logger.info("starting log index scheduler")
+
+    while True:
+        try:
+            async with AsyncSessionLocal() as session:
+                applications = await application_registry.list_with_log_paths(session)
+                targets = [
+                    (
+                        application.id,
+                        await application_registry.get_log_base_paths(
+                            session,
+                            application_id=application.id,
+                        ),
+                    )
+                    for application in applications
+                ]
+
+            for application_id, base_paths in targets:
+                try:
+                    indexed = await asyncio.to_thread(
+                        _index_application,
+                        application_id,
+                        base_paths,
+                    )
+                    if indexed:
+                        logger.debug(
+                            "indexed %d log lines for application %s",
+                            indexed,
+                            application_id,
+                        )
+                except Exception:
+                    logger.exception(
+                        "failed indexing logs for application %s",
+                        application_id,
+                    )
+
+            # Indexes of deleted applications.
+            known = {application_id for application_id, _ in targets}
+            for application_id in await asyncio.to_thread(log_search_indexes.application_ids):
+                if application_id not in known:
+                    await asyncio.to_thread(log_search_indexes.drop, application_id)
+
+        except Exception:
+            logger.exception("log index scheduler tick failed")
+
+        await asyncio.sleep(LOG_INDEX_INTERVAL_SECONDS)
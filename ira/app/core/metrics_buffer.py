@@ -0,0 +1,238 @@
+"""
+In-memory ring buffer for the most recent metric points.
+
+The metrics scheduler appends every collected point here right after it is
+persisted, so series queries that fall entirely inside the buffered window
+can be answered without touching the database.
+"""
+
+from __future__ import annotations
+
+import os
+from array import array
+from datetime import datetime, timedelta, timezone
+from math import ceil
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models.dto.metric_point_dto import MetricPointDTO
+
+
+BUFFER_WINDOW_MINUTES = int(os.getenv("IRA_METRICS_BUFFER_MINUTES", "15"))
+
+# Matches COLLECT_INTERVAL_SECONDS of the schedulers feeding the buffer.
+BUFFER_POINT_INTERVAL_SECONDS = 5
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_us(value: datetime) -> int:
+    """Convert a datetime into integer microseconds since the epoch (UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(value: int) -> datetime:
+    """Convert integer microseconds since the epoch into an aware datetime."""
+    return _EPOCH + timedelta(microseconds=value)
+
+
+class SeriesRingBuffer:
+    """
+    Fixed-capacity ring of (timestamp, value) pairs for a single series.
+
+    Timestamps are stored as int64 microseconds and values as float64 in
+    arrays preallocated at construction, so appending never allocates.
+    """
+
+    __slots__ = ("capacity", "_ts", "_values", "_head", "_size", "_first_ts")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._ts = array("q", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._head = 0
+        self._size = 0
+        self._first_ts: Optional[int] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _physical(self, index: int) -> int:
+        return (self._head - self._size + index) % self.capacity
+
+    def ts_at(self, index: int) -> int:
+        return self._ts[self._physical(index)]
+
+    def value_at(self, index: int) -> float:
+        return self._values[self._physical(index)]
+
+    @property
+    def newest_ts(self) -> Optional[int]:
+        return self.ts_at(self._size - 1) if self._size else None
+
+    @property
+    def window_start(self) -> Optional[int]:
+        """
+        Earliest timestamp from which the buffer holds every point.
+
+        Until the ring wraps this is the first point ever appended; after
+        that it is the oldest point still retained.
+        """
+        if not self._size:
+            return None
+
+        if self._size < self.capacity:
+            return self._first_ts
+
+        return self.ts_at(0)
+
+    def append(self, ts_us: int, value: float) -> None:
+        newest = self.newest_ts
+        if newest is not None and ts_us <= newest:
+            return
+
+        if self._first_ts is None:
+            self._first_ts = ts_us
+
+        self._ts[self._head] = ts_us
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+
+        if self._size < self.capacity:
+            self._size += 1
+
+    def bisect_left(self, ts_us: int) -> int:
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ts_at(mid) < ts_us:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def bisect_right(self, ts_us: int) -> int:
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ts_at(mid) <= ts_us:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _slice(self, data: array, lo: int) -> array:
+        count = self._size - lo
+        if count <= 0:
+            return data[0:0]
+
+        start = self._physical(lo)
+        end = start + count
+        if end <= self.capacity:
+            return data[start:end]
+
+        return data[start:] + data[: end - self.capacity]
+
+    def window(self, ts_from_us: int) -> Tuple[array, array]:
+        """
+        Return (timestamps, values) of every point at or after ts_from_us.
+
+        The result is copied out of the ring in at most two slices so callers
+        can aggregate it with C-level builtins (sum, min, max).
+        """
+        lo = self.bisect_left(ts_from_us)
+        return self._slice(self._ts, lo), self._slice(self._values, lo)
+
+    def covers(self, ts_from_us: int) -> bool:
+        start = self.window_start
+        return start is not None and ts_from_us >= start
+
+    def range(self, ts_from_us: int, ts_to_us: int) -> List[Tuple[int, float]]:
+        """Return points with ts_from_us <= ts <= ts_to_us in ascending order."""
+        lo = self.bisect_left(ts_from_us)
+        hi = self.bisect_right(ts_to_us)
+
+        return [(self.ts_at(i), self.value_at(i)) for i in range(lo, hi)]
+
+
+class MetricsRingBuffer:
+    """
+    Per-series ring buffers keyed by (host, metric).
+
+    The capacity of every series is derived from the configured window and
+    the expected collection interval.
+    """
+
+    def __init__(
+        self,
+        *,
+        window_seconds: int,
+        interval_seconds: int,
+    ) -> None:
+        self.window_seconds = window_seconds
+        self.capacity = max(1, ceil(window_seconds / interval_seconds))
+        self._series: Dict[Tuple[str, str], SeriesRingBuffer] = {}
+        # Bumped whenever a series appears or is dropped, so callers can
+        # cache lookups.
+        self.version = 0
+
+    def series(self, *, host: str, metric: str) -> Optional[SeriesRingBuffer]:
+        return self._series.get((host, metric))
+
+    def items(self) -> Iterable[Tuple[Tuple[str, str], SeriesRingBuffer]]:
+        return self._series.items()
+
+    def append_points(self, points: Iterable[MetricPointDTO]) -> None:
+        for point in points:
+            key = (point["host"], point["metric"])
+            buffer = self._series.get(key)
+
+            if buffer is None:
+                buffer = SeriesRingBuffer(self.capacity)
+                self._series[key] = buffer
+                self.version += 1
+
+            buffer.append(to_epoch_us(point["ts"]), float(point["value"]))
+
+    def drop_series(self, *, prefix: str) -> None:
+        """Forget every series whose metric starts with prefix."""
+        for key in [key for key in self._series if key[1].startswith(prefix)]:
+            del self._series[key]
+            self.version += 1
+
+    def get_series(
+        self,
+        *,
+        metric: str,
+        host: str,
+        ts_from: datetime,
+        ts_to: datetime,
+    ) -> Optional[List[Dict]]:
+        """
+        Return the series for the range if the buffer fully covers it.
+
+        Returns None when part of the range is older than the buffered window,
+        in which case the caller must fall back to the database.
+        """
+        buffer = self._series.get((host, metric))
+        ts_from_us = to_epoch_us(ts_from)
+
+        if buffer is None or not buffer.covers(ts_from_us):
+            return None
+
+        return [
+            {
+                "ts": from_epoch_us(ts),
+                "value": value,
+            }
+            for ts, value in buffer.range(ts_from_us, to_epoch_us(ts_to))
+        ]
+
+
+metrics_buffer = MetricsRingBuffer(
+    window_seconds=BUFFER_WINDOW_MINUTES * 60,
+    interval_seconds=BUFFER_POINT_INTERVAL_SECONDS,
+)
@@ -7,6 +7,9 @@ import socket
 
 from app.core.database import AsyncSessionLocal
 from app.core.logger import get_logger
+from app.core.metrics_buffer import metrics_buffer
+from app.core.metrics_stream import metrics_stream
+from app.services.internet.internet_events_service import InternetEventsService
 from app.services.metrics.metrics_service import SystemMetricsService
 from app.services.system.system_alerts_service import SystemAlertsService
 
@@ -28,24 +31,20 @@ async def metrics_scheduler() -> None:
             async with AsyncSessionLocal() as session:
                 alerts_service = SystemAlertsService(session)
                 metrics_service = SystemMetricsService(session)
+                events_service = InternetEventsService(session)
 
                 points = await metrics_service.collect_metrics(host=host)
+                metrics_buffer.append_points(points)
+                await metrics_stream.publish(points)
 
-                metrics: dict[str, float] = {}
-
-                for point in points:
-                    metrics[point["metric"]] = point["value"]
-
-                await alerts_service.evaluate_alerts(
-                    cpu_total=metrics.get("cpu.total", 0.0),
-                    memory_available_percent=metrics.get(
-                        "memory.available_percent",
-                        100.0,
-                    ),
-                    load_1m=metrics.get("load.1m", 0.0),
-                    cpu_cores=cpu_cores,
-                    host=host,
-                )
+                try:
+                    await events_service.record_packet_loss(points)
+                except Exception:
+                    logger.exception("packet loss recording failed for host %s", host)
+                    # Leave the session usable for the alert evaluation.
+                    await session.rollback()
+
+                await alerts_service.evaluate_alerts(cpu_cores=cpu_cores)
 
         except Exception:
             logger.exception("metric collection failed for host %s", host)
@@ -0,0 +1,179 @@
+"""
+Push-based live metric streaming over WebSocket.
+
+Clients connected to ``/ws/metrics`` subscribe to metric name patterns
+(fnmatch style, e.g. ``cpu.*``) optionally scoped to a host. The schedulers
+publish every tick's points here and each client only receives the points
+matching its subscriptions.
+
+Client messages::
+
+    {"action": "subscribe", "metrics": ["cpu.*", "load.1m"], "host": "web-1"}
+    {"action": "unsubscribe", "metrics": ["cpu.*"], "host": "web-1"}
+
+Server messages::
+
+    {"type": "points", "points": [{"ts": ..., "metric": ..., "value": ..., "host": ...}]}
+    {"type": "subscribed" | "unsubscribed", "metrics": [...], "host": ...}
+    {"type": "error", "detail": "..."}
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from fastapi import WebSocket
+
+from app.core.websocket_manager import ws_manager
+from app.models.dto.metric_point_dto import MetricPointDTO
+
+
+CHANNEL = "metrics"
+
+
+@dataclass(frozen=True)
+class MetricSubscription:
+    pattern: str
+    host: Optional[str] = None
+
+    def matches(self, point: MetricPointDTO) -> bool:
+        if self.host is not None and point["host"] != self.host:
+            return False
+
+        return fnmatchcase(point["metric"], self.pattern)
+
+
+class MetricsStreamHub:
+    def __init__(self) -> None:
+        self._subscriptions: Dict[WebSocket, Set[MetricSubscription]] = {}
+
+    async def connect(self, websocket: WebSocket, *, binary: bool = False) -> None:
+        await ws_manager.connect(CHANNEL, websocket, binary=binary)
+        self._subscriptions[websocket] = set()
+
+    def disconnect(self, websocket: WebSocket) -> None:
+        ws_manager.disconnect(CHANNEL, websocket)
+        self._subscriptions.pop(websocket, None)
+
+    def subscribe(
+        self,
+        websocket: WebSocket,
+        *,
+        metrics: Iterable[str],
+        host: Optional[str] = None,
+    ) -> None:
+        subscriptions = self._subscriptions.setdefault(websocket, set())
+        subscriptions.update(
+            MetricSubscription(pattern=pattern, host=host) for pattern in metrics
+        )
+
+    def unsubscribe(
+        self,
+        websocket: WebSocket,
+        *,
+        metrics: Iterable[str],
+        host: Optional[str] = None,
+    ) -> None:
+        subscriptions = self._subscriptions.get(websocket)
+        if not subscriptions:
+            return
+
+        subscriptions.difference_update(
+            MetricSubscription(pattern=pattern, host=host) for pattern in metrics
+        )
+
+    async def handle_message(self, websocket: WebSocket, raw: str) -> None:
+        try:
+            message = json.loads(raw)
+            action, metrics, host = self._parse_message(message)
+        except ValueError as exc:
+            await ws_manager.send(
+                CHANNEL,
+                [websocket],
+                {"type": "error", "detail": str(exc)},
+            )
+            return
+
+        if action == "subscribe":
+            self.subscribe(websocket, metrics=metrics, host=host)
+        else:
+            self.unsubscribe(websocket, metrics=metrics, host=host)
+
+        await ws_manager.send(
+            CHANNEL,
+            [websocket],
+            {
+                "type": f"{action}d",
+                "metrics": metrics,
+                "host": host,
+            },
+        )
+
+    async def publish(self, points: List[MetricPointDTO]) -> None:
+        """
+        Fan a tick's points out to the matching subscribers.
+
+        Clients sharing the same subscription set are grouped so each
+        distinct payload is filtered and serialized only once.
+        """
+        if not points or not self._subscriptions:
+            return
+
+        groups: Dict[FrozenSet[MetricSubscription], List[WebSocket]] = {}
+        for websocket, subscriptions in self._subscriptions.items():
+            if subscriptions:
+                groups.setdefault(frozenset(subscriptions), []).append(websocket)
+
+        for subscriptions, websockets in groups.items():
+            matched = [
+                self._serialize_point(point)
+                for point in points
+                if any(sub.matches(point) for sub in subscriptions)
+            ]
+
+            if matched:
+                await ws_manager.send(
+                    CHANNEL,
+                    websockets,
+                    {"type": "points", "points": matched},
+                )
+
+    def _parse_message(
+        self,
+        message: Any,
+    ) -> Tuple[str, List[str], Optional[str]]:
+        if not isinstance(message, dict):
+            raise ValueError("message must be a JSON object")
+
+        action = message.get("action")
+        if action not in ("subscribe", "unsubscribe"):
+            raise ValueError("action must be 'subscribe' or 'unsubscribe'")
+
+        metrics = message.get("metrics")
+        if isinstance(metrics, str):
+            metrics = [metrics]
+
+        if not isinstance(metrics, list) or not metrics or not all(
+            isinstance(pattern, str) and pattern for pattern in metrics
+        ):
+            raise ValueError("metrics must be a non-empty list of patterns")
+
+        host = message.get("host")
+        if host is not None and not isinstance(host, str):
+            raise ValueError("host must be a string")
+
+        return action, metrics, host or None
+
+    def _serialize_point(self, point: MetricPointDTO) -> Dict[str, Any]:
+        return {
+            "ts": point["ts"].isoformat(),
+            "metric": point["metric"],
+            "value": point["value"],
+            "host": point["host"],
+        }
+
+
+metrics_stream = MetricsStreamHub()
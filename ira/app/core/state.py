@@ -0,0 +1,19 @@
+"""
+Location of the files IRA keeps between restarts (indexes, caches).
+
+Defaults to ``state`` next to the working directory, like ``logs``; set
+IRA_STATE_DIR to move it (e.g. onto a volume in Docker).
+"""
+
+import os
+from pathlib import Path
+
+
+DEFAULT_STATE_DIR = "state"
+
+
+def get_state_dir(*parts: str) -> Path:
+    """Return (and create) a directory under the IRA state directory."""
+    path = Path(os.getenv("IRA_STATE_DIR", DEFAULT_STATE_DIR), *parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -1,21 +1,239 @@
-from typing import Dict, Set
+"""
+Channel based WebSocket fan-out.
+
+Every connection owns a bounded send queue drained by its own writer task,
+so a slow or dead client never stalls the producer or the other clients.
+Broadcasting serializes the message once and hands it to a per-channel
+dispatcher, which keeps the cost for the producer constant regardless of
+how many clients are connected.
+
+Compression (permessage-deflate) is negotiated by the ASGI server; it is
+enabled by uvicorn's websockets implementation, see the Dockerfile.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from functools import cached_property
+from typing import Any, Dict, Iterable, Literal, Optional, Set
+
 from fastapi import WebSocket
 
+from app.core.logger import get_logger
+
+
+OverflowPolicy = Literal["drop_oldest", "disconnect"]
+
+WS_QUEUE_SIZE = int(os.getenv("IRA_WS_QUEUE_SIZE", "256"))
+WS_OVERFLOW_POLICY: OverflowPolicy = (
+    "disconnect"
+    if os.getenv("IRA_WS_OVERFLOW_POLICY", "drop_oldest") == "disconnect"
+    else "drop_oldest"
+)
+
+# "Try again later": the client could not keep up with the stream.
+_CLOSE_CODE_OVERFLOW = 1013
+
+logger = get_logger(__name__)
+
+
+class Frame:
+    """A message serialized once and shared by every recipient."""
+
+    def __init__(self, message: Any) -> None:
+        self.text = json.dumps(message, default=str, separators=(",", ":"))
+
+    @cached_property
+    def binary(self) -> bytes:
+        return self.text.encode("utf-8")
+
+
+class ClientConnection:
+    def __init__(
+        self,
+        websocket: WebSocket,
+        *,
+        channel: "Channel",
+        queue_size: int,
+        policy: OverflowPolicy,
+        binary: bool,
+    ) -> None:
+        self.websocket = websocket
+        self.binary = binary
+        self.dropped = 0
+        self._channel = channel
+        self._policy = policy
+        self._queue: asyncio.Queue[Frame] = asyncio.Queue(maxsize=queue_size)
+        self._writer: Optional[asyncio.Task] = None
+        self.closed = False
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def enqueue(self, frame: Frame) -> bool:
+        """
+        Queue a frame without blocking.
+
+        Returns False when the client must be evicted, either because it is
+        already closed or because its queue overflowed under the
+        ``disconnect`` policy.
+        """
+        if self.closed:
+            return False
+
+        try:
+            self._queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self._policy == "disconnect":
+            return False
+
+        self._queue.get_nowait()
+        self._queue.put_nowait(frame)
+        self.dropped += 1
+        return True
+
+    async def _write_loop(self) -> None:
+        try:
+            while True:
+                frame = await self._queue.get()
+
+                if self.binary:
+                    await self.websocket.send_bytes(frame.binary)
+                else:
+                    await self.websocket.send_text(frame.text)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.debug("websocket writer stopped on %s", self._channel.name)
+        finally:
+            self.closed = True
+            self._channel.evict(self.websocket)
+
+    def stop(self, *, close_code: Optional[int] = None) -> None:
+        self.closed = True
+
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+        if close_code is not None:
+            asyncio.create_task(self._close(close_code))
+
+    async def _close(self, code: int) -> None:
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+
+class Channel:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self._outbox: asyncio.Queue[tuple[Frame, Optional[Set[WebSocket]]]] = (
+            asyncio.Queue()
+        )
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    def publish(
+        self,
+        frame: Frame,
+        targets: Optional[Set[WebSocket]] = None,
+    ) -> None:
+        if not self.clients:
+            return
+
+        self._outbox.put_nowait((frame, targets))
+
+    def evict(self, websocket: WebSocket, *, close_code: Optional[int] = None) -> None:
+        client = self.clients.pop(websocket, None)
+        if client is None:
+            return
+
+        client.stop(close_code=close_code)
+
+        if client.dropped:
+            logger.info(
+                "websocket client on %s evicted after dropping %d messages",
+                self.name,
+                client.dropped,
+            )
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            frame, targets = await self._outbox.get()
+
+            recipients = (
+                list(self.clients.values())
+                if targets is None
+                else [self.clients[ws] for ws in targets if ws in self.clients]
+            )
+
+            for client in recipients:
+                if not client.enqueue(frame):
+                    self.evict(client.websocket, close_code=_CLOSE_CODE_OVERFLOW)
+
 
 class WebSocketManager:
-    def __init__(self) -> None:
-        self.connections: Dict[str, Set[WebSocket]] = {}
+    def __init__(
+        self,
+        *,
+        queue_size: int = WS_QUEUE_SIZE,
+        policy: OverflowPolicy = WS_OVERFLOW_POLICY,
+    ) -> None:
+        self.channels: Dict[str, Channel] = {}
+        self._queue_size = queue_size
+        self._policy = policy
 
-    async def connect(self, channel: str, websocket: WebSocket) -> None:
+    async def connect(
+        self,
+        channel: str,
+        websocket: WebSocket,
+        *,
+        binary: bool = False,
+    ) -> None:
         await websocket.accept()
-        self.connections.setdefault(channel, set()).add(websocket)
+
+        target = self.channels.setdefault(channel, Channel(channel))
+        client = ClientConnection(
+            websocket,
+            channel=target,
+            queue_size=self._queue_size,
+            policy=self._policy,
+            binary=binary,
+        )
+        target.clients[websocket] = client
+        target.ensure_dispatcher()
+        client.start()
 
     def disconnect(self, channel: str, websocket: WebSocket) -> None:
-        self.connections.get(channel, set()).discard(websocket)
+        target = self.channels.get(channel)
+        if target is not None:
+            target.evict(websocket)
 
     async def broadcast(self, channel: str, message: dict) -> None:
-        for ws in list(self.connections.get(channel, [])):
-            await ws.send_json(message)
+        target = self.channels.get(channel)
+        if target is not None:
+            target.publish(Frame(message))
+
+    async def send(
+        self,
+        channel: str,
+        websockets: Iterable[WebSocket],
+        message: dict,
+    ) -> None:
+        """Send one message, serialized once, to a subset of a channel."""
+        target = self.channels.get(channel)
+        if target is not None:
+            target.publish(Frame(message), set(websockets))
 
 
 ws_manager = WebSocketManager()
@@ -9,6 +9,7 @@ from app.api.processes import router as processes_router
 from app.api.system_services import router as system_service_router
 from app.api.users import router as users_router
 from app.api.metrics import router as metrics_router
+from app.api.metrics_stream import router as metrics_stream_router
 from app.api.system_alerts import router as alerts_router
 from app.api.applications import router as applications_router
 from app.api.internet import router as internet_router
@@ -19,9 +20,13 @@ from app.api.applications_metrics import router as applications_metrics_router
 from app.api.extensions import router as extensions_router
 from app.core.application_metrics_scheduler import application_metrics_scheduler
 from app.core.config import load_config
+from app.core.log_index_scheduler import log_index_scheduler
+from app.modules.logs.level_metrics import log_level_aggregator
 from app.core.logger import get_logger
 from app.core.metrics_scheduler import metrics_scheduler
 from app.core.database import engine, get_session
+from app.services.applications.application_purge import application_purger
+from app.services.applications.application_registry import application_registry
 from app.services.extensions.extensions import ExtensionsService
 from app.extensions.ai_chat.tools.generate_tools_calls import (
     main as generate_tools_calls,
@@ -36,6 +41,9 @@ async def lifespan(app: FastAPI):
     # Start background metrics scheduler
     system_metrics_task = asyncio.create_task(metrics_scheduler())
     application_metrics_task = asyncio.create_task(application_metrics_scheduler())
+    application_registry_task = asyncio.create_task(application_registry.listen())
+    log_index_task = asyncio.create_task(log_index_scheduler())
+    application_purge_task = asyncio.create_task(application_purger.run())
 
     # Laod enabled extensions from database at startup
     async for session in get_session():
@@ -54,6 +62,11 @@ async def lifespan(app: FastAPI):
         # Stop background tasks and close database engine
         system_metrics_task.cancel()
         application_metrics_task.cancel()
+        application_registry_task.cancel()
+        log_index_task.cancel()
+        application_purge_task.cancel()
+        log_level_aggregator.shutdown()
+        application_purger.shutdown()
         await engine.dispose()
 
 
@@ -81,6 +94,7 @@ app.include_router(processes_router)
 app.include_router(system_service_router)
 app.include_router(users_router)
 app.include_router(metrics_router)
+app.include_router(metrics_stream_router)
 app.include_router(alerts_router)
 app.include_router(applications_router)
 app.include_router(logs_router)
@@ -6,6 +6,7 @@ from typing import Literal
 
 SystemPackagesSortBy = Literal["name", "version", "arch"]
 SystemPackagesSortDir = Literal["asc", "desc"]
+SystemPackagesMatch = Literal["contains", "prefix"]
 
 
 class SystemPackages(TypedDict):
@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime
+from sqlmodel import Field, SQLModel
+
+
+class NetworkEvent(SQLModel, table=True):
+    __tablename__ = "network_events"  # type: ignore
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    host: str
+    kind: str
+
+    started_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
+
+    # Timestamp of the last sample that was part of the event.
+    last_seen_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
+
+    # NULL while the event is still open.
+    closed_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+
+    samples: int
+    sum_value: float
+    max_value: float
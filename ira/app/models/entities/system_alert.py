@@ -13,6 +13,7 @@ class SystemAlert(SQLModel, table=True):
 
     host: str
     metric: str
+    rule: Optional[str] = None
     level: str
 
     value: float
@@ -0,0 +1,278 @@
+"""
+Random access to gzip-compressed log rotations.
+
+A gzip stream can only be decompressed from its start. To read at an
+arbitrary offset, the file is decompressed once and a checkpoint is kept
+every ``CHECKPOINT_SPAN`` bytes of output: the compressed offset reached
+so far and a copy of the decompressor state (``decompressobj().copy()``,
+the zran technique). A read then resumes from the closest checkpoint
+before the offset, so it never decompresses more than one span.
+
+Checkpoints hold live zlib state and cannot be written to disk, so indexes
+are kept in memory for the ``INDEX_CACHE_SIZE`` most recently used files
+and rebuilt when a file changes. Rotations are immutable once compressed,
+so an index is normally built once per file.
+
+Blocking; call it from a worker thread.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import threading
+import zlib
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional, Tuple
+
+from app.core.logger import get_logger
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+CHECKPOINT_SPAN = 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+INDEX_CACHE_SIZE = 8
+
+# Decompressed spans kept per open reader; backwards scans read the same
+# span several times.
+SPAN_CACHE_SIZE = 2
+
+# Accept a gzip header (and nothing else).
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+logger = get_logger(__name__)
+
+
+def is_gzip_file(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(2) == GZIP_MAGIC
+    except OSError:
+        return False
+
+
+@dataclass
+class GzipCheckpoint:
+    uncompressed: int
+    compressed: int
+    decompressor: "zlib._Decompress"
+
+
+@dataclass
+class GzipIndex:
+    identity: Tuple[int, int, int, int]
+    size: int
+    checkpoints: List[GzipCheckpoint]
+
+    @property
+    def offsets(self) -> List[int]:
+        return [checkpoint.uncompressed for checkpoint in self.checkpoints]
+
+
+def _identity(stat: os.stat_result) -> Tuple[int, int, int, int]:
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _inflate(decompressor, data: bytes) -> Tuple["zlib._Decompress", bytes, bool]:
+    """
+    Decompress data, moving on to the next member of a multi-member file.
+
+    Returns the decompressor to continue with, the output and whether the
+    stream ended (trailing garbage after the last member is ignored).
+    """
+    output = []
+    next_member = False
+
+    while data:
+        try:
+            output.append(decompressor.decompress(data))
+        except zlib.error:
+            if next_member:
+                return decompressor, b"".join(output), True
+            raise
+
+        if not decompressor.eof or not decompressor.unused_data:
+            break
+
+        data = decompressor.unused_data
+        decompressor = zlib.decompressobj(_GZIP_WBITS)
+        next_member = True
+
+    return decompressor, b"".join(output), False
+
+
+def build_gzip_index(path: str, *, span: int = CHECKPOINT_SPAN) -> GzipIndex:
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+
+        decompressor = zlib.decompressobj(_GZIP_WBITS)
+        checkpoints = [GzipCheckpoint(0, 0, decompressor.copy())]
+        uncompressed = 0
+        compressed = 0
+
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            compressed += len(chunk)
+            try:
+                decompressor, output, ended = _inflate(decompressor, chunk)
+            except zlib.error:
+                logger.warning("corrupt gzip data in %s after %d bytes", path, uncompressed)
+                break
+
+            uncompressed += len(output)
+            if ended:
+                break
+
+            if uncompressed - checkpoints[-1].uncompressed >= span:
+                checkpoints.append(
+                    GzipCheckpoint(uncompressed, compressed, decompressor.copy())
+                )
+
+    return GzipIndex(identity=_identity(stat), size=uncompressed, checkpoints=checkpoints)
+
+
+class GzipIndexCache:
+    def __init__(self, *, max_entries: int = INDEX_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self._indexes: "OrderedDict[str, GzipIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> GzipIndex:
+        identity = _identity(os.stat(path))
+
+        with self._lock:
+            index = self._indexes.get(path)
+            if index is not None and index.identity == identity:
+                self._indexes.move_to_end(path)
+                return index
+
+        index = build_gzip_index(path)
+
+        with self._lock:
+            self._indexes[path] = index
+            self._indexes.move_to_end(path)
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+
+        return index
+
+
+gzip_indexes = GzipIndexCache()
+
+
+class IndexedGzipReader(io.RawIOBase):
+    """Seekable, read-only view of the decompressed content of a gzip file."""
+
+    def __init__(self, path: str, index: Optional[GzipIndex] = None) -> None:
+        super().__init__()
+        self.path = path
+        self.index = index or gzip_indexes.get(path)
+        self.size = self.index.size
+        self._offsets = self.index.offsets
+        self._file = open(path, "rb")
+        self._position = 0
+        self._spans: "OrderedDict[int, bytes]" = OrderedDict()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._position = max(0, min(offset, self.size))
+        return self._position
+
+    def _span(self, number: int) -> bytes:
+        cached = self._spans.get(number)
+        if cached is not None:
+            self._spans.move_to_end(number)
+            return cached
+
+        checkpoint = self.index.checkpoints[number]
+        end = (
+            self._offsets[number + 1]
+            if number + 1 < len(self._offsets)
+            else self.size
+        )
+        length = end - checkpoint.uncompressed
+
+        decompressor = checkpoint.decompressor.copy()
+        self._file.seek(checkpoint.compressed)
+        output = []
+        produced = 0
+
+        while produced < length:
+            chunk = self._file.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            decompressor, data, ended = _inflate(decompressor, chunk)
+            output.append(data)
+            produced += len(data)
+            if ended:
+                break
+
+        span = b"".join(output)[:length]
+
+        self._spans[number] = span
+        while len(self._spans) > SPAN_CACHE_SIZE:
+            self._spans.popitem(last=False)
+
+        return span
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.size - self._position
+
+        parts = []
+        while size > 0 and self._position < self.size:
+            number = bisect_right(self._offsets, self._position) - 1
+            span = self._span(number)
+            start = self._position - self._offsets[number]
+            piece = span[start:start + size]
+            if not piece:
+                break
+
+            parts.append(piece)
+            self._position += len(piece)
+            size -= len(piece)
+
+        return b"".join(parts)
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._file.close()
+            self._spans.clear()
+        super().close()
+
+
+def open_log_file(path: str) -> BinaryIO:
+    """Open a log file for binary reading, decompressing gzip rotations."""
+    if is_gzip_file(path):
+        return IndexedGzipReader(path)  # type: ignore[return-value]
+    return open(path, "rb")
+
+
+def content_size(f: BinaryIO) -> int:
+    """Size of the (decompressed) content of a file from open_log_file."""
+    if isinstance(f, IndexedGzipReader):
+        return f.size
+    return os.fstat(f.fileno()).st_size
@@ -0,0 +1,182 @@
+"""
+Log file downloads.
+
+Files are streamed in ``DOWNLOAD_CHUNK_SIZE`` chunks read in a worker
+thread, so neither the event loop nor memory ever holds more than one
+chunk. A single ``Range: bytes=...`` is honoured (resumed downloads,
+fetching the end of a file); multi-range requests get the whole file, as
+allowed by RFC 9110.
+
+The length is taken when the download starts: lines appended to an active
+log afterwards are not sent, so the body always matches Content-Length.
+This is also why FileResponse is not used, it reads until end of file.
+
+With ``compress`` the file is gzipped on the fly (no Range, no
+Content-Length); files that are already gzip are sent as they are.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Dict, Optional, Tuple
+
+from app.modules.logs.compressed import is_gzip_file
+
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Fast compression: downloads are limited by the network, not by size.
+GZIP_LEVEL = 1
+
+_BYTES_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+    def __init__(self, size: int) -> None:
+        super().__init__(f"range not satisfiable for {size} bytes")
+        self.size = size
+
+
+@dataclass
+class LogDownload:
+    status_code: int
+    media_type: str
+    headers: Dict[str, str]
+    body: AsyncIterator[bytes]
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range into (start, end), end exclusive.
+
+    Returns None when the whole file should be sent, including for an
+    invalid range such as ``bytes=5-3``.
+    """
+    if not header:
+        return None
+
+    match = _BYTES_RANGE.match(header.strip())
+    if match is None:
+        # Multiple ranges or another unit.
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if first and last and int(last) < int(first):
+        # An invalid range-spec: the header is ignored (RFC 9110, 14.2).
+        return None
+
+    if size == 0:
+        # No range of an empty file can be satisfied.
+        raise RangeNotSatisfiable(size)
+
+    if not first:
+        # Suffix range: the last n bytes.
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable(size)
+        return max(0, size - length), size
+
+    start = int(first)
+    end = size if not last else min(int(last) + 1, size)
+
+    if start >= size:
+        raise RangeNotSatisfiable(size)
+
+    return start, end
+
+
+async def _iter_file(path: str, start: int, end: int) -> AsyncIterator[bytes]:
+    f: BinaryIO = await asyncio.to_thread(open, path, "rb")
+    try:
+        await asyncio.to_thread(f.seek, start)
+        remaining = end - start
+
+        while remaining > 0:
+            chunk = await asyncio.to_thread(f.read, min(DOWNLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+async def _iter_gzip(path: str, size: int) -> AsyncIterator[bytes]:
+    f: BinaryIO = await asyncio.to_thread(open, path, "rb")
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def next_block(remaining: int) -> Tuple[bytes, int]:
+        chunk = f.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+        if not chunk:
+            return compressor.flush(), 0
+        remaining -= len(chunk)
+        data = compressor.compress(chunk)
+        if not remaining:
+            data += compressor.flush()
+        return data, remaining
+
+    try:
+        remaining = size
+        while True:
+            data, remaining = await asyncio.to_thread(next_block, remaining)
+            if data:
+                yield data
+            if not remaining:
+                break
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+def prepare_download(
+    path: str,
+    *,
+    range_header: Optional[str] = None,
+    compress: bool = False,
+) -> LogDownload:
+    """Blocking (stat and header checks); call it from a worker thread."""
+    size = os.stat(path).st_size
+    name = Path(path).name
+    compressed = is_gzip_file(path)
+    media_type = "application/gzip" if compressed else "text/plain; charset=utf-8"
+
+    if compress and not compressed:
+        return LogDownload(
+            status_code=200,
+            media_type="application/gzip",
+            headers={"Content-Disposition": f'attachment; filename="{name}.gz"'},
+            body=_iter_gzip(path, size),
+        )
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{name}"',
+    }
+
+    byte_range = parse_range(range_header, size)
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return LogDownload(
+            status_code=200,
+            media_type=media_type,
+            headers=headers,
+            body=_iter_file(path, 0, size),
+        )
+
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start)
+    headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+
+    return LogDownload(
+        status_code=206,
+        media_type=media_type,
+        headers=headers,
+        body=_iter_file(path, start, end),
+    )
@@ -0,0 +1,131 @@
+"""
+Log-derived metrics.
+
+Every active log file of an application is followed through the shared
+log tailers, so lines are read once no matter how many viewers or
+consumers a file has, and counting starts at the current end of the file:
+nothing is ever re-read. Lines are counted per level, and each tick the
+counts since the previous tick are turned into
+``app.<application_id>.log.<level>.count`` metric points. Counts that
+could not be stored are merged back and go out with the next tick.
+
+Every known level is emitted on every tick, zeros included, so windowed
+alert rules such as ``app.*.log.error.count`` see quiet periods too.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Set, Tuple
+from uuid import UUID
+
+from app.core.logger import get_logger
+from app.models.dto.metric_point_dto import MetricPointDTO
+from app.modules.logs.tailer import SUBSCRIBER_QUEUE_SIZE, log_tailers
+from app.utils.logs_parser import LEVEL_BY_NAME, LEVEL_BY_NUMBER
+
+
+LOG_LEVELS = tuple(LEVEL_BY_NUMBER.values())
+
+# Lines are taken from the tailer in batches instead of one wake-up per line.
+BATCH_LINGER_SECONDS = 0.5
+
+logger = get_logger(__name__)
+
+
+class LogLevelAggregator:
+    def __init__(self) -> None:
+        self._counts: Dict[UUID, Counter] = {}
+        self._tasks: Dict[Tuple[UUID, str], asyncio.Task] = {}
+
+    def sync(self, files: Dict[UUID, Iterable[str]]) -> None:
+        """Follow exactly the given files of each application."""
+        wanted: Set[Tuple[UUID, str]] = {
+            (application_id, path)
+            for application_id, paths in files.items()
+            for path in paths
+        }
+
+        for key in list(self._tasks):
+            if key not in wanted:
+                self._tasks.pop(key).cancel()
+
+        for key in wanted:
+            task = self._tasks.get(key)
+            if task is None or task.done():
+                self._tasks[key] = asyncio.create_task(self._follow(*key))
+
+        for application_id in list(self._counts):
+            if application_id not in files:
+                del self._counts[application_id]
+        for application_id in files:
+            self._counts.setdefault(application_id, Counter())
+
+    async def _follow(self, application_id: UUID, path: str) -> None:
+        try:
+            async with log_tailers.subscribe(path) as subscription:
+                while True:
+                    batch = await subscription.next_batch(
+                        max_items=SUBSCRIBER_QUEUE_SIZE,
+                        linger=BATCH_LINGER_SECONDS,
+                    )
+
+                    counts = self._counts.get(application_id)
+                    if counts is None:
+                        continue
+
+                    # JSON loggers may spell levels out ("warning").
+                    counts.update(
+                        LEVEL_BY_NAME.get(line.level.upper(), line.level)
+                        for line in batch
+                        if line.level
+                    )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("stopped counting log levels of %s", path)
+
+    def take(self) -> Dict[UUID, Counter]:
+        """Return the counts since the previous take and start over."""
+        counts = self._counts
+        self._counts = {application_id: Counter() for application_id in counts}
+        return counts
+
+    def restore(self, counts: Dict[UUID, Counter]) -> None:
+        """Merge back taken counts that could not be stored."""
+        for application_id, taken in counts.items():
+            current = self._counts.get(application_id)
+            if current is not None:
+                current.update(taken)
+
+    def shutdown(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+
+def build_log_level_points(
+    counts: Dict[UUID, Counter],
+    *,
+    ts: datetime,
+    host: str,
+) -> List[MetricPointDTO]:
+    points: List[MetricPointDTO] = []
+
+    for application_id, counted in counts.items():
+        for level in LOG_LEVELS:
+            points.append(
+                {
+                    "ts": ts,
+                    "metric": f"app.{application_id}.log.{level}.count",
+                    "value": float(counted.get(level, 0)),
+                    "host": host,
+                }
+            )
+
+    return points
+
+
+log_level_aggregator = LogLevelAggregator()
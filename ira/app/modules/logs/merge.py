@@ -0,0 +1,200 @@
+"""
+Time-ordered view across all log files of an application.
+
+History: the last lines of every file are read (each file is already in
+time order) and k-way merged by timestamp with a heap; only the newest
+``limit`` merged lines are kept.
+
+Live: one task per file moves tailed lines into a per-file read-ahead
+buffer of at most ``LOG_MERGE_READ_AHEAD`` lines (the oldest are dropped
+and counted when a viewer falls behind). Every batch, the buffers are
+k-way merged, so lines written to different files within one frame
+interval come out in timestamp order.
+
+Lines without a timestamp (stack traces, continuation lines) take the
+timestamp of the preceding line of the same file, so they stay attached
+to it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import os
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from operator import attrgetter
+from typing import Deque, Dict, List, Optional
+
+from app.core.logger import get_logger
+from app.modules.logs.offset_index import extract_timestamp, to_epoch
+from app.modules.logs.reader import read_last_lines
+from app.modules.logs.tailer import TailedLine, TailSubscription
+from app.utils.logs_parser import LogLineFilter, parse_log_lines
+
+
+LOG_MERGE_READ_AHEAD = int(os.getenv("IRA_LOG_MERGE_READ_AHEAD", "1000"))
+
+# Sort key of lines before the first timestamp of a file.
+_NO_TIMESTAMP = float("-inf")
+
+logger = get_logger(__name__)
+
+
+def _line_timestamp(timestamp: Optional[datetime], raw: str) -> Optional[float]:
+    if timestamp is not None:
+        return to_epoch(timestamp)
+    # Formats the parser keeps in the message ("2025-01-01T10:00:00 ...").
+    return extract_timestamp(raw.encode("utf-8", errors="ignore"))
+
+
+@dataclass(frozen=True)
+class MergedLine:
+    sort_key: float
+    path: str
+    message: str
+    level: Optional[str]
+    timestamp: Optional[datetime]
+    context: Optional[str]
+    offset: Optional[int] = None
+
+
+def read_merged_history(
+    files: Dict[str, Optional[int]],
+    limit: int,
+    line_filter: LogLineFilter,
+) -> List[MergedLine]:
+    """
+    Return the newest ``limit`` lines across files, oldest first.
+
+    ``files`` maps each path to the offset its history ends at (None for
+    the end of the file). Blocking; call it from a worker thread.
+    """
+    runs: List[List[MergedLine]] = []
+
+    for path, end_offset in files.items():
+        lines = [
+            line
+            for line in read_last_lines(path, limit, end_offset=end_offset)
+            if line_filter.accepts_raw(line)
+        ]
+
+        run: List[MergedLine] = []
+        sort_key = _NO_TIMESTAMP
+
+        for line, (message, level, timestamp, context) in zip(
+            lines, parse_log_lines(lines)
+        ):
+            epoch = _line_timestamp(timestamp, line)
+            if epoch is not None:
+                sort_key = epoch
+
+            if not message or not line_filter.accepts(level=level, message=message):
+                continue
+
+            run.append(
+                MergedLine(
+                    sort_key=sort_key,
+                    path=path,
+                    message=message,
+                    level=level,
+                    timestamp=timestamp,
+                    context=context,
+                )
+            )
+
+        runs.append(run)
+
+    return list(deque(heapq.merge(*runs, key=attrgetter("sort_key")), maxlen=limit))
+
+
+class MergedTail:
+    """Live lines of several tail subscriptions, merged by timestamp."""
+
+    def __init__(
+        self,
+        subscriptions: Dict[str, TailSubscription],
+        *,
+        linger: float,
+        read_ahead: int = LOG_MERGE_READ_AHEAD,
+    ) -> None:
+        self.subscriptions = subscriptions
+        self.linger = linger
+        self.read_ahead = read_ahead
+        self.dropped = 0
+        self._buffers: Dict[str, Deque[MergedLine]] = {
+            path: deque() for path in subscriptions
+        }
+        self._ready = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def __aenter__(self) -> "MergedTail":
+        self._tasks = [
+            asyncio.create_task(self._pump(path, subscription))
+            for path, subscription in self.subscriptions.items()
+        ]
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _pump(self, path: str, subscription: TailSubscription) -> None:
+        buffer = self._buffers[path]
+        sort_key = _NO_TIMESTAMP
+        dropped = 0
+
+        try:
+            while True:
+                batch = await subscription.next_batch(max_items=self.read_ahead, linger=0)
+
+                # Lines the tailer discarded before they reached the buffer.
+                self.dropped += subscription.dropped - dropped
+                dropped = subscription.dropped
+
+                for tailed in batch:
+                    epoch = _line_timestamp(tailed.timestamp, tailed.raw)
+                    if epoch is not None:
+                        sort_key = epoch
+                    if tailed.message:
+                        buffer.append(self._merged_line(path, sort_key, tailed))
+
+                while len(buffer) > self.read_ahead:
+                    buffer.popleft()
+                    self.dropped += 1
+
+                self._ready.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("stopped merging log lines of %s", path)
+
+    @staticmethod
+    def _merged_line(path: str, sort_key: float, tailed: TailedLine) -> MergedLine:
+        return MergedLine(
+            sort_key=sort_key,
+            path=path,
+            message=tailed.message,
+            level=tailed.level,
+            timestamp=tailed.timestamp,
+            context=tailed.context,
+            offset=tailed.offset,
+        )
+
+    async def next_batch(self) -> List[MergedLine]:
+        """
+        Wait for a line, give the other files ``linger`` seconds to catch up,
+        then return everything buffered in timestamp order.
+        """
+        await self._ready.wait()
+        await asyncio.sleep(self.linger)
+        self._ready.clear()
+
+        runs = []
+        for buffer in self._buffers.values():
+            runs.append(list(buffer))
+            buffer.clear()
+
+        return list(heapq.merge(*runs, key=attrgetter("sort_key")))
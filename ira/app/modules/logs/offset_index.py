@@ -0,0 +1,355 @@
+"""
+Sparse timestamp -> byte offset index for log files.
+
+For every ``INDEX_STRIDE`` bytes of a file the index records the offset and
+timestamp of the first line carrying a timestamp. Building it seeks to each
+stride boundary and reads only until the next timestamped line, so the
+rest of the file is never read. A date-range query then bisects the index
+and starts reading at most one stride before the requested window, instead
+of scanning the file from the beginning.
+
+Indexes are built lazily on the first query, extended from where they
+stopped when the file grows, rebuilt when the file is replaced or truncated,
+and persisted under ``<IRA_STATE_DIR>/log_index``. Offsets of gzip
+rotations are positions in the decompressed content.
+
+Timestamps without a timezone are taken as UTC. Lines without a timestamp
+(stack traces, continuation lines) belong to the closest preceding line
+that has one.
+"""
+
+from __future__ import annotations
+
+import calendar
+import hashlib
+import json
+import os
+import re
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from app.core.logger import get_logger
+from app.core.state import get_state_dir
+from app.modules.logs.compressed import content_size, open_log_file
+
+
+INDEX_STRIDE = 64 * 1024
+READ_BLOCK_SIZE = 1024 * 1024
+
+# Block size when sampling a line at a stride boundary.
+SAMPLE_BLOCK_SIZE = 4096
+
+# Only the head of a line is searched for its timestamp.
+TIMESTAMP_SEARCH_BYTES = 128
+
+INDEX_VERSION = 1
+
+_ISO_TIMESTAMP = re.compile(
+    rb"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})"
+    rb"(?:[.,](\d{1,9}))?\s?(Z|[+-]\d{2}:?\d{2})?"
+)
+_EPOCH_FIELD = re.compile(rb'"(?:time|timestamp|ts)"\s*:\s*(\d{10,13})(?:\.\d+)?')
+
+logger = get_logger(__name__)
+
+
+def extract_timestamp(line: bytes) -> Optional[float]:
+    """Return the epoch seconds of the timestamp at the head of a line."""
+    head = line[:TIMESTAMP_SEARCH_BYTES]
+
+    match = _ISO_TIMESTAMP.search(head)
+    if match is not None:
+        year, month, day, hour, minute, second, fraction, tz = match.groups()
+        try:
+            epoch = calendar.timegm(
+                (
+                    int(year),
+                    int(month),
+                    int(day),
+                    int(hour),
+                    int(minute),
+                    int(second),
+                )
+            )
+        except ValueError:
+            return None
+
+        if fraction:
+            epoch += int(fraction) / 10 ** len(fraction)
+
+        if tz and tz != b"Z":
+            sign = -1 if tz[:1] == b"-" else 1
+            digits = tz[1:].replace(b":", b"")
+            epoch -= sign * (int(digits[:2]) * 3600 + int(digits[2:]) * 60)
+
+        return epoch
+
+    if head.startswith(b"{"):
+        match = _EPOCH_FIELD.search(line)
+        if match is not None:
+            value = int(match.group(1))
+            return value / 1000 if value > 10**11 else float(value)
+
+    return None
+
+
+def to_epoch(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def iter_lines(
+    f: BinaryIO,
+    start: int,
+    end: Optional[int] = None,
+    *,
+    block_size: int = READ_BLOCK_SIZE,
+) -> Iterator[Tuple[int, bytes]]:
+    """Yield (offset, line) for complete lines between start and end."""
+    f.seek(start)
+    position = start
+    pending = b""
+
+    while end is None or position < end:
+        size = block_size if end is None else min(block_size, end - position)
+        block = f.read(size)
+        if not block:
+            return
+
+        position += len(block)
+        data = pending + block
+        line_start = 0
+        data_offset = position - len(data)
+
+        while True:
+            newline = data.find(b"\n", line_start)
+            if newline < 0:
+                break
+            yield data_offset + line_start, data[line_start:newline]
+            line_start = newline + 1
+
+        pending = data[line_start:]
+
+
+@dataclass
+class LogOffsetIndex:
+    path: str
+    device: int = 0
+    inode: int = 0
+    # Hash of the first bytes, to detect a file replaced under the same inode.
+    head: str = ""
+    indexed_upto: int = 0
+    timestamps: List[float] = field(default_factory=list)
+    offsets: List[int] = field(default_factory=list)
+
+    def lookup(self, ts_from: float) -> int:
+        """Offset from which every line at or after ts_from can be found."""
+        index = bisect_left(self.timestamps, ts_from) - 1
+        return self.offsets[index] if index >= 0 else 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": INDEX_VERSION,
+            "path": self.path,
+            "device": self.device,
+            "inode": self.inode,
+            "head": self.head,
+            "indexed_upto": self.indexed_upto,
+            "timestamps": self.timestamps,
+            "offsets": self.offsets,
+        }
+
+
+def _head_digest(f: BinaryIO) -> str:
+    f.seek(0)
+    return hashlib.sha1(f.read(256)).hexdigest()
+
+
+def _index_file(path: str) -> str:
+    name = hashlib.sha1(path.encode("utf-8")).hexdigest()
+    return str(get_state_dir("log_index") / f"{name}.json")
+
+
+class LogOffsetIndexStore:
+    def __init__(self, *, stride: int = INDEX_STRIDE) -> None:
+        self.stride = stride
+        self._indexes: Dict[str, LogOffsetIndex] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, path: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def _load(self, path: str) -> Optional[LogOffsetIndex]:
+        try:
+            with open(_index_file(path), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get("version") != INDEX_VERSION:
+            return None
+
+        data.pop("version")
+        return LogOffsetIndex(**data)
+
+    def _save(self, index: LogOffsetIndex) -> None:
+        target = _index_file(index.path)
+        tmp = f"{target}.tmp"
+
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(index.to_dict(), f, separators=(",", ":"))
+            os.replace(tmp, target)
+        except OSError:
+            logger.exception("failed to persist log index for %s", index.path)
+
+    def get(self, path: str) -> LogOffsetIndex:
+        """
+        Return the index of a file, brought up to date with its current size.
+
+        Blocking; call it from a worker thread.
+        """
+        with self._lock_for(path):
+            index = self._indexes.get(path) or self._load(path)
+
+            with open_log_file(path) as f:
+                stat = os.stat(path)
+                size = content_size(f)
+                head = _head_digest(f)
+
+                if (
+                    index is None
+                    or (index.device, index.inode) != (stat.st_dev, stat.st_ino)
+                    or index.head != head
+                    or size < index.indexed_upto
+                ):
+                    index = LogOffsetIndex(
+                        path=path,
+                        device=stat.st_dev,
+                        inode=stat.st_ino,
+                        head=head,
+                    )
+
+                if size > index.indexed_upto:
+                    self._extend(index, f, size)
+                    self._save(index)
+
+            self._indexes[path] = index
+            return index
+
+    def _extend(self, index: LogOffsetIndex, f: BinaryIO, size: int) -> None:
+        last_ts = index.timestamps[-1] if index.timestamps else None
+        boundary = (
+            index.offsets[-1] + self.stride if index.offsets else index.indexed_upto
+        )
+
+        while boundary < size:
+            window_end = min(size, boundary + self.stride)
+            sample = self._sample(f, boundary, window_end)
+
+            if sample is None:
+                if window_end == size:
+                    # The line may still be written: sample it again later.
+                    break
+                boundary = window_end
+                continue
+
+            offset, ts = sample
+
+            # Keep the index sorted even if a few lines are out of order.
+            if last_ts is not None and ts < last_ts:
+                ts = last_ts
+
+            index.timestamps.append(ts)
+            index.offsets.append(offset)
+            last_ts = ts
+            boundary = offset + self.stride
+
+        index.indexed_upto = min(boundary, size)
+
+    @staticmethod
+    def _sample(f: BinaryIO, boundary: int, end: int) -> Optional[Tuple[int, float]]:
+        """First line starting at or after boundary (before end) with a timestamp."""
+        # Starting one byte early, the first "line" is the end of the line
+        # the boundary falls in (empty if a line starts right at it).
+        start = max(0, boundary - 1)
+        lines = iter_lines(f, start, end, block_size=SAMPLE_BLOCK_SIZE)
+        if boundary:
+            next(lines, None)
+
+        for offset, line in lines:
+            ts = extract_timestamp(line)
+            if ts is not None:
+                return offset, ts
+
+        return None
+
+
+log_offset_indexes = LogOffsetIndexStore()
+
+
+def read_time_range(
+    path: str,
+    *,
+    ts_from: datetime,
+    ts_to: datetime,
+    limit: int = 1000,
+    after_offset: Optional[int] = None,
+) -> Dict:
+    """
+    Return the lines of a file whose timestamp falls in [ts_from, ts_to].
+
+    Reading starts at the indexed offset preceding ts_from (or at
+    after_offset, to continue a previous page) and stops at the first line
+    past ts_to, so only the bytes of the window are read. Blocking; call it
+    from a worker thread.
+    """
+    index = log_offset_indexes.get(path)
+    epoch_from = to_epoch(ts_from)
+    epoch_to = to_epoch(ts_to)
+
+    items: List[Dict] = []
+    next_offset: Optional[int] = None
+
+    if after_offset is None:
+        start = index.lookup(epoch_from)
+        current_ts: Optional[float] = None
+    else:
+        # The previous page stopped inside the window, so lines before the
+        # next timestamp still belong to it.
+        start = after_offset
+        current_ts = epoch_from
+
+    with open_log_file(path) as f:
+        # Lines appended since the index was extended are read as well.
+        for offset, line in iter_lines(f, start):
+            ts = extract_timestamp(line)
+            if ts is not None:
+                current_ts = ts
+
+            if current_ts is None or current_ts < epoch_from:
+                continue
+            if current_ts > epoch_to:
+                break
+
+            if len(items) >= limit:
+                next_offset = offset
+                break
+
+            items.append(
+                {
+                    "offset": offset,
+                    "line": line.decode("utf-8", errors="ignore").rstrip("\r"),
+                }
+            )
+
+    return {
+        "items": items,
+        "next_offset": next_offset,
+    }
@@ -0,0 +1,111 @@
+import mmap
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+from app.core.logger import get_logger
+from app.modules.logs.compressed import IndexedGzipReader, content_size, open_log_file
+logger = get_logger(__name__)
+
+
+BLOCK_SIZE = 64 * 1024
+
+# Files at least this large are scanned through mmap instead of block reads.
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+
+def _lines_start_from_blocks(f: BinaryIO, end: int, newlines: int) -> int:
+    """Offset right after the n-th newline before end, reading backwards."""
+    position = end
+
+    while position > 0:
+        block_start = max(0, position - BLOCK_SIZE)
+        f.seek(block_start)
+        block = f.read(position - block_start)
+
+        index = len(block)
+        while newlines:
+            index = block.rfind(b"\n", 0, index)
+            if index < 0:
+                break
+            newlines -= 1
+
+        if not newlines:
+            return block_start + index + 1
+
+        position = block_start
+
+    return 0
+
+
+def _lines_start_from_mmap(data: mmap.mmap, end: int, newlines: int) -> int:
+    index = end
+    while newlines:
+        index = data.rfind(b"\n", 0, index)
+        if index < 0:
+            return 0
+        newlines -= 1
+
+    return index + 1
+
+
+def _split_lines(data: bytes) -> List[str]:
+    chunks = data.split(b"\n")
+    tail = chunks.pop()
+
+    lines = [chunk.decode("utf-8", errors="ignore") + "\n" for chunk in chunks]
+    if tail:
+        lines.append(tail.decode("utf-8", errors="ignore"))
+
+    return lines
+
+
+def read_last_lines(
+    path: str,
+    limit: int = 200,
+    *,
+    end_offset: Optional[int] = None,
+) -> List[str]:
+    """
+    Return the last ``limit`` lines of a file, optionally ending at end_offset.
+
+    The file is scanned backwards from the end in fixed-size blocks (or via
+    mmap for large files) until enough newlines are found, so memory and
+    latency depend on ``limit``, not on the size of the file. Gzip
+    rotations are read through their checkpoint index, which only
+    decompresses the spans holding the requested lines.
+    """
+    logger.info(f"Reading last {limit} lines from log file {path}")
+    file_path = Path(path)
+
+    if not file_path.exists() or not file_path.is_file():
+        logger.warning(f"Log file {path} does not exist or is not a file")
+        return []
+
+    if limit <= 0:
+        return []
+
+    with open_log_file(path) as f:
+        size = content_size(f)
+        end = size if end_offset is None else min(end_offset, size)
+
+        if end <= 0:
+            return []
+
+        if size >= MMAP_THRESHOLD and not isinstance(f, IndexedGzipReader):
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                # A trailing newline terminates the last line, it does not
+                # start a new one.
+                newlines = limit + (1 if data[end - 1] == 0x0A else 0)
+                start = _lines_start_from_mmap(data, end, newlines)
+                content = data[start:end]
+        else:
+            f.seek(end - 1)
+            newlines = limit + (1 if f.read(1) == b"\n" else 0)
+            start = _lines_start_from_blocks(f, end, newlines)
+            f.seek(start)
+            content = f.read(end - start)
+
+    lines = _split_lines(content)
+    logger.info(f"Read {len(lines)} lines from log file {path}")
+
+    return lines[-limit:]
@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Tuple, Union
+
+from app.modules.scanner.walker import is_log_file_name, walk
+
+
+# How long a cached base path is trusted before its directories are re-checked.
+ALLOWLIST_CHECK_INTERVAL = 2.0
+
+
+@dataclass(frozen=True)
+class _ResolvedBasePath:
+    files: FrozenSet[str]
+    # Every directory of the tree with its mtime: adding, removing or
+    # renaming an entry changes the mtime of its directory.
+    directories: Tuple[Tuple[str, int], ...]
+    checked_at: float
+    # The walk stopped early: directories is partial, so an unchanged
+    # mtime proves nothing.
+    truncated: bool = False
+
+
+def _scan_base_path(base_path: str) -> _ResolvedBasePath:
+    base = Path(base_path)
+    files = set()
+    directories: List[Tuple[str, int]] = []
+    truncated = False
+
+    if base.is_file():
+        files.add(str(base.resolve()))
+        parent = base.parent
+        directories.append((str(parent), parent.stat().st_mtime_ns))
+
+    elif base.is_dir():
+        result = walk(base_path, is_log_file_name)
+        files.update(str(Path(path).resolve()) for path in result.files)
+        directories.extend(result.directories)
+        truncated = result.truncated
+
+    else:
+        # Not there yet: watch the closest existing parent for its creation.
+        parent = base.parent
+        while not parent.exists() and parent != parent.parent:
+            parent = parent.parent
+        directories.append((str(parent), parent.stat().st_mtime_ns))
+
+    return _ResolvedBasePath(
+        files=frozenset(files),
+        directories=tuple(directories),
+        checked_at=time.monotonic(),
+        truncated=truncated,
+    )
+
+
+def _is_unchanged(resolved: _ResolvedBasePath) -> bool:
+    if resolved.truncated:
+        return False
+
+    for directory, mtime_ns in resolved.directories:
+        try:
+            if os.stat(directory).st_mtime_ns != mtime_ns:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+class LogFileAllowlist:
+    """
+    Resolved log files of each base path, cached between requests.
+
+    A cached entry is re-validated at most every ``check_interval`` seconds
+    by comparing the mtimes of its directories, and re-scanned only when
+    one changed (or when its walk was truncated), so a membership check is
+    a set lookup in the common case.
+
+    Every base path has its own lock, so a slow scan never blocks the
+    other base paths, and while a cached base path is being re-checked
+    other callers get its previous files instead of waiting.
+    Blocking; call it from a worker thread.
+    """
+
+    def __init__(self, *, check_interval: float = ALLOWLIST_CHECK_INTERVAL) -> None:
+        self.check_interval = check_interval
+        self._resolved: Dict[str, _ResolvedBasePath] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, base_path: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(base_path, threading.Lock())
+
+    def files(self, base_path: str) -> FrozenSet[str]:
+        resolved = self._resolved.get(base_path)
+        now = time.monotonic()
+
+        if resolved is not None and now - resolved.checked_at < self.check_interval:
+            return resolved.files
+
+        lock = self._lock_for(base_path)
+        if not lock.acquire(blocking=resolved is None):
+            # Another thread is re-checking it.
+            return resolved.files  # type: ignore[union-attr]
+
+        try:
+            resolved = self._resolved.get(base_path)
+
+            if resolved is not None and now - resolved.checked_at < self.check_interval:
+                # Re-checked while this thread waited for the lock.
+                return resolved.files
+
+            if resolved is not None and _is_unchanged(resolved):
+                resolved = _ResolvedBasePath(
+                    files=resolved.files,
+                    directories=resolved.directories,
+                    checked_at=now,
+                )
+            else:
+                resolved = _scan_base_path(base_path)
+
+            self._resolved[base_path] = resolved
+            return resolved.files
+        finally:
+            lock.release()
+
+    def is_allowed(
+        self,
+        requested: Union[str, Path],
+        base_paths: Iterable[str],
+    ) -> bool:
+        target = str(Path(requested).resolve())
+        return any(target in self.files(base_path) for base_path in base_paths)
+
+    def current_files(self, base_paths: Iterable[str]) -> List[str]:
+        """Log files still being written to (rotations excluded)."""
+        return sorted(
+            {
+                path
+                for base_path in base_paths
+                for path in self.files(base_path)
+                if path.endswith(".log")
+            }
+        )
+
+
+log_file_allowlist = LogFileAllowlist()
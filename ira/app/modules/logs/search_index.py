@@ -0,0 +1,485 @@
+"""
+On-disk full-text index of application logs.
+
+Every application gets its own directory under
+``<IRA_STATE_DIR>/log_search/<application_id>`` with one SQLite FTS5
+database per day of indexing (a segment) and a ``cursors.db`` recording how
+far each file has been indexed. Cursors are keyed by (device, inode), so a
+rotated file keeps its cursor under its new name and is not indexed twice,
+and checked against a digest of the first bytes of the file, so a recycled
+inode starts over. Gzip rotations are read once; when one is the compressed
+copy of a file indexed as plain text, it continues that file's cursor
+instead of being indexed again. Indexed lines reference their file by a stable id that
+is resolved to the file's current path when searching.
+Retention drops whole segments, which is a file unlink instead of a DELETE.
+
+All functions are blocking; call them from a worker thread.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from app.core.logger import get_logger
+from app.core.state import get_state_dir
+from app.modules.logs.compressed import IndexedGzipReader, content_size, open_log_file
+from app.modules.logs.offset_index import extract_timestamp, to_epoch
+from app.utils.logs_parser import parse_log_lines
+
+
+# Bytes read from one file per indexing pass, so a large backlog is indexed
+# over several passes instead of in one long one.
+MAX_BYTES_PER_PASS = 8 * 1024 * 1024
+
+# Longer lines are indexed truncated.
+MAX_LINE_BYTES = 64 * 1024
+
+# Bytes at the start of a file that identify it.
+HEAD_BYTES = 256
+
+SEGMENT_SUFFIX = ".db"
+CURSORS_FILE = "cursors.db"
+
+_SEGMENT_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS lines USING fts5(
+    message,
+    level UNINDEXED,
+    path UNINDEXED,
+    offset UNINDEXED,
+    ts UNINDEXED,
+    file_id UNINDEXED,
+    tokenize = 'unicode61'
+)
+"""
+
+_CURSORS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cursors (
+    device INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    head TEXT NOT NULL,
+    head_length INTEGER NOT NULL,
+    file_id TEXT NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (device, inode)
+)
+"""
+
+_QUERY_TERM = re.compile(r"\w+\*?", re.UNICODE)
+
+logger = get_logger(__name__)
+
+
+def build_match_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query matching every term.
+
+    Terms are quoted so user input can never be read as FTS5 syntax; a
+    trailing ``*`` keeps prefix matching.
+    """
+    terms = []
+    for term in _QUERY_TERM.findall(text):
+        prefix = term.endswith("*")
+        word = term.rstrip("*")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+
+    if not terms:
+        raise ValueError("search query has no terms")
+
+    return " ".join(terms)
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    connection = sqlite3.connect(str(path), timeout=10)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class ApplicationLogIndex:
+    def __init__(self, application_id: UUID, root: Path) -> None:
+        self.application_id = application_id
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _segment_path(self, day: date) -> Path:
+        return self.root / f"{day.isoformat()}{SEGMENT_SUFFIX}"
+
+    def segments(self) -> List[Tuple[date, Path]]:
+        """Segments of the index, newest first."""
+        found = []
+        for path in self.root.glob(f"*{SEGMENT_SUFFIX}"):
+            if path.name == CURSORS_FILE:
+                continue
+            try:
+                found.append((date.fromisoformat(path.stem), path))
+            except ValueError:
+                continue
+        return sorted(found, reverse=True)
+
+    def index_files(self, files: Iterable[str]) -> int:
+        """Index what was appended to files since the previous pass."""
+        indexed = 0
+
+        with self._lock:
+            cursors = _connect(self.root / CURSORS_FILE)
+            segment = _connect(self._segment_path(datetime.now(timezone.utc).date()))
+
+            try:
+                cursors.execute(_CURSORS_SCHEMA)
+                segment.execute(_SEGMENT_SCHEMA)
+
+                present = set()
+                for path in files:
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    present.add((stat.st_dev, stat.st_ino))
+                    indexed += self._index_file(cursors, segment, path)
+
+                # Files that are gone: their inodes may be reused.
+                stale = [
+                    key
+                    for key in cursors.execute("SELECT device, inode FROM cursors")
+                    if key not in present
+                ]
+                with cursors:
+                    cursors.executemany(
+                        "DELETE FROM cursors WHERE device = ? AND inode = ?",
+                        stale,
+                    )
+            finally:
+                cursors.close()
+                segment.close()
+
+        return indexed
+
+    def _index_file(
+        self,
+        cursors: sqlite3.Connection,
+        segment: sqlite3.Connection,
+        path: str,
+    ) -> int:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return 0
+
+        row = cursors.execute(
+            """
+            SELECT offset, head, head_length, file_id, complete FROM cursors
+            WHERE device = ? AND inode = ?
+            """,
+            (stat.st_dev, stat.st_ino),
+        ).fetchone()
+
+        if row is not None and row[4]:
+            # A compressed rotation never changes once fully indexed.
+            return 0
+
+        try:
+            f = open_log_file(path)
+        except (OSError, EOFError):
+            return 0
+
+        with f:
+            compressed = isinstance(f, IndexedGzipReader)
+            size = content_size(f)
+
+            head_length = min(size, HEAD_BYTES)
+            head = hashlib.sha1(f.read(head_length)).hexdigest()
+
+            if row is not None:
+                offset, cursor_head, cursor_head_length, file_id, _complete = row
+                f.seek(0)
+                if (
+                    cursor_head_length > size
+                    or hashlib.sha1(f.read(cursor_head_length)).hexdigest() != cursor_head
+                    or offset > size
+                ):
+                    # Truncated in place, or a new file on a recycled inode.
+                    row = None
+
+            if row is None:
+                offset = 0
+                file_id = uuid.uuid4().hex
+
+                adopted = (
+                    cursors.execute(
+                        """
+                        SELECT offset, file_id FROM cursors
+                        WHERE head = ? AND head_length = ?
+                        ORDER BY offset DESC LIMIT 1
+                        """,
+                        (head, head_length),
+                    ).fetchone()
+                    if compressed and head_length == HEAD_BYTES
+                    else None
+                )
+                if adopted is not None:
+                    # The compressed copy of a rotation indexed while it was
+                    # plain text: carry on where it stopped.
+                    offset = min(adopted[0], size)
+                    file_id = adopted[1]
+
+            data = b""
+            if offset < size:
+                f.seek(offset)
+                data = f.read(MAX_BYTES_PER_PASS)
+
+        complete = compressed and offset + len(data) >= size
+
+        end = data.rfind(b"\n") + 1
+        if complete or (end == 0 and len(data) >= MAX_BYTES_PER_PASS):
+            # The last line of a compressed rotation is complete even without
+            # a newline; a pass without any newline is indexed as one
+            # (truncated) line.
+            end = len(data)
+
+        chunks = data[:end].split(b"\n")
+        if data[end - 1:end] == b"\n":
+            chunks.pop()
+
+        raws = [
+            chunk[:MAX_LINE_BYTES].decode("utf-8", errors="ignore").rstrip("\r")
+            for chunk in chunks
+        ]
+
+        rows = []
+        line_offset = offset
+        for chunk, (message, level, timestamp, _context) in zip(
+            chunks, parse_log_lines(raws)
+        ):
+            if message:
+                rows.append(
+                    (
+                        message,
+                        level,
+                        path,
+                        line_offset,
+                        to_epoch(timestamp) if timestamp else extract_timestamp(chunk),
+                        file_id,
+                    )
+                )
+            line_offset += len(chunk) + 1
+
+        if rows:
+            with segment:
+                segment.executemany(
+                    """
+                    INSERT INTO lines (message, level, path, offset, ts, file_id)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+
+        with cursors:
+            cursors.execute(
+                """
+                INSERT INTO cursors (
+                    device, inode, path, offset, head, head_length, file_id, complete
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (device, inode) DO UPDATE
+                SET path = excluded.path,
+                    offset = excluded.offset,
+                    head = excluded.head,
+                    head_length = excluded.head_length,
+                    file_id = excluded.file_id,
+                    complete = excluded.complete
+                """,
+                (
+                    stat.st_dev,
+                    stat.st_ino,
+                    path,
+                    offset + end,
+                    head,
+                    head_length,
+                    file_id,
+                    int(complete),
+                ),
+            )
+
+        return len(rows)
+
+    def _current_paths(self) -> Dict[str, str]:
+        """file_id -> current path of every indexed file that still exists."""
+        cursors_path = self.root / CURSORS_FILE
+        if not cursors_path.exists():
+            return {}
+
+        connection = sqlite3.connect(f"file:{cursors_path}?mode=ro", uri=True)
+        try:
+            return dict(connection.execute("SELECT file_id, path FROM cursors"))
+        except sqlite3.OperationalError:
+            return {}
+        finally:
+            connection.close()
+
+    def search(
+        self,
+        match: str,
+        *,
+        limit: int,
+        ts_from: Optional[float] = None,
+        ts_to: Optional[float] = None,
+        levels: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        conditions = ["lines MATCH ?"]
+        params: List = [match]
+
+        if ts_from is not None:
+            conditions.append("ts >= ?")
+            params.append(ts_from)
+        if ts_to is not None:
+            conditions.append("ts <= ?")
+            params.append(ts_to)
+        if levels:
+            conditions.append(f"level IN ({', '.join('?' for _ in levels)})")
+            params.extend(levels)
+
+        sql = (
+            "SELECT path, offset, ts, level, message, file_id, bm25(lines) AS rank "
+            f"FROM lines WHERE {' AND '.join(conditions)} "
+            "ORDER BY rank LIMIT ?"
+        )
+
+        # Rotated files are reported under their current name.
+        current_paths = self._current_paths()
+
+        matches: List[Dict] = []
+        for _day, segment_path in self.segments():
+            connection = sqlite3.connect(f"file:{segment_path}?mode=ro", uri=True)
+            try:
+                rows = connection.execute(sql, (*params, limit)).fetchall()
+            except sqlite3.OperationalError:
+                logger.warning("log index segment %s is not readable", segment_path)
+                continue
+            finally:
+                connection.close()
+
+            for path, offset, ts, level, message, file_id, rank in rows:
+                matches.append(
+                    {
+                        "application_id": str(self.application_id),
+                        "path": current_paths.get(file_id, path),
+                        "offset": offset,
+                        "timestamp": datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+                        if ts is not None
+                        else None,
+                        "level": level,
+                        "message": message,
+                        # bm25() is lower for better matches.
+                        "score": -rank,
+                    }
+                )
+
+        return matches
+
+    def prune(self, *, retention_days: int) -> int:
+        cutoff = datetime.now(timezone.utc).date() - timedelta(days=retention_days)
+        removed = 0
+
+        with self._lock:
+            for day, segment_path in self.segments():
+                if day >= cutoff:
+                    continue
+                for suffix in ("", "-wal", "-shm"):
+                    try:
+                        os.remove(f"{segment_path}{suffix}")
+                    except FileNotFoundError:
+                        pass
+                removed += 1
+
+        return removed
+
+
+class LogSearchIndexes:
+    def __init__(self) -> None:
+        self._indexes: Dict[UUID, ApplicationLogIndex] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> Path:
+        return get_state_dir("log_search")
+
+    def get(self, application_id: UUID) -> ApplicationLogIndex:
+        with self._lock:
+            index = self._indexes.get(application_id)
+            if index is None:
+                index = ApplicationLogIndex(
+                    application_id,
+                    get_state_dir("log_search", str(application_id)),
+                )
+                self._indexes[application_id] = index
+            return index
+
+    def application_ids(self) -> List[UUID]:
+        ids = []
+        for path in self.root.iterdir():
+            try:
+                ids.append(UUID(path.name))
+            except ValueError:
+                continue
+        return ids
+
+    def drop(self, application_id: UUID) -> None:
+        with self._lock:
+            self._indexes.pop(application_id, None)
+        shutil.rmtree(self.root / str(application_id), ignore_errors=True)
+
+    def search(
+        self,
+        text: str,
+        *,
+        application_id: Optional[UUID] = None,
+        ts_from: Optional[datetime] = None,
+        ts_to: Optional[datetime] = None,
+        levels: Optional[List[str]] = None,
+        limit: int = 50,
+    ) -> Dict:
+        match = build_match_query(text)
+        started = time.perf_counter()
+
+        application_ids = (
+            [application_id] if application_id is not None else self.application_ids()
+        )
+
+        matches: List[Dict] = []
+        for app_id in application_ids:
+            if not (self.root / str(app_id)).is_dir():
+                continue
+            matches.extend(
+                self.get(app_id).search(
+                    match,
+                    limit=limit,
+                    ts_from=to_epoch(ts_from) if ts_from else None,
+                    ts_to=to_epoch(ts_to) if ts_to else None,
+                    levels=levels,
+                )
+            )
+
+        matches.sort(key=lambda item: item["score"], reverse=True)
+
+        return {
+            "query": text,
+            "items": matches[:limit],
+            "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+
+log_search_indexes = LogSearchIndexes()
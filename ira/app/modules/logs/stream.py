@@ -0,0 +1,98 @@
+"""
+Batched log frames for WebSocket viewers.
+
+Log events are sent as JSON arrays instead of one frame per line: history
+is split into frames of at most ``LOG_FRAME_MAX_EVENTS`` events and live
+lines are coalesced for up to ``LOG_FRAME_INTERVAL_MS``.
+
+Each connection is capped at ``LOG_STREAM_MAX_RATE`` lines per second
+(token bucket, one second of burst). Lines over the cap, and lines the
+tailer had to drop because the viewer fell behind, are reported with a
+``{"type": "dropped", "count": n}`` event at the start of the next frame,
+tagged with the stream's source: the ``path`` of a single file, or the
+``application_id`` of a merged application stream.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+from fastapi import WebSocket
+
+
+LOG_FRAME_INTERVAL_MS = int(os.getenv("IRA_LOG_FRAME_INTERVAL_MS", "100"))
+LOG_FRAME_MAX_EVENTS = int(os.getenv("IRA_LOG_FRAME_MAX_EVENTS", "500"))
+LOG_STREAM_MAX_RATE = int(os.getenv("IRA_LOG_STREAM_MAX_RATE", "2000"))
+
+
+class LogFrameWriter:
+    def __init__(
+        self,
+        websocket: WebSocket,
+        *,
+        source: Dict[str, str],
+        max_events: int = LOG_FRAME_MAX_EVENTS,
+        max_rate: int = LOG_STREAM_MAX_RATE,
+    ) -> None:
+        self.websocket = websocket
+        self.source = source
+        self.max_events = max_events
+        self.max_rate = max_rate
+        self.dropped = 0
+        self._tokens = float(max_rate)
+        self._refilled_at = time.monotonic()
+
+    def drop(self, count: int) -> None:
+        self.dropped += count
+
+    def _take_tokens(self, wanted: int) -> int:
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.max_rate),
+            self._tokens + (now - self._refilled_at) * self.max_rate,
+        )
+        self._refilled_at = now
+
+        granted = min(wanted, int(self._tokens))
+        self._tokens -= granted
+        return granted
+
+    async def send(self, events: List[Dict[str, Any]], *, limited: bool = True) -> None:
+        """
+        Send events in frames of at most ``max_events``.
+
+        With ``limited``, events over the connection rate are dropped and
+        counted instead of sent.
+        """
+        if limited and events:
+            granted = self._take_tokens(len(events))
+            if granted < len(events):
+                self.dropped += len(events) - granted
+                # Keep the newest lines.
+                events = events[len(events) - granted:]
+
+        for start in range(0, len(events), self.max_events):
+            await self._send_frame(events[start:start + self.max_events])
+
+        if self.dropped and not events:
+            await self._send_frame([])
+
+    async def _send_frame(self, frame: List[Dict[str, Any]]) -> None:
+        if self.dropped:
+            # Dropped lines are older than the ones in this frame.
+            frame = [
+                {
+                    **self.source,
+                    "type": "dropped",
+                    "count": self.dropped,
+                }
+            ] + frame
+            self.dropped = 0
+
+        if frame:
+            await self.websocket.send_text(
+                json.dumps(frame, default=str, separators=(",", ":"))
+            )
@@ -0,0 +1,429 @@
+"""
+Shared log file tailers.
+
+A single LogTailer follows each file no matter how many viewers it has.
+It sleeps until the kernel reports a change (inotify through ``watchfiles``)
+and falls back to polling with an adaptive interval when file watching is
+not available. New lines are parsed once and fanned out to every
+subscriber.
+
+One LogDirectoryWatcher watches the directories of all tailed files from
+a dedicated thread and wakes the tailers whose file changed, so watching
+never takes workers from the shared anyio/asyncio thread pools.
+
+Rotation (the path now points to a different inode) and truncation (the
+file shrank below the read position) are detected on every wake-up: the
+rest of a rotated file is drained before switching to the new one, and a
+truncated file is re-read from the start.
+
+Gzip rotations never grow, so their tailers do not follow them at all.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Set, Tuple
+
+from app.core.logger import get_logger
+from app.modules.logs.compressed import is_gzip_file
+from app.utils.logs_parser import parse_log_lines
+
+try:
+    from watchfiles import watch
+except ImportError:  # pragma: no cover - watchfiles is in requirements
+    watch = None  # type: ignore[assignment]
+
+
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# How far back the last line of a file is looked for when following starts.
+PARTIAL_LOOKBACK_BYTES = 64 * 1024
+
+POLL_MIN_INTERVAL = 0.1
+POLL_MAX_INTERVAL = 2.0
+
+# watchfiles batches changes for this long before waking us up.
+WATCH_DEBOUNCE_MS = 50
+
+# The watcher yields a (possibly empty) batch at least this often.
+WATCH_TIMEOUT_MS = 1000
+
+logger = get_logger(__name__)
+
+# watchfiles logs every detected change at INFO.
+logging.getLogger("watchfiles.main").setLevel(logging.WARNING)
+
+
+@dataclass(frozen=True)
+class TailedLine:
+    offset: int
+    raw: str
+    message: str
+    level: Optional[str]
+    timestamp: Optional[datetime]
+    context: Optional[str]
+
+
+class TailSubscription:
+    def __init__(self, tailer: "LogTailer", *, start_offset: int) -> None:
+        self.tailer = tailer
+        # Offset at which the file was followed when the subscription began.
+        self.start_offset = start_offset
+        self.dropped = 0
+        self._queue: asyncio.Queue[TailedLine] = asyncio.Queue(
+            maxsize=SUBSCRIBER_QUEUE_SIZE
+        )
+
+    def push(self, line: TailedLine) -> None:
+        try:
+            self._queue.put_nowait(line)
+        except asyncio.QueueFull:
+            # Slow consumer: keep the newest lines.
+            self._queue.get_nowait()
+            self._queue.put_nowait(line)
+            self.dropped += 1
+
+    async def next_batch(self, *, max_items: int, linger: float) -> List[TailedLine]:
+        """
+        Wait for a line, then collect whatever arrives within ``linger``
+        seconds, up to ``max_items`` lines.
+        """
+        batch = [await self._queue.get()]
+
+        if self._queue.qsize() < max_items - 1:
+            await asyncio.sleep(linger)
+
+        while len(batch) < max_items and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        return batch
+
+    def __aiter__(self) -> "TailSubscription":
+        return self
+
+    async def __anext__(self) -> TailedLine:
+        return await self._queue.get()
+
+
+class LogDirectoryWatcher:
+    """
+    One ``watchfiles`` watcher for the directories of every tailed file.
+
+    It runs in its own thread and is restarted whenever the set of
+    directories changes. Changes are dispatched by path to the tailers of
+    the changed files on the event loop.
+    """
+
+    def __init__(self) -> None:
+        self._tailers: Dict[str, LogTailer] = {}
+        self._lock = threading.Lock()
+        self._restart = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # False while watching is unavailable: tailers poll instead.
+        self.watching = watch is not None
+
+    def _directories(self) -> Set[str]:
+        return {os.path.dirname(path) for path in self._tailers}
+
+    def add(self, tailer: "LogTailer") -> None:
+        if watch is None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        with self._lock:
+            before = self._directories()
+            self._tailers[tailer.path] = tailer
+            if self._directories() != before:
+                self._restart.set()
+
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run,
+                name="log-directory-watcher",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def remove(self, tailer: "LogTailer") -> None:
+        with self._lock:
+            if self._tailers.get(tailer.path) is tailer:
+                before = self._directories()
+                del self._tailers[tailer.path]
+                if self._directories() != before:
+                    self._restart.set()
+
+    def _dispatch(self, paths: Optional[Set[str]]) -> None:
+        # Runs on the event loop; None wakes every tailer.
+        with self._lock:
+            tailers = (
+                list(self._tailers.values())
+                if paths is None
+                else [self._tailers[path] for path in paths if path in self._tailers]
+            )
+        for tailer in tailers:
+            tailer.wake()
+
+    def _notify(self, paths: Optional[Set[str]]) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._dispatch, paths)
+
+    def _run(self) -> None:
+        while True:
+            self._restart.wait()
+            self._restart.clear()
+
+            with self._lock:
+                directories = sorted(
+                    directory
+                    for directory in self._directories()
+                    if os.path.isdir(directory)
+                )
+
+            if not directories:
+                continue
+
+            try:
+                self.watching = True
+                started = False
+                for changes in watch(  # type: ignore[misc]
+                    *directories,
+                    watch_filter=None,
+                    debounce=WATCH_DEBOUNCE_MS,
+                    stop_event=self._restart,
+                    rust_timeout=WATCH_TIMEOUT_MS,
+                    yield_on_timeout=True,
+                    recursive=False,
+                ):
+                    if not started:
+                        # The watch is set up: catch up with changes made
+                        # while it was being (re)started.
+                        started = True
+                        self._notify(None)
+                    elif changes:
+                        self._notify({path for _change, path in changes})
+            except Exception:
+                logger.warning(
+                    "watching log directories failed, falling back to polling",
+                    exc_info=True,
+                )
+                self.watching = False
+                self._notify(None)
+                time.sleep(POLL_MAX_INTERVAL)
+                self._restart.set()
+
+
+class LogTailer:
+    def __init__(self, path: str, watcher: LogDirectoryWatcher) -> None:
+        self.path = path
+        self.watcher = watcher
+        self.subscribers: Set[TailSubscription] = set()
+        self.position = 0
+        self.compressed = False
+        self._file: Optional[BinaryIO] = None
+        self._identity: Optional[Tuple[int, int]] = None
+        self._partial = b""
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        # Held while lines are read and fanned out, so that a new
+        # subscriber sees a consistent offset.
+        self._reading = asyncio.Lock()
+
+    @property
+    def offset(self) -> int:
+        """Offset of the first byte not emitted as a line yet."""
+        return self.position - len(self._partial)
+
+    def start(self) -> None:
+        self.compressed = is_gzip_file(self.path)
+        if self.compressed:
+            return
+
+        self._open(from_start=False)
+        self.watcher.add(self)
+        self._task = asyncio.create_task(self._run())
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    async def subscribe(self) -> TailSubscription:
+        async with self._reading:
+            subscription = TailSubscription(self, start_offset=self.offset)
+            self.subscribers.add(subscription)
+        return subscription
+
+    async def stop(self) -> None:
+        self.watcher.remove(self)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._close()
+
+    def _open(self, *, from_start: bool) -> None:
+        try:
+            handle = open(self.path, "rb")
+        except OSError:
+            return
+
+        stat = os.fstat(handle.fileno())
+        self._file = handle
+        self._identity = (stat.st_dev, stat.st_ino)
+        self._partial = b""
+        self.position = 0 if from_start else stat.st_size
+        handle.seek(self.position)
+
+        if self.position:
+            # Start following at the beginning of the last, possibly
+            # unfinished line, so it is emitted whole once completed.
+            handle.seek(max(0, self.position - PARTIAL_LOOKBACK_BYTES))
+            tail = handle.read(self.position - handle.tell())
+            newline = tail.rfind(b"\n")
+            if newline != -1 or len(tail) == self.position:
+                self._partial = tail[newline + 1:]
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._identity = None
+
+    def _read_new(self) -> List[TailedLine]:
+        if self._file is None:
+            return []
+
+        data = self._file.read()
+        if not data:
+            return []
+
+        start = self.position - len(self._partial)
+        self.position += len(data)
+        chunks = (self._partial + data).split(b"\n")
+        self._partial = chunks.pop()
+
+        raws = [chunk.decode("utf-8", errors="ignore").rstrip("\r") for chunk in chunks]
+
+        lines: List[TailedLine] = []
+        for chunk, raw, (message, level, timestamp, context) in zip(
+            chunks, raws, parse_log_lines(raws)
+        ):
+            lines.append(
+                TailedLine(
+                    offset=start,
+                    raw=raw,
+                    message=message,
+                    level=level,
+                    timestamp=timestamp,
+                    context=context,
+                )
+            )
+            start += len(chunk) + 1
+
+        return lines
+
+    def _read_available(self) -> List[TailedLine]:
+        try:
+            stat: Optional[os.stat_result] = os.stat(self.path)
+        except OSError:
+            stat = None
+
+        if self._file is None:
+            if stat is None:
+                return []
+            # The file (re)appeared after a rotation.
+            self._open(from_start=True)
+
+        if stat is not None and (stat.st_dev, stat.st_ino) == self._identity:
+            if stat.st_size < self.position:
+                logger.info("log file %s truncated, reading from start", self.path)
+                self._file.seek(0)  # type: ignore[union-attr]
+                self.position = 0
+                self._partial = b""
+
+            return self._read_new()
+
+        # Rotated or removed: finish the old file first.
+        lines = self._read_new()
+
+        if stat is not None:
+            logger.info("log file %s rotated, following new file", self.path)
+            self._close()
+            self._open(from_start=True)
+            lines.extend(self._read_new())
+
+        return lines
+
+    async def _drain(self) -> bool:
+        async with self._reading:
+            lines = await asyncio.to_thread(self._read_available)
+
+            for line in lines:
+                for subscriber in self.subscribers:
+                    subscriber.push(line)
+
+        return bool(lines)
+
+    async def _run(self) -> None:
+        interval = POLL_MIN_INTERVAL
+
+        while True:
+            self._wake.clear()
+
+            if await self._drain():
+                interval = POLL_MIN_INTERVAL
+            else:
+                interval = min(interval * 2, POLL_MAX_INTERVAL)
+
+            # The directory is watched, not the file, so that rotation (a new
+            # file with the same name) wakes the tailer as well.
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(),
+                    None if self.watcher.watching else interval,
+                )
+            except asyncio.TimeoutError:
+                pass
+
+
+class LogTailerRegistry:
+    """One LogTailer per resolved path, alive while it has subscribers."""
+
+    def __init__(self) -> None:
+        self._tailers: Dict[str, LogTailer] = {}
+        self._lock = asyncio.Lock()
+        self._watcher = LogDirectoryWatcher()
+
+    @asynccontextmanager
+    async def subscribe(self, path: str) -> AsyncIterator[TailSubscription]:
+        resolved = str(Path(path).resolve())
+
+        async with self._lock:
+            tailer = self._tailers.get(resolved)
+            if tailer is None:
+                tailer = LogTailer(resolved, self._watcher)
+                tailer.start()
+                self._tailers[resolved] = tailer
+
+            subscription = await tailer.subscribe()
+
+        try:
+            yield subscription
+        finally:
+            async with self._lock:
+                tailer.subscribers.discard(subscription)
+                if not tailer.subscribers:
+                    self._tailers.pop(resolved, None)
+                    await tailer.stop()
+
+
+log_tailers = LogTailerRegistry()
@@ -1,5 +1,11 @@
 from pathlib import Path
-from typing import List
+from typing import List, Set
+
+from app.modules.scanner.walker import walk_cache
+
+
+def _is_plain_log_file(name: str) -> bool:
+    return name.endswith(".log")
 
 
 def detect_log_paths(project_path: str) -> List[str]:
@@ -20,45 +26,21 @@ def detect_log_paths(project_path: str) -> List[str]:
     detected: List[str] = []
 
     for path in candidates:
-        if not path.exists():
-            continue
-
-        if path.is_file():
-            detected.append(str(path))
-            continue
-
-        if path.is_dir():
-            for log_file in path.rglob("*.log"):
-                if log_file.is_file():
-                    detected.append(str(log_file))
+        detected.extend(walk_cache.get(str(path), _is_plain_log_file).files)
 
     return detected
 
 
-from pathlib import Path
-from typing import List, Set
-
-
 def detect_log_base_paths(project_path: str) -> List[str]:
-    base = Path(project_path)
-
-    candidates = [
-        base / "logs",
-        base / "log",
-        base,
-    ]
-
-    detected: Set[str] = set()
-
-    for path in candidates:
-        if not path.exists():
-            continue
+    """
+    Directories of a project that hold log files.
 
-        if path.is_dir():
-            for log_file in path.rglob("*.log"):
-                detected.add(str(log_file.parent))
+    The project directory is walked once (it contains ``logs/`` and
+    ``log/``), skipping dependency and VCS directories. Blocking; call it
+    from a worker thread.
+    """
+    result = walk_cache.get(project_path, _is_plain_log_file)
 
-        if path.is_file() and path.suffix == ".log":
-            detected.add(str(path.parent))
+    detected: Set[str] = {str(Path(log_file).parent) for log_file in result.files}
 
     return sorted(detected)
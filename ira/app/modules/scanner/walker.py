@@ -0,0 +1,240 @@
+"""
+Bounded filesystem walker used for log discovery.
+
+Directories are listed with ``os.scandir`` by a small thread pool, level by
+level, so a large tree is not walked one directory at a time. Dependency,
+VCS and virtualenv directories are pruned before they are entered, and
+every walk is bounded by depth, number of entries and a time budget: a walk
+that hits a limit returns what it found so far with ``truncated`` set.
+
+Walks made through ``walk_cache`` are reused for ``WALK_CACHE_TTL`` seconds.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from app.core.logger import get_logger
+
+
+IGNORED_DIRECTORIES: FrozenSet[str] = frozenset(
+    {
+        ".git",
+        ".hg",
+        ".svn",
+        "node_modules",
+        "bower_components",
+        ".venv",
+        "venv",
+        "__pycache__",
+        "site-packages",
+        "dist-packages",
+        ".tox",
+        ".nox",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".cache",
+        ".next",
+        ".nuxt",
+        ".idea",
+        ".vscode",
+    }
+)
+
+# A directory holding this file is a virtualenv, whatever its name.
+VENV_MARKER = "pyvenv.cfg"
+
+WALK_CACHE_TTL = 60.0
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class WalkLimits:
+    max_depth: int = 8
+    max_entries: int = 200_000
+    time_budget: float = 5.0
+    workers: int = 8
+
+
+DEFAULT_WALK_LIMITS = WalkLimits()
+
+
+@dataclass
+class WalkResult:
+    files: List[str] = field(default_factory=list)
+    # (directory, st_mtime_ns) for every directory that was listed.
+    directories: List[Tuple[str, int]] = field(default_factory=list)
+    entries: int = 0
+    truncated: bool = False
+
+
+@dataclass
+class _Listing:
+    path: str
+    mtime_ns: int
+    files: List[str]
+    subdirectories: List[str]
+    entries: int
+
+
+def _list_directory(
+    path: str,
+    match: Callable[[str], bool],
+    ignored: FrozenSet[str],
+) -> Optional[_Listing]:
+    files: List[str] = []
+    subdirectories: List[str] = []
+    entries = 0
+    is_venv = False
+
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+        with os.scandir(path) as iterator:
+            for entry in iterator:
+                entries += 1
+                if entry.name == VENV_MARKER:
+                    is_venv = True
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in ignored:
+                            subdirectories.append(entry.path)
+                    elif entry.is_file() and match(entry.name):
+                        files.append(entry.path)
+                except OSError:
+                    continue
+    except OSError:
+        return None
+
+    if is_venv:
+        subdirectories = []
+
+    return _Listing(path, mtime_ns, files, subdirectories, entries)
+
+
+def walk(
+    root: str,
+    match: Callable[[str], bool],
+    *,
+    limits: WalkLimits = DEFAULT_WALK_LIMITS,
+    ignored: FrozenSet[str] = IGNORED_DIRECTORIES,
+) -> WalkResult:
+    """
+    Return the files under root whose name passes ``match``.
+
+    root itself may be a file, in which case it is returned when it matches.
+    """
+    result = WalkResult()
+
+    if os.path.isfile(root):
+        if match(os.path.basename(root)):
+            result.files.append(root)
+        return result
+
+    if not os.path.isdir(root):
+        return result
+
+    deadline = time.monotonic() + limits.time_budget
+    pending: Dict[Future, int] = {}
+
+    with ThreadPoolExecutor(
+        max_workers=limits.workers,
+        thread_name_prefix="ira-walk",
+    ) as pool:
+        pending[pool.submit(_list_directory, root, match, ignored)] = 0
+
+        while pending:
+            done, _ = wait(
+                pending,
+                timeout=max(0.0, deadline - time.monotonic()),
+                return_when=FIRST_COMPLETED,
+            )
+
+            if not done:
+                result.truncated = True
+                break
+
+            for future in done:
+                depth = pending.pop(future)
+                listing = future.result()
+                if listing is None:
+                    continue
+
+                result.directories.append((listing.path, listing.mtime_ns))
+                result.files.extend(listing.files)
+                result.entries += listing.entries
+
+                if result.entries >= limits.max_entries:
+                    result.truncated = True
+                    break
+
+                if depth >= limits.max_depth:
+                    if listing.subdirectories:
+                        result.truncated = True
+                    continue
+
+                for subdirectory in listing.subdirectories:
+                    pending[
+                        pool.submit(_list_directory, subdirectory, match, ignored)
+                    ] = depth + 1
+
+            if result.entries >= limits.max_entries:
+                break
+
+        for future in pending:
+            future.cancel()
+
+    if result.truncated:
+        logger.warning(
+            "walk of %s stopped early after %d entries", root, result.entries
+        )
+
+    result.files.sort()
+    return result
+
+
+def is_log_file_name(name: str) -> bool:
+    """Plain and rotated log files (app.log, app.log.1, app.log.2025-01-01)."""
+    name = name.lower()
+    return name.endswith(".log") or ".log." in name
+
+
+class WalkCache:
+    def __init__(self, *, ttl: float = WALK_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self._results: Dict[Tuple[str, str], Tuple[float, WalkResult]] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        root: str,
+        match: Callable[[str], bool],
+        *,
+        limits: WalkLimits = DEFAULT_WALK_LIMITS,
+    ) -> WalkResult:
+        key = (os.path.abspath(root), f"{match.__module__}.{match.__qualname__}")
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._results.get(key)
+        if cached is not None and now - cached[0] < self.ttl:
+            return cached[1]
+
+        result = walk(root, match, limits=limits)
+
+        with self._lock:
+            self._results[key] = (now, result)
+            # Drop expired walks so the cache does not grow with every project.
+            for stale in [k for k, (at, _) in self._results.items() if now - at >= self.ttl]:
+                del self._results[stale]
+
+        return result
+
+
+walk_cache = WalkCache()
+
@@ -1,7 +1,25 @@
+"""
+Parsed apt history.
+
+``/var/log/apt/history.log*`` is parsed once and kept in memory. Files are
+tracked by (device, inode): when history.log grows only the appended
+bytes are parsed, a rotation (history.log -> history.log.1) keeps its
+parsed entries under the new name, and compressed archives are never read
+again once parsed.
+
+Entries are indexed by package name, action and date, and the latest
+install date of every package is kept for direct lookups.
+"""
+
+from __future__ import annotations
+
 import gzip
 import re
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from app.modules.system.packages.types import AptAction, AptHistoryEntry
 
@@ -22,14 +40,6 @@ _ACTIONS: list[tuple[AptAction, re.Pattern[str]]] = [
 ]
 
 
-def _read_file(path: Path) -> List[str]:
-    if path.suffix == ".gz":
-        with gzip.open(path, "rt") as f:
-            return f.readlines()
-
-    return path.read_text().splitlines()
-
-
 def _packages_from_command(command: str) -> List[str]:
     parts = command.split()
 
@@ -41,20 +51,19 @@ def _packages_from_command(command: str) -> List[str]:
     return []
 
 
-def read_apt_history(limit: int = 100) -> List[AptHistoryEntry]:
-    entries: List[AptHistoryEntry] = []
-
-    files = sorted(
-        _HISTORY_PATH.glob("history.log*"),
-        reverse=True,
-    )
-
-    for file in files:
-        lines = _read_file(file)
-
-        current_date: str | None = None
-        current_command: str | None = None
+@dataclass
+class _HistoryFile:
+    path: Path
+    compressed: bool
+    size: int = 0
+    mtime_ns: int = 0
+    # Bytes parsed so far (plain files only).
+    offset: int = 0
+    current_date: Optional[str] = None
+    current_command: Optional[str] = None
+    entries: List[AptHistoryEntry] = field(default_factory=list)
 
+    def parse_lines(self, lines: Iterable[str]) -> None:
         for line in lines:
             line = line.strip()
             if not line:
@@ -62,34 +71,209 @@ def read_apt_history(limit: int = 100) -> List[AptHistoryEntry]:
 
             start_match = _START_RE.match(line)
             if start_match:
-                current_date = start_match.group("date")
+                self.current_date = start_match.group("date")
                 continue
 
             cmd_match = _COMMAND_RE.match(line)
             if cmd_match:
-                current_command = cmd_match.group("cmd")
+                self.current_command = cmd_match.group("cmd")
                 continue
 
             for action, regex in _ACTIONS:
                 match = regex.match(line)
-                if not match or not current_date or not current_command:
+                if not match or not self.current_date or not self.current_command:
                     continue
 
-                packages = _packages_from_command(current_command)
-                
+                packages = _packages_from_command(self.current_command)
+
                 if not packages:
                     continue
-                
-                entries.append(
+
+                self.entries.append(
                     {
-                        "date": current_date,
+                        "date": self.current_date,
                         "action": action,
                         "packages": packages,
-                        "command": current_command,
+                        "command": self.current_command,
                     }
                 )
 
-                if len(entries) >= limit:
-                    return entries
+    def read_new(self) -> None:
+        """Parse what was appended since the previous read."""
+        if self.compressed:
+            with gzip.open(self.path, "rt") as f:
+                self.parse_lines(f)
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+
+        # apt writes whole blocks, but never parse half a line.
+        end = data.rfind(b"\n") + 1
+        self.offset += end
+        self.parse_lines(data[:end].decode("utf-8", errors="replace").splitlines())
+
+
+class AptHistoryStore:
+    def __init__(self, directory: Path = _HISTORY_PATH) -> None:
+        self.directory = directory
+        self._files: Dict[Tuple[int, int], _HistoryFile] = {}
+        self._lock = threading.Lock()
+
+        # Sorted by date.
+        self._entries: List[AptHistoryEntry] = []
+        self._dates: List[str] = []
+        self._by_package: Dict[str, List[int]] = {}
+        self._by_action: Dict[str, List[int]] = {}
+        self._installed_at: Dict[str, str] = {}
+
+    def _refresh(self) -> None:
+        changed = False
+        seen: Set[Tuple[int, int]] = set()
+
+        for path in self.directory.glob("history.log*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+
+            key = (stat.st_dev, stat.st_ino)
+            seen.add(key)
+            history_file = self._files.get(key)
+
+            if history_file is not None:
+                # Renamed by a rotation: same file, nothing to parse.
+                history_file.path = path
+
+                if (stat.st_size, stat.st_mtime_ns) == (
+                    history_file.size,
+                    history_file.mtime_ns,
+                ):
+                    continue
+
+                if history_file.compressed or stat.st_size < history_file.offset:
+                    # Rewritten in place.
+                    history_file = None
 
-    return entries
+            if history_file is None:
+                history_file = _HistoryFile(path=path, compressed=path.suffix == ".gz")
+                self._files[key] = history_file
+
+            try:
+                history_file.read_new()
+            except (OSError, EOFError):
+                continue
+
+            history_file.size = stat.st_size
+            history_file.mtime_ns = stat.st_mtime_ns
+            changed = True
+
+        for key in set(self._files) - seen:
+            del self._files[key]
+            changed = True
+
+        if changed:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        entries = sorted(
+            (
+                entry
+                for history_file in self._files.values()
+                for entry in history_file.entries
+            ),
+            key=lambda e: e["date"],
+        )
+
+        by_package: Dict[str, List[int]] = {}
+        by_action: Dict[str, List[int]] = {}
+        installed_at: Dict[str, str] = {}
+
+        for position, entry in enumerate(entries):
+            by_action.setdefault(entry["action"], []).append(position)
+            for package in entry["packages"]:
+                by_package.setdefault(package, []).append(position)
+                if entry["action"] == "install":
+                    installed_at[package] = entry["date"]
+
+        self._entries = entries
+        self._dates = [entry["date"] for entry in entries]
+        self._by_package = by_package
+        self._by_action = by_action
+        self._installed_at = installed_at
+
+    def entries(self) -> List[AptHistoryEntry]:
+        """Every entry, oldest first."""
+        with self._lock:
+            self._refresh()
+            return list(self._entries)
+
+    def query(
+        self,
+        *,
+        action: Optional[AptAction] = None,
+        package: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> List[AptHistoryEntry]:
+        """
+        Entries matching every given filter, oldest first.
+
+        ``package`` matches any part of a package name, case-insensitively.
+        """
+        with self._lock:
+            self._refresh()
+
+            start = bisect_left(self._dates, date_from) if date_from else 0
+            end = bisect_right(self._dates, date_to) if date_to else len(self._dates)
+            positions: Optional[Set[int]] = None
+
+            if action:
+                positions = {
+                    position
+                    for position in self._by_action.get(action, [])
+                    if start <= position < end
+                }
+
+            if package:
+                needle = package.lower()
+                matching: Set[int] = set()
+                for name, name_positions in self._by_package.items():
+                    if needle in name.lower():
+                        matching.update(name_positions)
+                positions = matching if positions is None else positions & matching
+
+            if positions is None:
+                return self._entries[start:end]
+
+            return [
+                self._entries[position]
+                for position in sorted(positions)
+                if start <= position < end
+            ]
+
+    def with_packages(self, packages: Iterable[str]) -> List[AptHistoryEntry]:
+        """Entries that touched any of the given packages, oldest first."""
+        with self._lock:
+            self._refresh()
+
+            positions: Set[int] = set()
+            for package in packages:
+                positions.update(self._by_package.get(package, []))
+
+            return [self._entries[position] for position in sorted(positions)]
+
+    def installed_at(self, package: str) -> Optional[str]:
+        """Date of the latest install of a package."""
+        with self._lock:
+            self._refresh()
+            return self._installed_at.get(package)
+
+
+apt_history_store = AptHistoryStore()
+
+
+def read_apt_history(limit: int = 100) -> List[AptHistoryEntry]:
+    """The newest ``limit`` entries, oldest first."""
+    return apt_history_store.entries()[-limit:]
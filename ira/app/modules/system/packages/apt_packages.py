@@ -1,43 +1,164 @@
-import re
-import subprocess
-from typing import List
+"""
+Installed packages, read from the dpkg status database.
+
+``/var/lib/dpkg/status`` is parsed directly instead of running
+``apt list --installed``, and the result is kept in memory until the file's
+mtime or size changes (dpkg rewrites it on every install or removal).
+
+The cached index keeps packages sorted by name, with a bisectable list of
+lowercased names for prefix search and a trigram index for substring
+search, plus lazily built orders for the other sort keys.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
 
 from app.modules.system.packages.types import SystemPackage
 
 
-_LINE_RE = re.compile(
-    r"^(?P<name>[^/\s]+)/[^\s]+\s+(?P<version>\S+)\s+(?P<arch>\S+)\s+\[installed\]$"
-)
+_STATUS_PATH = Path("/var/lib/dpkg/status")
 
+_FIELDS = {
+    "Package": "name",
+    "Status": "status",
+    "Version": "version",
+    "Architecture": "arch",
+}
 
-def installed_packages() -> List[SystemPackage]:
-    process = subprocess.run(
-        ["apt", "list", "--installed"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        check=True,
-    )
 
+def _parse_status(text: str) -> List[SystemPackage]:
     packages: List[SystemPackage] = []
+    stanza: Dict[str, str] = {}
 
-    for raw_line in process.stdout.splitlines():
-        line = raw_line.strip()
+    def flush() -> None:
+        # "install ok installed", "hold ok installed", ...
+        if stanza.get("status", "").endswith(" installed") and "name" in stanza:
+            packages.append(
+                {
+                    "name": stanza["name"],
+                    "version": stanza.get("version", ""),
+                    "arch": stanza.get("arch", ""),
+                    "origin": "apt",
+                }
+            )
+        stanza.clear()
 
-        if not line or line.startswith("Listing..."):
+    for line in text.splitlines():
+        if not line:
+            flush()
             continue
 
-        match = _LINE_RE.match(line)
-        if not match:
+        # Continuation lines (descriptions, conffiles) start with a space.
+        if line[0] in " \t":
             continue
 
-        packages.append(
-            {
-                "name": match.group("name"),
-                "version": match.group("version"),
-                "arch": match.group("arch"),
-                "origin": "apt",
-            }
-        )
+        key, _, value = line.partition(":")
+        name = _FIELDS.get(key)
+        if name is not None:
+            stanza[name] = value.strip()
 
+    flush()
     return packages
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+@dataclass
+class InstalledPackagesIndex:
+    # Sorted by name.
+    packages: List[SystemPackage]
+    names: List[str] = field(init=False)
+    _trigram_index: Dict[str, List[int]] = field(init=False, repr=False)
+    _orders: Dict[str, List[int]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.packages.sort(key=lambda p: (p["name"].lower(), p["arch"]))
+        self.names = [p["name"].lower() for p in self.packages]
+
+        trigram_index: Dict[str, List[int]] = {}
+        for position, name in enumerate(self.names):
+            for trigram in _trigrams(name):
+                trigram_index.setdefault(trigram, []).append(position)
+
+        self._trigram_index = trigram_index
+        self._orders = {"name": list(range(len(self.packages)))}
+
+    def order(self, sort_by: str) -> List[int]:
+        """Package positions sorted by a field (built once, then cached)."""
+        order = self._orders.get(sort_by)
+        if order is None:
+            order = sorted(
+                range(len(self.packages)),
+                key=lambda position: self.packages[position][sort_by],
+            )
+            self._orders[sort_by] = order
+        return order
+
+    def starting_with(self, prefix: str) -> List[int]:
+        prefix = prefix.lower()
+        start = bisect_left(self.names, prefix)
+        end = start
+        while end < len(self.names) and self.names[end].startswith(prefix):
+            end += 1
+        return list(range(start, end))
+
+    def containing(self, needle: str) -> List[int]:
+        needle = needle.lower()
+
+        if len(needle) < 3:
+            return [
+                position
+                for position, name in enumerate(self.names)
+                if needle in name
+            ]
+
+        postings = sorted(
+            (self._trigram_index.get(trigram, []) for trigram in _trigrams(needle)),
+            key=len,
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+
+        # Trigrams only narrow the candidates down; order is not checked.
+        return sorted(
+            position for position in candidates if needle in self.names[position]
+        )
+
+
+class InstalledPackagesCache:
+    def __init__(self, path: Path = _STATUS_PATH) -> None:
+        self.path = path
+        self._index: Optional[InstalledPackagesIndex] = None
+        self._identity: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> InstalledPackagesIndex:
+        try:
+            stat = self.path.stat()
+            identity: Optional[Tuple[int, int]] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            identity = None
+
+        with self._lock:
+            if self._index is None or identity != self._identity:
+                text = self.path.read_text(errors="replace") if identity else ""
+                self._index = InstalledPackagesIndex(_parse_status(text))
+                self._identity = identity
+            return self._index
+
+
+installed_packages_cache = InstalledPackagesCache()
+
+
+def installed_packages() -> List[SystemPackage]:
+    return list(installed_packages_cache.get().packages)
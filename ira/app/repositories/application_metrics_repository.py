@@ -1,10 +1,13 @@
 from datetime import datetime
-from typing import Iterable, Sequence
+from typing import Iterable, Optional, Sequence, Tuple
 from uuid import UUID
 
+from sqlalchemy import cast, column, delete, func, insert, true, values
+from sqlalchemy.orm import aliased
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.models.entities.application import Application
 from app.models.entities.application_metrics import ApplicationMetrics
 
 
@@ -27,6 +30,82 @@ class ApplicationMetricssRepository:
         self._session.add_all(metrics_list)
         await self._session.commit()
 
+    async def insert_many_for_enabled(
+        self,
+        metrics: Sequence[ApplicationMetrics],
+    ) -> None:
+        """
+        Insert metrics rows in one multi-row INSERT ... SELECT.
+
+        Rows of applications that are unknown or disabled are dropped by the
+        join, so callers do not need to load the applications first. The
+        caller commits.
+        """
+        if not metrics:
+            return
+
+        table = ApplicationMetrics.__table__  # type: ignore[attr-defined]
+        fields = (
+            "application_id",
+            "ts",
+            "cpu_percent",
+            "memory_mb",
+            "memory_percent",
+            "uptime_seconds",
+            "threads",
+            "restart_count",
+            "status",
+        )
+
+        rows = values(
+            *(column(field, table.c[field].type) for field in fields),
+            name="incoming",
+        ).data([tuple(getattr(metric, field) for field in fields) for metric in metrics])
+
+        await self._session.exec(
+            insert(ApplicationMetrics).from_select(  # type: ignore[call-overload]
+                fields,
+                # VALUES columns made only of NULLs would default to text.
+                select(*(cast(rows.c[field], table.c[field].type) for field in fields))
+                .select_from(rows)
+                .join(Application, Application.id == rows.c.application_id)
+                .where(Application.enabled.is_(True)),  # type: ignore
+            )
+        )
+
+    async def count_for_application(
+        self,
+        *,
+        application_id: UUID,
+    ) -> int:
+        result = await self._session.exec(
+            select(func.count()).where(
+                ApplicationMetrics.application_id == application_id
+            )
+        )
+        return result.one()
+
+    async def delete_batch_for_application(
+        self,
+        *,
+        application_id: UUID,
+        limit: int,
+    ) -> int:
+        """Delete up to limit metrics rows of an application and commit."""
+        batch = (
+            select(ApplicationMetrics.id)
+            .where(ApplicationMetrics.application_id == application_id)
+            .limit(limit)
+            .scalar_subquery()
+        )
+
+        result = await self._session.exec(
+            delete(ApplicationMetrics).where(ApplicationMetrics.id.in_(batch))  # type: ignore
+        )
+        await self._session.commit()
+
+        return result.rowcount
+
     async def list_by_application(
         self,
         *,
@@ -62,3 +141,36 @@ class ApplicationMetricssRepository:
 
         result = await self._session.exec(statement)
         return result.all()
+
+    async def list_latest_per_application(
+        self,
+        *,
+        enabled_only: bool = True,
+    ) -> Sequence[Tuple[Application, Optional[ApplicationMetrics]]]:
+        """
+        Return every application with its most recent metrics row, if any.
+
+        The latest row is fetched with a LATERAL ``ORDER BY ts DESC LIMIT 1``
+        per application, i.e. one backward probe of
+        idx_application_metrics_app_ts each, instead of aggregating the whole
+        metrics history.
+        """
+        latest = (
+            select(ApplicationMetrics)
+            .where(ApplicationMetrics.application_id == Application.id)
+            .order_by(ApplicationMetrics.ts.desc())  # type: ignore
+            .limit(1)
+            .lateral("latest_metric")
+        )
+        latest_metric = aliased(ApplicationMetrics, latest)
+
+        statement = select(Application, latest_metric).outerjoin(
+            latest_metric,
+            true(),
+        )
+
+        if enabled_only:
+            statement = statement.where(Application.enabled.is_(True))  # type: ignore
+
+        result = await self._session.exec(statement)
+        return result.all()
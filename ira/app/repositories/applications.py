@@ -1,8 +1,8 @@
-from typing import Optional, Sequence
+from typing import Optional, Sequence, Tuple
 from uuid import UUID
 from datetime import datetime, timezone
 
-from sqlalchemy import select, exists
+from sqlalchemy import Text, cast, column, delete, exists, func, or_, update, values
 
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -28,7 +28,9 @@ class ApplicationRepository:
         self,
     ) -> Sequence[Application]:
         result = await self._session.exec(
-            select(Application).order_by(Application.created_at.desc())  # type: ignore
+            select(Application)
+            .where(Application.deleted_at.is_(None))  # type: ignore
+            .order_by(Application.created_at.desc())  # type: ignore
         )
         return result.all()
 
@@ -84,6 +86,58 @@ class ApplicationRepository:
         self._session.add(app)
         await self._session.commit()
 
+    async def update_runtime_states(
+        self,
+        states: Sequence[Tuple[UUID, str, Optional[int], Optional[int]]],
+        *,
+        seen_at: datetime,
+        stale_before: datetime,
+    ) -> None:
+        """
+        Apply (application_id, status, pid, port) tuples in one statement.
+
+        Issues a single ``UPDATE applications ... FROM (VALUES ...)``. Rows
+        whose status, pid and port are unchanged are skipped unless their
+        last_seen_at is older than stale_before. The caller commits.
+        """
+        if not states:
+            return
+
+        table = Application.__table__  # type: ignore[attr-defined]
+        rows = values(
+            column("id", table.c.id.type),
+            column("status", table.c.status.type),
+            column("pid", table.c.pid.type),
+            column("port", table.c.port.type),
+            name="incoming",
+        ).data(list(states))
+
+        # VALUES columns made only of NULLs would default to text.
+        status = cast(rows.c.status, table.c.status.type)
+        pid = cast(rows.c.pid, table.c.pid.type)
+        port = cast(rows.c.port, table.c.port.type)
+
+        await self._session.exec(
+            update(Application)  # type: ignore[call-overload]
+            .where(
+                Application.id == rows.c.id,
+                Application.enabled.is_(True),  # type: ignore
+                or_(
+                    Application.status.is_distinct_from(status),  # type: ignore
+                    Application.pid.is_distinct_from(pid),  # type: ignore
+                    Application.port.is_distinct_from(port),  # type: ignore
+                    Application.last_seen_at.is_(None),  # type: ignore
+                    Application.last_seen_at < stale_before,  # type: ignore
+                ),
+            )
+            .values(
+                status=status,
+                pid=pid,
+                port=port,
+                last_seen_at=seen_at,
+            )
+        )
+
     async def applications_with_path_logs(
         self,
     ) -> Sequence[Application]:
@@ -91,9 +145,77 @@ class ApplicationRepository:
             select(Application)
             .where(
                 exists()
-                .where(ApplicationLogPath.application_id == Application.id) 
+                .where(ApplicationLogPath.application_id == Application.id),
+                Application.deleted_at.is_(None),  # type: ignore
             )
         )
 
         result = await self._session.exec(stmt)
         return result.all()
+
+    async def mark_deleted(
+        self,
+        *,
+        application_id: UUID,
+    ) -> bool:
+        """
+        Soft-delete an application and release its identifier.
+
+        The row stays until the background purge removes its metrics, but it
+        is disabled, hidden from listings and renamed so the same
+        application can be registered again right away.
+        """
+        result = await self._session.exec(
+            update(Application)  # type: ignore[call-overload]
+            .where(
+                Application.id == application_id,
+                Application.deleted_at.is_(None),  # type: ignore
+            )
+            .values(
+                deleted_at=func.now(),
+                enabled=False,
+                identifier=func.concat(
+                    Application.identifier,
+                    ":deleted:",
+                    cast(Application.id, Text),
+                ),
+            )
+        )
+        await self._session.commit()
+
+        return result.rowcount > 0
+
+    async def list_deleted_ids(self) -> Sequence[UUID]:
+        result = await self._session.exec(
+            select(Application.id).where(Application.deleted_at.is_not(None))  # type: ignore
+        )
+        return result.all()
+
+    async def get_deleted_at(
+        self,
+        *,
+        application_id: UUID,
+    ) -> Optional[datetime]:
+        result = await self._session.exec(
+            select(Application.deleted_at).where(Application.id == application_id)
+        )
+        return result.first()
+
+    async def purge(
+        self,
+        *,
+        application_id: UUID,
+    ) -> None:
+        """Remove a soft-deleted application and its log paths."""
+        await self._session.exec(
+            delete(ApplicationLogPath).where(
+                ApplicationLogPath.application_id == application_id  # type: ignore
+            )
+        )
+        await self._session.exec(
+            delete(Application).where(
+                Application.id == application_id,  # type: ignore
+                Application.deleted_at.is_not(None),  # type: ignore
+            )
+        )
+        await self._session.commit()
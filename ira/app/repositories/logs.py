@@ -26,6 +26,12 @@ class ApplicationLogRepository:
         )
         return result.all()
 
+    async def list_all(self) -> Sequence[ApplicationLogPath]:
+        result = await self._session.exec(
+            select(ApplicationLogPath).order_by(asc(ApplicationLogPath.created_at))  # type: ignore
+        )
+        return result.all()
+
     async def list_active_base_paths(
     self,
     *,
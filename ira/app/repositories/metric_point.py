@@ -1,12 +1,10 @@
 from datetime import datetime
-from typing import Dict, Optional, Sequence, Tuple, List
+from typing import Optional, Sequence, Tuple
 
-from sqlalchemy import text
-from sqlalchemy import column, asc
+from sqlalchemy import column, asc, delete, func
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.sql_loader import load_sql
 from app.models.entities.metric_point import MetricPoint
 
 
@@ -44,69 +42,6 @@ class MetricPointRepository:
         self._session.add_all(entities)
         await self._session.commit()
 
-    async def list_packet_loss_events(
-        self,
-        *,
-        host: str,
-        ts_from: datetime,
-        ts_to: datetime,
-    ) -> List[Dict]:
-        """
-        Return aggregated packet loss events for a host within a time range.
-
-        This method identifies contiguous periods where the packet loss metric
-        (`net.packet_loss.percent`) is greater than zero and groups them into
-        logical events.
-
-        An event starts when the packet loss value transitions from 0 (or NULL)
-        to a value greater than 0, and ends when it returns to 0.
-
-        For each detected event, the following information is returned:
-        - event start timestamp
-        - event end timestamp
-        - event duration in seconds
-        - maximum packet loss percentage during the event
-        - average packet loss percentage during the event
-
-        The underlying SQL query uses window functions (LAG, SUM OVER)
-        to detect event boundaries and aggregate metrics efficiently
-        at the database level.
-
-        Parameters:
-            host (str): Host identifier to filter packet loss events.
-            ts_from (datetime): Start of the time range (inclusive).
-            ts_to (datetime): End of the time range (inclusive).
-
-        Returns:
-            List[Dict]: A list of packet loss events, each with the following keys:
-                - start (datetime): Event start timestamp.
-                - end (datetime): Event end timestamp.
-                - duration_seconds (float): Event duration in seconds.
-                - max_percent (float): Maximum packet loss percentage in the event.
-                - avg_percent (float): Average packet loss percentage in the event.
-        """
-        sql = load_sql("app/sql/internet/packet_loss_events.sql")
-
-        result = await self._session.execute(
-            text(sql),
-            {
-                "host": host,
-                "ts_from": ts_from,
-                "ts_to": ts_to,
-            },
-        )
-
-        return [
-            {
-                "start": row.event_start,
-                "end": row.event_end,
-                "duration_seconds": row.duration_seconds,
-                "max_percent": row.max_packet_loss_percent,
-                "avg_percent": row.avg_packet_loss_percent,
-            }
-            for row in result
-        ]
-
     async def get_last_metric(
         self,
         *,
@@ -144,3 +79,48 @@ class MetricPointRepository:
         )
 
         return result.all()
+
+    async def count_with_prefix(
+        self,
+        *,
+        prefix: str,
+    ) -> int:
+        result = await self._session.exec(
+            select(func.count()).where(
+                MetricPoint.metric.startswith(prefix, autoescape=True)  # type: ignore
+            )
+        )
+        return result.one()
+
+    async def list_metrics_with_prefix(
+        self,
+        *,
+        prefix: str,
+    ) -> Sequence[str]:
+        result = await self._session.exec(
+            select(MetricPoint.metric)
+            .where(MetricPoint.metric.startswith(prefix, autoescape=True))  # type: ignore
+            .distinct()
+        )
+        return result.all()
+
+    async def delete_batch_for_metrics(
+        self,
+        *,
+        metrics: Sequence[str],
+        limit: int,
+    ) -> int:
+        """Delete up to limit points of the given metrics and commit."""
+        batch = (
+            select(MetricPoint.id)
+            .where(MetricPoint.metric.in_(metrics))  # type: ignore
+            .limit(limit)
+            .scalar_subquery()
+        )
+
+        result = await self._session.exec(
+            delete(MetricPoint).where(MetricPoint.id.in_(batch))  # type: ignore
+        )
+        await self._session.commit()
+
+        return result.rowcount
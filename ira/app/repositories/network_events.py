@@ -0,0 +1,106 @@
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import asc
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.entities.network_event import NetworkEvent
+
+
+class NetworkEventRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def list_open_events(self, *, kind: str) -> Sequence[NetworkEvent]:
+        result = await self._session.exec(
+            select(NetworkEvent).where(
+                NetworkEvent.kind == kind,
+                NetworkEvent.closed_at.is_(None),  # type: ignore
+            )
+        )
+        return result.all()
+
+    async def open_event(
+        self,
+        *,
+        host: str,
+        kind: str,
+        ts: datetime,
+        value: float,
+    ) -> NetworkEvent:
+        event = NetworkEvent(
+            host=host,
+            kind=kind,
+            started_at=ts,
+            last_seen_at=ts,
+            samples=1,
+            sum_value=value,
+            max_value=value,
+        )
+
+        self._session.add(event)
+        await self._session.commit()
+        await self._session.refresh(event)
+
+        return event
+
+    async def extend_event(
+        self,
+        *,
+        event_id: int,
+        last_seen_at: datetime,
+        samples: int,
+        sum_value: float,
+        max_value: float,
+    ) -> None:
+        await self._session.exec(
+            update(NetworkEvent)
+            .where(NetworkEvent.id == event_id)
+            .values(
+                last_seen_at=last_seen_at,
+                samples=samples,
+                sum_value=sum_value,
+                max_value=max_value,
+            )
+        )
+        await self._session.commit()
+
+    async def close_event(
+        self,
+        *,
+        event_id: int,
+        closed_at: datetime,
+    ) -> None:
+        await self._session.exec(
+            update(NetworkEvent)
+            .where(NetworkEvent.id == event_id)
+            .values(closed_at=closed_at)
+        )
+        await self._session.commit()
+
+    async def list_events(
+        self,
+        *,
+        host: str,
+        kind: str,
+        ts_from: datetime,
+        ts_to: datetime,
+    ) -> Sequence[NetworkEvent]:
+        """
+        Return events of a host overlapping [ts_from, ts_to], oldest first.
+
+        Served by idx_network_events_host_kind_last_seen, so the cost depends
+        on the number of matching events, not on the length of the range.
+        """
+        result = await self._session.exec(
+            select(NetworkEvent)
+            .where(
+                NetworkEvent.host == host,
+                NetworkEvent.kind == kind,
+                NetworkEvent.last_seen_at >= ts_from,  # type: ignore
+                NetworkEvent.started_at <= ts_to,  # type: ignore
+            )
+            .order_by(asc(NetworkEvent.started_at))  # type: ignore
+        )
+        return result.all()
@@ -1,8 +1,9 @@
-from typing import Sequence, Tuple
+from typing import Any, List, Optional, Sequence, Tuple
 from datetime import datetime, timezone
+from uuid import UUID
 
-from sqlalchemy import desc, func
-from sqlmodel import select
+from sqlalchemy import desc, func, literal, text, tuple_
+from sqlmodel import select, update
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.entities.system_alert import SystemAlert
@@ -12,29 +13,115 @@ class SystemAlertRepository:
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
 
-    async def get_system_alerts(
+    @staticmethod
+    def _filters(
+        *,
+        host: Optional[str],
+        metric: Optional[str],
+        status: Optional[str],
+        level: Optional[str],
+    ) -> List[Any]:
+        conditions: List[Any] = []
+
+        if host is not None:
+            conditions.append(SystemAlert.host == host)
+        if metric is not None:
+            conditions.append(SystemAlert.metric == metric)
+        if status is not None:
+            conditions.append(SystemAlert.status == status)
+        if level is not None:
+            conditions.append(SystemAlert.level == level)
+
+        return conditions
+
+    async def list_system_alerts(
         self,
         *,
         limit: int,
-        offset: int,
-    ) -> Tuple[Sequence[SystemAlert], int]:
+        before: Optional[Tuple[datetime, UUID]] = None,
+        host: Optional[str] = None,
+        metric: Optional[str] = None,
+        status: Optional[str] = None,
+        level: Optional[str] = None,
+    ) -> Sequence[SystemAlert]:
+        """
+        Return alerts ordered by (last_seen_at, id) descending.
+
+        ``before`` is the (last_seen_at, id) of the last row of the previous
+        page; the row comparison is answered by the matching indexes in
+        init.sql, so every page costs the same regardless of its depth.
+        """
+        conditions = self._filters(
+            host=host,
+            metric=metric,
+            status=status,
+            level=level,
+        )
+
+        if before is not None:
+            conditions.append(
+                tuple_(SystemAlert.last_seen_at, SystemAlert.id)
+                < tuple_(literal(before[0]), literal(before[1]))
+            )
+
         result = await self._session.exec(
             select(SystemAlert)
-            .order_by(SystemAlert.last_seen_at.desc())  # type: ignore
-            .offset(offset)
+            .where(*conditions)
+            .order_by(
+                SystemAlert.last_seen_at.desc(),  # type: ignore
+                desc(SystemAlert.id),  # type: ignore
+            )
             .limit(limit)
         )
 
-        alerts = result.all()
+        return result.all()
+
+    async def count_system_alerts(
+        self,
+        *,
+        host: Optional[str] = None,
+        metric: Optional[str] = None,
+        status: Optional[str] = None,
+        level: Optional[str] = None,
+    ) -> int:
+        conditions = self._filters(
+            host=host,
+            metric=metric,
+            status=status,
+            level=level,
+        )
 
-        total_result = await self._session.exec(
-            select(func.count()).select_from(SystemAlert)
+        result = await self._session.exec(
+            select(func.count()).select_from(SystemAlert).where(*conditions)
         )
-        total = total_result.one()
+        return result.one()
 
-        return alerts, total
+    async def estimate_system_alerts(self) -> Optional[int]:
+        """
+        Return the planner's row estimate for system_alerts.
 
-    async def insert_critical(
+        Returns None when the table has not been analyzed yet.
+        """
+        result = await self._session.execute(
+            text(
+                "SELECT reltuples::BIGINT FROM pg_class "
+                "WHERE oid = 'system_alerts'::regclass"
+            )
+        )
+        estimate = result.scalar_one_or_none()
+
+        if estimate is None or estimate < 0:
+            return None
+
+        return int(estimate)
+
+    async def list_active(self) -> Sequence[SystemAlert]:
+        result = await self._session.exec(
+            select(SystemAlert).where(SystemAlert.status == "active")
+        )
+        return result.all()
+
+    async def open_alert(
         self,
         *,
         host: str,
@@ -43,12 +130,14 @@ class SystemAlertRepository:
         value: float,
         threshold: float,
         message: str,
+        rule: Optional[str] = None,
     ) -> SystemAlert:
         now = datetime.now(timezone.utc)
 
         alert = SystemAlert(
             host=host,
             metric=metric,
+            rule=rule,
             level=level,
             value=value,
             threshold=threshold,
@@ -63,3 +152,40 @@ class SystemAlertRepository:
         await self._session.refresh(alert)
 
         return alert
+
+    async def touch_alert(
+        self,
+        *,
+        alert_id: UUID,
+        value: float,
+        last_seen_at: datetime,
+    ) -> None:
+        await self._session.exec(
+            update(SystemAlert)
+            .where(SystemAlert.id == alert_id)
+            .values(value=value, last_seen_at=last_seen_at)
+        )
+        await self._session.commit()
+
+    async def resolve_alert(
+        self,
+        *,
+        alert_id: UUID,
+        value: float,
+        resolved_at: datetime,
+    ) -> None:
+        await self._session.exec(
+            update(SystemAlert)
+            .where(SystemAlert.id == alert_id)
+            .values(
+                value=value,
+                status="resolved",
+                last_seen_at=resolved_at,
+                resolved_at=resolved_at,
+            )
+        )
+        await self._session.commit()
+
+    async def rollback(self) -> None:
+        """Discard a failed write so the session can be used again."""
+        await self._session.rollback()
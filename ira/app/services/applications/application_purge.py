@@ -0,0 +1,254 @@
+"""
+Background purge of deleted applications.
+
+Deleting an application only soft-deletes its row. The purge then removes
+its metrics (``application_metrics`` rows and its ``app.<id>.*`` metric
+points) in bounded batches, each in its own short transaction with a pause
+in between, so neither the HTTP call nor concurrent ingestion waits on a
+multi-million row DELETE. Once no metrics are left the application row and
+its log paths are removed.
+
+The database is the source of truth: an application is pending purge while
+its row is soft-deleted, and its progress is the number of metrics rows it
+has left. Every purge is claimed with a PostgreSQL advisory lock, so only
+one process works on an application at a time, and soft-deleted rows are
+picked up again every ``PURGE_RETRY_SECONDS``, which resumes purges after a
+restart and retries failed ones.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Literal, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import AsyncSessionLocal, engine
+from app.core.logger import get_logger
+from app.core.metrics_buffer import metrics_buffer
+from app.repositories.application_metrics_repository import (
+    ApplicationMetricssRepository,
+)
+from app.repositories.applications import ApplicationRepository
+from app.repositories.metric_point import MetricPointRepository
+
+
+PurgeStatus = Literal["pending", "running", "failed"]
+
+PURGE_BATCH_SIZE = int(os.getenv("IRA_PURGE_BATCH_SIZE", "5000"))
+PURGE_PAUSE_SECONDS = float(os.getenv("IRA_PURGE_PAUSE_SECONDS", "0.2"))
+PURGE_RETRY_SECONDS = float(os.getenv("IRA_PURGE_RETRY_SECONDS", "60"))
+
+logger = get_logger(__name__)
+
+
+def _metric_prefix(application_id: UUID) -> str:
+    return f"app.{application_id}."
+
+
+def _lock_key(application_id: UUID) -> int:
+    # pg advisory locks take a signed 64-bit key.
+    return int.from_bytes(application_id.bytes[:8], "big", signed=True)
+
+
+@dataclass
+class PurgeJob:
+    """A purge run by this process."""
+
+    application_id: UUID
+    status: PurgeStatus = "running"
+    deleted_rows: int = 0
+    started_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class ApplicationPurger:
+    def __init__(
+        self,
+        *,
+        batch_size: int = PURGE_BATCH_SIZE,
+        pause_seconds: float = PURGE_PAUSE_SECONDS,
+        retry_seconds: float = PURGE_RETRY_SECONDS,
+    ) -> None:
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.retry_seconds = retry_seconds
+        # Only purges that are running or failed here; finished ones are
+        # dropped.
+        self._jobs: Dict[UUID, PurgeJob] = {}
+        self._tasks: Dict[UUID, asyncio.Task] = {}
+
+    async def progress(
+        self,
+        session: AsyncSession,
+        application_id: UUID,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Progress of the purge of an application, None once it is gone (or
+        if it was never deleted).
+        """
+        deleted_at = await ApplicationRepository(session).get_deleted_at(
+            application_id=application_id,
+        )
+        if deleted_at is None:
+            return None
+
+        remaining = await ApplicationMetricssRepository(session).count_for_application(
+            application_id=application_id,
+        )
+        remaining += await MetricPointRepository(session).count_with_prefix(
+            prefix=_metric_prefix(application_id),
+        )
+
+        job = self._jobs.get(application_id)
+
+        return {
+            "application_id": application_id,
+            # Pending purges may be running in another process.
+            "status": job.status if job else "pending",
+            "deleted_at": deleted_at,
+            "remaining_rows": remaining,
+            "deleted_rows": job.deleted_rows if job else None,
+            "started_at": job.started_at if job else None,
+            "error": job.error if job else None,
+        }
+
+    def schedule(self, application_id: UUID) -> None:
+        task = self._tasks.get(application_id)
+        if task is not None and not task.done():
+            return
+
+        self._tasks[application_id] = asyncio.create_task(self._run(application_id))
+
+    async def run(self) -> None:
+        """Pick up soft-deleted applications: interrupted and failed purges."""
+        while True:
+            try:
+                async with AsyncSessionLocal() as session:
+                    pending = await ApplicationRepository(session).list_deleted_ids()
+
+                for application_id in pending:
+                    self.schedule(application_id)
+
+                # Failures of purges another process has since finished.
+                for application_id in set(self._jobs) - set(pending):
+                    self._jobs.pop(application_id, None)
+
+            except Exception:
+                logger.exception("application purge tick failed")
+
+            await asyncio.sleep(self.retry_seconds)
+
+    def shutdown(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+
+    async def _run(self, application_id: UUID) -> None:
+        try:
+            async with engine.connect() as lock_connection:
+                key = _lock_key(application_id)
+                claimed = await lock_connection.scalar(
+                    select(func.pg_try_advisory_lock(key))
+                )
+                # Session-level lock: end the transaction so the connection
+                # does not sit idle in it for the whole purge.
+                await lock_connection.commit()
+                if not claimed:
+                    # Another process is purging it.
+                    return
+
+                try:
+                    await self._purge(application_id)
+                finally:
+                    await lock_connection.scalar(select(func.pg_advisory_unlock(key)))
+                    await lock_connection.commit()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("failed to claim purge of application %s", application_id)
+        finally:
+            self._tasks.pop(application_id, None)
+
+    async def _delete_batches(
+        self,
+        job: PurgeJob,
+        delete_batch: Callable[[AsyncSession], Awaitable[int]],
+    ) -> None:
+        while True:
+            async with AsyncSessionLocal() as session:
+                deleted = await delete_batch(session)
+
+            job.deleted_rows += deleted
+            if deleted < self.batch_size:
+                return
+
+            await asyncio.sleep(self.pause_seconds)
+
+    async def _purge(self, application_id: UUID) -> None:
+        job = PurgeJob(
+            application_id=application_id,
+            started_at=datetime.now(timezone.utc),
+        )
+        self._jobs[application_id] = job
+
+        prefix = _metric_prefix(application_id)
+
+        try:
+            await self._delete_batches(
+                job,
+                lambda session: ApplicationMetricssRepository(
+                    session
+                ).delete_batch_for_application(
+                    application_id=application_id,
+                    limit=self.batch_size,
+                ),
+            )
+
+            # LIKE cannot use the (metric, ts) index, so the metric names are
+            # looked up once and the batches delete them by name.
+            async with AsyncSessionLocal() as session:
+                metrics = await MetricPointRepository(session).list_metrics_with_prefix(
+                    prefix=prefix,
+                )
+            if metrics:
+                await self._delete_batches(
+                    job,
+                    lambda session: MetricPointRepository(
+                        session
+                    ).delete_batch_for_metrics(
+                        metrics=metrics,
+                        limit=self.batch_size,
+                    ),
+                )
+
+            async with AsyncSessionLocal() as session:
+                await ApplicationRepository(session).purge(
+                    application_id=application_id,
+                )
+
+        except asyncio.CancelledError:
+            self._jobs.pop(application_id, None)
+            raise
+        except Exception as exc:
+            # Kept until the next pass retries it.
+            logger.exception("purge of application %s failed", application_id)
+            job.status = "failed"
+            job.error = str(exc)
+            return
+
+        self._jobs.pop(application_id, None)
+        metrics_buffer.drop_series(prefix=prefix)
+
+        logger.info(
+            "purged application %s (%d metrics rows)",
+            application_id,
+            job.deleted_rows,
+        )
+
+
+application_purger = ApplicationPurger()
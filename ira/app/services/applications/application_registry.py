@@ -0,0 +1,167 @@
+"""
+Process-wide cache of registered applications and their log base paths.
+
+The registry is loaded with two queries the first time it is read and then
+served from memory. ApplicationsService invalidates it on every create,
+update and delete, and publishes a Postgres NOTIFY so other workers drop
+their copy too. Runtime fields (status, pid, port, last_seen_at) are kept
+current by the application metrics scheduler of each worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_database_dsn
+from app.core.logger import get_logger
+from app.models.dto.application_metrics_create_dto import ApplicationMetricsCreateDTO
+from app.models.entities.application import Application
+from app.repositories.applications import ApplicationRepository
+from app.repositories.logs import ApplicationLogRepository
+
+
+NOTIFY_CHANNEL = "ira_applications"
+LISTEN_RETRY_SECONDS = 5
+
+logger = get_logger(__name__)
+
+
+class ApplicationRegistry:
+    def __init__(self) -> None:
+        # Ordered like ApplicationRepository.list_all (newest first).
+        self._applications: Dict[UUID, Application] = {}
+        self._log_base_paths: Dict[UUID, List[str]] = {}
+        self._with_log_paths: Set[UUID] = set()
+        self._generation = 0
+        self._loaded_generation = -1
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._generation += 1
+
+    async def _ensure_loaded(self, session: AsyncSession) -> None:
+        if self._loaded_generation == self._generation:
+            return
+
+        async with self._lock:
+            generation = self._generation
+            if self._loaded_generation == generation:
+                return
+
+            applications = await ApplicationRepository(session).list_all()
+            log_paths = await ApplicationLogRepository(session).list_all()
+
+            # Detached copies, so request sessions never share these objects.
+            self._applications = {
+                application.id: Application.model_validate(application.model_dump())
+                for application in applications
+            }
+            self._log_base_paths = {}
+            self._with_log_paths = set()
+
+            for log_path in log_paths:
+                self._with_log_paths.add(log_path.application_id)
+                if log_path.enabled:
+                    self._log_base_paths.setdefault(
+                        log_path.application_id, []
+                    ).append(log_path.base_path)
+
+            # A change during the load leaves the registry stale for the next read.
+            self._loaded_generation = generation
+
+            logger.debug("application registry loaded %d applications", len(applications))
+
+    async def list_all(self, session: AsyncSession) -> List[Application]:
+        await self._ensure_loaded(session)
+        return list(self._applications.values())
+
+    async def list_enabled(self, session: AsyncSession) -> List[Application]:
+        await self._ensure_loaded(session)
+        return [app for app in self._applications.values() if app.enabled]
+
+    async def list_with_log_paths(self, session: AsyncSession) -> List[Application]:
+        await self._ensure_loaded(session)
+        return [
+            app for app in self._applications.values() if app.id in self._with_log_paths
+        ]
+
+    async def get_log_base_paths(
+        self,
+        session: AsyncSession,
+        *,
+        application_id: UUID,
+    ) -> List[str]:
+        await self._ensure_loaded(session)
+        return list(self._log_base_paths.get(application_id, ()))
+
+    def apply_runtime_states(
+        self,
+        metrics: Iterable[ApplicationMetricsCreateDTO],
+        *,
+        seen_at: datetime,
+    ) -> None:
+        """Mirror the runtime fields just written by store_metrics_bulk."""
+        for metric in metrics:
+            application = self._applications.get(metric.application_id)
+            if application is None or not application.enabled:
+                continue
+
+            application.status = metric.status
+            application.pid = metric.pid
+            application.port = metric.port
+            application.last_seen_at = seen_at
+
+    async def publish_change(self, session: AsyncSession) -> None:
+        """Invalidate this registry and notify the other workers."""
+        self.invalidate()
+
+        try:
+            await session.execute(
+                text("SELECT pg_notify(:channel, '')"),
+                {"channel": NOTIFY_CHANNEL},
+            )
+            await session.commit()
+        except Exception:
+            logger.exception("failed to publish application registry change")
+
+    async def listen(self) -> None:
+        """
+        Invalidate the registry on NOTIFY from other workers.
+
+        Runs for the lifetime of the process on a dedicated connection and
+        reconnects on failure; notifications missed while disconnected are
+        covered by invalidating again after every (re)connect.
+        """
+        dsn = get_database_dsn().replace("postgresql+asyncpg://", "postgresql://", 1)
+
+        while True:
+            connection: Optional[asyncpg.Connection] = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                await connection.add_listener(
+                    NOTIFY_CHANNEL,
+                    lambda *_: self.invalidate(),
+                )
+                self.invalidate()
+
+                while not connection.is_closed():
+                    await asyncio.sleep(LISTEN_RETRY_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("application registry listener failed")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+            await asyncio.sleep(LISTEN_RETRY_SECONDS)
+
+
+application_registry = ApplicationRegistry()
@@ -1,24 +1,25 @@
-from typing import List, Sequence
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import UUID
 
 from app.models.dto.application_logs_dto import ApplicationsLogsDTO
 from app.models.entities.application import Application
-from app.models.entities.application_log import ApplicationLogPath
-from app.models.entities.application_metrics import ApplicationMetrics
 from app.models.requests.create_application_request import CreateApplicationRequest
 from app.models.requests.update_application_request import UpdateApplicationRequest
 from app.repositories.applications import ApplicationRepository
+from app.services.applications.application_purge import application_purger
+from app.services.applications.application_registry import application_registry
 from app.services.logs_service import ApplicationLogsService
 from app.extensions.ai_chat.tools.registry import tool_class
-from sqlmodel import delete, select
+from sqlmodel import select
 
 
-@tool_class(name_prefix="applications")
+@tool_class(name_prefix="applications", exclude=["get_purge_progress"])
 class ApplicationsService:
     def __init__(self, session) -> None:
         self._session = session
         self.applications_repository = ApplicationRepository(session)
         self._logs_service = ApplicationLogsService(session)
+        self._registry = application_registry
 
     def build_application_identifier(
         self,
@@ -56,41 +57,43 @@ class ApplicationsService:
                 workdir=data.cwd,
             )
 
+        await self._registry.publish_change(self._session)
+
         return application.id
     
 
 
     async def list_applications(self) -> Sequence[Application]:
-        return await self.applications_repository.list_all()
+        return await self._registry.list_all(self._session)
 
     async def delete_application(
         self,
         *,
         application_id: UUID,
     ) -> bool:
-        result = await self._session.exec(
-            select(Application).where(Application.id == application_id)
+        """
+        Delete an application.
+
+        The application is soft-deleted immediately and its metrics are
+        purged in background, see application_purge.
+        """
+        deleted = await self.applications_repository.mark_deleted(
+            application_id=application_id,
         )
-        application = result.first()
-        if not application:
+        if not deleted:
             return False
 
-        await self._session.exec(
-            delete(ApplicationMetrics).where(
-                ApplicationMetrics.application_id == application_id
-            )
-        )
-        await self._session.exec(
-            delete(ApplicationLogPath).where(
-                ApplicationLogPath.application_id == application_id
-            )
-        )
-        await self._session.exec(
-            delete(Application).where(Application.id == application_id)
-        )
-        await self._session.commit()
+        await self._registry.publish_change(self._session)
+        application_purger.schedule(application_id)
         return True
 
+    async def get_purge_progress(
+        self,
+        *,
+        application_id: UUID,
+    ) -> Optional[Dict[str, Any]]:
+        return await application_purger.progress(self._session, application_id)
+
     async def update_application(
         self,
         *,
@@ -98,7 +101,10 @@ class ApplicationsService:
         data: UpdateApplicationRequest,
     ) -> Application | None:
         result = await self._session.exec(
-            select(Application).where(Application.id == application_id)
+            select(Application).where(
+                Application.id == application_id,
+                Application.deleted_at.is_(None),  # type: ignore
+            )
         )
         application = result.first()
         if not application:
@@ -108,17 +114,19 @@ class ApplicationsService:
         self._session.add(application)
         await self._session.commit()
         await self._session.refresh(application)
+        await self._registry.publish_change(self._session)
         return application
 
     async def applications_lists(
         self,
     ) -> Sequence[ApplicationsLogsDTO]:
-        applications = await self.applications_repository.list_all()
+        applications = await self._registry.list_all(self._session)
         result: List[ApplicationsLogsDTO] = []
 
         for application in applications:
-            base_paths = await self._logs_service.get_application_log_base_paths(
-                application_id=application.id
+            base_paths = await self._registry.get_log_base_paths(
+                self._session,
+                application_id=application.id,
             )
 
             result.append(
@@ -141,12 +149,13 @@ class ApplicationsService:
     async def applications_list_with_path_logs(
         self,
     ) -> Sequence[ApplicationsLogsDTO]:
-        applications = await self.applications_repository.applications_with_path_logs()
+        applications = await self._registry.list_with_log_paths(self._session)
         result: List[ApplicationsLogsDTO] = []
 
         for application in applications:
-            base_paths = await self._logs_service.get_application_log_base_paths(
-                application_id=application.id
+            base_paths = await self._registry.get_log_base_paths(
+                self._session,
+                application_id=application.id,
             )
 
             result.append(
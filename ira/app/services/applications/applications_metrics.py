@@ -2,7 +2,6 @@ from datetime import datetime, timedelta, timezone
 from typing import Iterable
 from uuid import UUID
 
-from sqlalchemy import func
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -14,16 +13,21 @@ from app.models.entities.application_metrics import ApplicationMetrics
 from app.repositories.application_metrics_repository import (
     ApplicationMetricssRepository,
 )
+from app.repositories.applications import ApplicationRepository
 from app.services.collector.application_collector import collect_application_metrics
 
 MAX_RANGE = timedelta(hours=6)
 DEFAULT_STEP_SECONDS = 5
 
+# An unchanged application only gets last_seen_at refreshed this often.
+LAST_SEEN_REFRESH = timedelta(seconds=60)
+
 
 class ApplicationMetricsService:
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
         self._repo = ApplicationMetricssRepository(session)
+        self._applications = ApplicationRepository(session)
 
     async def store_metric(
         self,
@@ -60,22 +64,8 @@ class ApplicationMetricsService:
         if not metrics_list:
             return
 
-        application_ids = {m.application_id for m in metrics_list}
-        applications = await self._get_enabled_applications(application_ids)
-
-        db_metrics: list[ApplicationMetrics] = []
-
-        for metric in metrics_list:
-            application = applications.get(metric.application_id)
-            if not application:
-                continue
-
-            application.last_seen_at = ts
-            application.status = metric.status
-            application.pid = getattr(metric, "pid", None)
-            application.port = getattr(metric, "port", None)
-
-            db_metrics.append(
+        await self._repo.insert_many_for_enabled(
+            [
                 ApplicationMetrics(
                     application_id=metric.application_id,
                     ts=ts,
@@ -87,9 +77,20 @@ class ApplicationMetricsService:
                     restart_count=metric.restart_count,
                     status=metric.status,
                 )
-            )
+                for metric in metrics_list
+            ]
+        )
+
+        await self._applications.update_runtime_states(
+            [
+                (metric.application_id, metric.status, metric.pid, metric.port)
+                for metric in metrics_list
+            ],
+            seen_at=ts,
+            stale_before=ts - LAST_SEEN_REFRESH,
+        )
 
-        await self._repo.insert_many(db_metrics)
+        await self._session.commit()
 
     async def list_metrics(
         self,
@@ -232,35 +233,10 @@ class ApplicationMetricsService:
         *,
         enabled_only: bool = True,
     ) -> list[dict]:
-        max_ts_subq = (
-            select(
-                ApplicationMetrics.application_id,
-                func.max(ApplicationMetrics.ts).label("max_ts"),
-            )
-            .group_by(ApplicationMetrics.application_id)
-            .subquery()
+        rows = await self._repo.list_latest_per_application(
+            enabled_only=enabled_only,
         )
 
-        statement = (
-            select(Application, ApplicationMetrics)
-            .join(
-                max_ts_subq,
-                max_ts_subq.c.application_id == Application.id,
-                isouter=True,
-            )
-            .join(
-                ApplicationMetrics,
-                (ApplicationMetrics.application_id == max_ts_subq.c.application_id)
-                & (ApplicationMetrics.ts == max_ts_subq.c.max_ts),
-                isouter=True,
-            )
-        )
-
-        if enabled_only:
-            statement = statement.where(Application.enabled.is_(True))  # type: ignore
-
-        rows = (await self._session.exec(statement)).all()
-
         snapshots: list[dict] = []
         for application, metric in rows:
             snapshots.append(
@@ -301,17 +277,3 @@ class ApplicationMetricsService:
         statement = select(Application).where(Application.id == application_id)
         result = await self._session.exec(statement)
         return result.one()
-
-    async def _get_enabled_applications(
-        self,
-        application_ids: set[UUID],
-    ) -> dict[UUID, Application]:
-        statement = select(Application).where(
-            Application.id.in_(application_ids),  # type: ignore
-            Application.enabled.is_(True),  # type: ignore
-        )
-
-        result = await self._session.exec(statement)
-        applications = result.all()
-
-        return {app.id: app for app in applications}
@@ -1,14 +1,23 @@
 from datetime import datetime
-from typing import List, Dict
+from typing import Iterable, List, Dict
 
-from app.repositories.metric_point import MetricPointRepository
+from app.models.dto.metric_point_dto import MetricPointDTO
+from app.repositories.network_events import NetworkEventRepository
+from app.services.internet.packet_loss_tracker import (
+    PACKET_LOSS_EVENT,
+    packet_loss_tracker,
+)
 from app.extensions.ai_chat.tools.registry import tool_class
 
 
-@tool_class(name_prefix="internet_events")
+@tool_class(name_prefix="internet_events", exclude=["record_packet_loss"])
 class InternetEventsService:
-    def __init__(self, repository: MetricPointRepository) -> None:
-        self._repository = repository
+    def __init__(self, session) -> None:
+        self._repository = NetworkEventRepository(session)
+
+    async def record_packet_loss(self, points: Iterable[MetricPointDTO]) -> None:
+        """Feed a collected batch of metric points to the event tracker."""
+        await packet_loss_tracker.observe(self._repository, points)
 
     async def get_packet_loss_events(
         self,
@@ -20,10 +29,10 @@ class InternetEventsService:
         """
         Return packet loss events for a host within a given time range.
 
-        This method delegates the detection and aggregation of packet loss
-        events to the metrics repository. It acts as a domain-level entry
-        point for Internet-related events, without exposing SQL or storage
-        details to upper layers.
+        Events are detected while metrics are collected and stored in the
+        network_events table, so this only reads the events overlapping the
+        range. An event still in progress is returned with its latest sample
+        as end.
 
         Parameters:
             host (str): Host identifier.
@@ -31,10 +40,29 @@ class InternetEventsService:
             ts_to (datetime): End of the time range (inclusive).
 
         Returns:
-            List[Dict]: A list of packet loss events with aggregated data.
+            List[Dict]: A list of packet loss events, each with the following keys:
+                - start (datetime): Event start timestamp.
+                - end (datetime): Timestamp of the last lossy sample.
+                - duration_seconds (float): Event duration in seconds.
+                - max_percent (float): Maximum packet loss percentage in the event.
+                - avg_percent (float): Average packet loss percentage in the event.
         """
-        return await self._repository.list_packet_loss_events(
+        events = await self._repository.list_events(
             host=host,
+            kind=PACKET_LOSS_EVENT,
             ts_from=ts_from,
             ts_to=ts_to,
         )
+
+        return [
+            {
+                "start": event.started_at,
+                "end": event.last_seen_at,
+                "duration_seconds": (
+                    event.last_seen_at - event.started_at
+                ).total_seconds(),
+                "max_percent": event.max_value,
+                "avg_percent": event.sum_value / event.samples,
+            }
+            for event in events
+        ]
@@ -0,0 +1,119 @@
+"""
+Streaming detection of packet-loss events.
+
+Fed with every collected batch of metric points, the tracker opens a
+``packet_loss`` network event on the first non-zero ``net.packet_loss.percent``
+sample of a host and closes it on the next zero sample, keeping the running
+aggregates (samples, sum, max) on the open row. Queries then read finished
+events instead of re-deriving them from raw points.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable
+
+from app.core.logger import get_logger
+from app.models.dto.metric_point_dto import MetricPointDTO
+from app.models.entities.metric_point import MetricName
+from app.repositories.network_events import NetworkEventRepository
+
+
+PACKET_LOSS_EVENT = "packet_loss"
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class OpenEvent:
+    id: int
+    last_seen_at: datetime
+    samples: int
+    sum_value: float
+    max_value: float
+
+
+class PacketLossEventTracker:
+    def __init__(self) -> None:
+        self._open: Dict[str, OpenEvent] = {}
+        self._restored = False
+
+    async def restore(self, repository: NetworkEventRepository) -> None:
+        """Resume events left open by a previous process. Runs once."""
+        if self._restored:
+            return
+
+        for event in await repository.list_open_events(kind=PACKET_LOSS_EVENT):
+            self._open[event.host] = OpenEvent(
+                id=event.id,  # type: ignore[arg-type]
+                last_seen_at=event.last_seen_at,
+                samples=event.samples,
+                sum_value=event.sum_value,
+                max_value=event.max_value,
+            )
+
+        self._restored = True
+
+    async def observe(
+        self,
+        repository: NetworkEventRepository,
+        points: Iterable[MetricPointDTO],
+    ) -> None:
+        await self.restore(repository)
+
+        for point in points:
+            if point["metric"] != MetricName.NET_PACKET_LOSS.value:
+                continue
+
+            host = point["host"]
+            ts = point["ts"]
+            value = float(point["value"])
+            event = self._open.get(host)
+
+            if event is not None and ts <= event.last_seen_at:
+                continue
+
+            if value > 0:
+                if event is None:
+                    row = await repository.open_event(
+                        host=host,
+                        kind=PACKET_LOSS_EVENT,
+                        ts=ts,
+                        value=value,
+                    )
+                    self._open[host] = OpenEvent(
+                        id=row.id,  # type: ignore[arg-type]
+                        last_seen_at=ts,
+                        samples=1,
+                        sum_value=value,
+                        max_value=value,
+                    )
+                    logger.info("Packet loss event started on %s", host)
+                    continue
+
+                event.last_seen_at = ts
+                event.samples += 1
+                event.sum_value += value
+                event.max_value = max(event.max_value, value)
+
+                await repository.extend_event(
+                    event_id=event.id,
+                    last_seen_at=event.last_seen_at,
+                    samples=event.samples,
+                    sum_value=event.sum_value,
+                    max_value=event.max_value,
+                )
+                continue
+
+            if event is not None:
+                await repository.close_event(event_id=event.id, closed_at=ts)
+                del self._open[host]
+                logger.info(
+                    "Packet loss event on %s closed after %d samples",
+                    host,
+                    event.samples,
+                )
+
+
+packet_loss_tracker = PacketLossEventTracker()
@@ -1,4 +1,7 @@
-from typing import Dict, List, Optional, Sequence, Set
+import asyncio
+from contextlib import AsyncExitStack
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
 from uuid import UUID
 from pathlib import Path
 
@@ -7,20 +10,31 @@ from sqlalchemy.exc import IntegrityError
 
 from app.core.logger import get_logger
 from app.extensions.ai_chat.tools.registry import tool_class
+from app.modules.logs.download import LogDownload, prepare_download
 from app.modules.logs.inspector import list_log_files
+from app.modules.logs.merge import MergedLine, MergedTail, read_merged_history
+from app.modules.logs.offset_index import read_time_range, to_epoch
 from app.modules.logs.reader import read_last_lines
-from app.modules.logs.resolver import resolve_log_files
-from app.modules.logs.tail import tail_file
+from app.modules.logs.resolver import log_file_allowlist
+from app.modules.logs.search_index import log_search_indexes
+from app.modules.logs.stream import (
+    LOG_FRAME_INTERVAL_MS,
+    LOG_FRAME_MAX_EVENTS,
+    LogFrameWriter,
+)
+from app.modules.logs.tailer import log_tailers
 from app.modules.scanner.logs import detect_log_base_paths, detect_log_paths
 from app.repositories.logs import ApplicationLogRepository
-from app.utils.logs_parser import parse_log_line, passes_filters
+from app.services.applications.application_registry import application_registry
+from app.utils.logs_parser import LogLineFilter, parse_log_line, parse_log_lines
 
 logger = get_logger()
 
 
-@tool_class(name_prefix="logs")
+@tool_class(name_prefix="logs", exclude=["download_application_log_file"])
 class ApplicationLogsService:
     def __init__(self, session) -> None:
+        self._session = session
         self._repo = ApplicationLogRepository(session)
 
 
@@ -30,7 +44,7 @@ class ApplicationLogsService:
         application_id: UUID,
         workdir: str,
     ) -> None:
-        base_paths = detect_log_base_paths(workdir)
+        base_paths = await asyncio.to_thread(detect_log_base_paths, workdir)
 
         await self.attach_log_base_paths(
             application_id=application_id,
@@ -43,7 +57,7 @@ class ApplicationLogsService:
         application_id: UUID,
         base_paths: list[str],
     ) -> None:
-        session = self._repo._session
+        session = self._session
 
         for base_path in base_paths:
             try:
@@ -65,85 +79,165 @@ class ApplicationLogsService:
         application_id: UUID,
         file_path: str,
         websocket: WebSocket,
-        poll_interval: float = 0.5,
         history_limit: int = 200,
         levels: Optional[str] = None,
         search: Optional[str] = None,
     ) -> None:
         await websocket.accept()
 
-        allowed_base_paths = await self._repo.list_active_base_paths(
-            application_id=application_id,
-        )
-
         requested = Path(file_path).resolve()
 
         if not requested.exists() or not requested.is_file():
             await websocket.close(code=4000)
             return
 
-        if not self._is_allowed_file(
+        if not await self._is_allowed_file(
+            application_id=application_id,
             requested=requested,
-            allowed_base_paths=allowed_base_paths,
         ):
             await websocket.close(code=4001)
             return
 
-        allowed_levels: Optional[Set[str]] = None
-        if levels:
-            allowed_levels = {
-                level.strip().lower() for level in levels.split(",") if level.strip()
-            }
+        line_filter = LogLineFilter(levels=levels, search=search)
+
+        # Subscribe before reading history so no line is lost in between.
+        async with log_tailers.subscribe(str(requested)) as subscription:
+            # History ends where the live tail starts, so no line is sent
+            # twice. Compressed rotations are not tailed: all of it is history.
+            history = await asyncio.to_thread(
+                read_last_lines,
+                str(requested),
+                history_limit,
+                end_offset=(
+                    None if subscription.tailer.compressed else subscription.start_offset
+                ),
+            )
 
-        search_term = search.lower() if search else None
+            # Lines that cannot match are dropped before they are parsed.
+            history = [line for line in history if line_filter.accepts_raw(line)]
 
-        history = read_last_lines(
-            path=str(requested),
-            limit=history_limit,
-        )
+            frames = LogFrameWriter(websocket, source={"path": str(requested)})
+            events: List[Dict] = []
 
-        for line in history:
-            event = self._build_log_event(
-                raw_line=line,
-                path=str(requested),
-                event_type="history",
-            )
+            for message, level, timestamp, context in parse_log_lines(history):
+                if not message:
+                    continue
 
-            if not event:
-                continue
+                if not line_filter.accepts(level=level, message=message):
+                    continue
 
-            if not passes_filters(
-                level=event["level"],
-                message=event["message"],
-                allowed_levels=allowed_levels,
-                search_term=search_term,
-            ):
-                continue
+                events.append(
+                    {
+                        "path": str(requested),
+                        "message": message,
+                        "level": level,
+                        "timestamp": timestamp.isoformat() if timestamp else None,
+                        "context": context,
+                        "type": "history",
+                    }
+                )
 
-            await websocket.send_json(event)
+            await frames.send(events, limited=False)
 
-        async for line in tail_file(
-            path=str(requested),
-            interval=poll_interval,
-        ):
-            event = self._build_log_event(
-                raw_line=line,
-                path=str(requested),
-                event_type="live",
-            )
+            dropped = 0
+            while True:
+                batch = await subscription.next_batch(
+                    max_items=LOG_FRAME_MAX_EVENTS,
+                    linger=LOG_FRAME_INTERVAL_MS / 1000,
+                )
 
-            if not event:
-                continue
+                # Lines the tailer discarded because this viewer fell behind.
+                frames.drop(subscription.dropped - dropped)
+                dropped = subscription.dropped
+
+                events = [
+                    {
+                        "path": str(requested),
+                        "message": tailed.message,
+                        "level": tailed.level,
+                        "timestamp": tailed.timestamp.isoformat()
+                        if tailed.timestamp
+                        else None,
+                        "context": tailed.context,
+                        "type": "live",
+                        "offset": tailed.offset,
+                    }
+                    for tailed in batch
+                    if tailed.message
+                    and line_filter.accepts(level=tailed.level, message=tailed.message)
+                ]
+
+                await frames.send(events)
+
+    async def stream_application_logs(
+        self,
+        *,
+        application_id: UUID,
+        websocket: WebSocket,
+        history_limit: int = 200,
+        levels: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> None:
+        """
+        Stream every current log file of an application as one timeline:
+        history and live lines are merged by timestamp across files.
+        """
+        await websocket.accept()
 
-            if not passes_filters(
-                level=event["level"],
-                message=event["message"],
-                allowed_levels=allowed_levels,
-                search_term=search_term,
-            ):
-                continue
+        base_paths = await application_registry.get_log_base_paths(
+            self._session,
+            application_id=application_id,
+        )
+        files = await asyncio.to_thread(log_file_allowlist.current_files, base_paths)
+
+        if not files:
+            await websocket.close(code=4000)
+            return
+
+        line_filter = LogLineFilter(levels=levels, search=search)
 
-            await websocket.send_json(event)
+        async with AsyncExitStack() as stack:
+            # Subscribe before reading history so no line is lost in between.
+            subscriptions = {
+                path: await stack.enter_async_context(log_tailers.subscribe(path))
+                for path in files
+            }
+
+            history = await asyncio.to_thread(
+                read_merged_history,
+                {
+                    path: None if subscription.tailer.compressed else subscription.start_offset
+                    for path, subscription in subscriptions.items()
+                },
+                history_limit,
+                line_filter,
+            )
+
+            frames = LogFrameWriter(
+                websocket,
+                source={"application_id": str(application_id)},
+            )
+            await frames.send(
+                [self._merged_event(line, "history") for line in history],
+                limited=False,
+            )
+
+            merged = MergedTail(subscriptions, linger=LOG_FRAME_INTERVAL_MS / 1000)
+            async with merged:
+                dropped = 0
+                while True:
+                    batch = await merged.next_batch()
+
+                    frames.drop(merged.dropped - dropped)
+                    dropped = merged.dropped
+
+                    await frames.send(
+                        [
+                            self._merged_event(line, "live")
+                            for line in batch
+                            if line_filter.accepts(level=line.level, message=line.message)
+                        ]
+                    )
 
     async def get_application_log_files(
         self,
@@ -184,21 +278,126 @@ class ApplicationLogsService:
         file_path: str,
         limit: int = 200,
     ) -> List[str]:
-        allowed_base_paths = await self._repo.list_active_base_paths(
+        requested = Path(file_path).resolve()
+
+        if not await self._is_allowed_file(
             application_id=application_id,
+            requested=requested,
+        ):
+            return []
+
+        return await asyncio.to_thread(
+            read_last_lines,
+            str(requested),
+            limit,
         )
 
+    async def download_application_log_file(
+        self,
+        *,
+        application_id: UUID,
+        file_path: str,
+        range_header: Optional[str] = None,
+        compress: bool = False,
+    ) -> Optional[LogDownload]:
+        """Stream an allowlisted log file, optionally a byte range or gzipped."""
         requested = Path(file_path).resolve()
 
-        for base_path in allowed_base_paths:
-            for log_file in resolve_log_files(base_path):
-                if Path(log_file).resolve() == requested:
-                    return read_last_lines(
-                        path=log_file,
-                        limit=limit,
-                    )
+        if not await self._is_allowed_file(
+            application_id=application_id,
+            requested=requested,
+        ):
+            return None
+
+        return await asyncio.to_thread(
+            prepare_download,
+            str(requested),
+            range_header=range_header,
+            compress=compress,
+        )
+
+    async def get_application_log_file_range(
+        self,
+        *,
+        application_id: UUID,
+        file_path: str,
+        ts_from: datetime,
+        ts_to: datetime,
+        limit: int = 1000,
+        after_offset: Optional[int] = None,
+    ) -> Dict:
+        """
+        Return the lines of a log file written between ts_from and ts_to.
+
+        Pass the returned next_offset as after_offset to get the next page.
+        """
+        if to_epoch(ts_from) > to_epoch(ts_to):
+            raise ValueError("ts_from must be before ts_to")
+
+        requested = Path(file_path).resolve()
+
+        if not await self._is_allowed_file(
+            application_id=application_id,
+            requested=requested,
+        ):
+            return {"items": [], "next_offset": None}
+
+        result = await asyncio.to_thread(
+            read_time_range,
+            str(requested),
+            ts_from=ts_from,
+            ts_to=ts_to,
+            limit=limit,
+            after_offset=after_offset,
+        )
 
-        return []
+        items: List[Dict] = []
+        for line in result["items"]:
+            event = self._build_log_event(
+                raw_line=line["line"],
+                path=str(requested),
+                event_type="range",
+            )
+            if not event:
+                continue
+
+            event["offset"] = line["offset"]
+            items.append(event)
+
+        return {
+            "items": items,
+            "next_offset": result["next_offset"],
+        }
+
+    async def search_logs(
+        self,
+        *,
+        query: str,
+        application_id: Optional[UUID] = None,
+        ts_from: Optional[datetime] = None,
+        ts_to: Optional[datetime] = None,
+        levels: Optional[str] = None,
+        limit: int = 50,
+    ) -> Dict:
+        """
+        Full-text search over the indexed logs, best matches first.
+
+        Searches one application, or every application when application_id
+        is not given. Only lines indexed by the log index scheduler are found.
+        """
+        return await asyncio.to_thread(
+            log_search_indexes.search,
+            query,
+            application_id=application_id,
+            ts_from=ts_from,
+            ts_to=ts_to,
+            levels=[
+                level.strip().lower() for level in levels.split(",") if level.strip()
+            ]
+            if levels
+            else None,
+            limit=limit,
+        )
 
     async def get_application_log_base_paths(
         self,
@@ -230,14 +429,33 @@ class ApplicationLogsService:
             "type": event_type,
         }
 
-    def _is_allowed_file(
+    @staticmethod
+    def _merged_event(line: MergedLine, event_type: str) -> Dict:
+        event = {
+            "path": line.path,
+            "message": line.message,
+            "level": line.level,
+            "timestamp": line.timestamp.isoformat() if line.timestamp else None,
+            "context": line.context,
+            "type": event_type,
+        }
+        if line.offset is not None:
+            event["offset"] = line.offset
+        return event
+
+    async def _is_allowed_file(
         self,
         *,
+        application_id: UUID,
         requested: Path,
-        allowed_base_paths: Sequence[str],
     ) -> bool:
-        for base_path in allowed_base_paths:
-            for log_file in resolve_log_files(base_path):
-                if Path(log_file).resolve() == requested:
-                    return True
-        return False
+        base_paths = await application_registry.get_log_base_paths(
+            self._session,
+            application_id=application_id,
+        )
+
+        return await asyncio.to_thread(
+            log_file_allowlist.is_allowed,
+            requested,
+            base_paths,
+        )
@@ -3,6 +3,7 @@ from typing import Dict, List
 
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.metrics_buffer import metrics_buffer
 from app.models.dto.metric_point_dto import MetricPointDTO
 from app.models.entities.metric_point import MetricPoint
 from app.modules.processes.top.system import load_average
@@ -13,7 +14,7 @@ from app.services.internet.internet_metrics_service import InternetMetricsServic
 from app.extensions.ai_chat.tools.registry import tool_class
 
 
-@tool_class(name_prefix="metrics")
+@tool_class(name_prefix="metrics", exclude=["store_points"])
 class SystemMetricsService:
     def __init__(self, session: AsyncSession) -> None:
         self._repo = MetricPointRepository(session)
@@ -127,6 +128,11 @@ class SystemMetricsService:
             )
         )
 
+        await self.store_points(rows)
+
+        return rows
+
+    async def store_points(self, rows: List[MetricPointDTO]) -> None:
         entities = [
             MetricPoint(
                 ts=row["ts"],
@@ -139,8 +145,6 @@ class SystemMetricsService:
 
         await self._repo.bulk_insert(entities)
 
-        return rows
-
     async def get_metric_series(
         self,
         *,
@@ -152,6 +156,15 @@ class SystemMetricsService:
         if ts_from >= ts_to:
             raise ValueError("ts_from must be earlier than ts_to")
 
+        buffered = metrics_buffer.get_series(
+            metric=metric,
+            host=host,
+            ts_from=ts_from,
+            ts_to=ts_to,
+        )
+        if buffered is not None:
+            return buffered
+
         rows = await self._repo.list_series(
             metric=metric,
             host=host,
@@ -0,0 +1,346 @@
+"""
+Windowed alert rules evaluated against the in-memory metrics buffer.
+
+A rule aggregates every series matching its metric pattern over a trailing
+window (``avg``, ``min``, ``max``, ``last`` or counter ``rate`` per second)
+and compares the result with a threshold. Rules are read from the
+``alerts.rules`` section of the IRA config; ``DEFAULT_ALERT_RULES`` is used
+when that section is missing.
+
+Each tick, matching series are resolved once per buffer layout change and
+every (series, aggregation, window) aggregate is computed at most once, no
+matter how many rules share it, so large rule sets stay cheap.
+"""
+
+from __future__ import annotations
+
+import operator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Dict, Iterable, List, Literal, Optional, Tuple
+
+from app.core.config import load_config
+from app.core.logger import get_logger
+from app.core.metrics_buffer import MetricsRingBuffer, SeriesRingBuffer, to_epoch_us
+
+
+Aggregation = Literal["avg", "min", "max", "last", "rate"]
+Comparison = Literal[">", ">=", "<", "<="]
+
+_OPERATORS: Dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+DEFAULT_ALERT_RULES: List[Dict[str, Any]] = [
+    {
+        "name": "cpu_high",
+        "metric": "cpu.total",
+        "aggregation": "avg",
+        "window_seconds": 60,
+        "operator": ">",
+        "threshold": 80,
+        "clear_threshold": 70,
+        "message": "CPU usage critical: {value:.2f}%",
+    },
+    {
+        "name": "memory_low",
+        "metric": "memory.available_percent",
+        "aggregation": "avg",
+        "window_seconds": 60,
+        "operator": "<",
+        "threshold": 30,
+        "clear_threshold": 35,
+        "message": "Low available memory: {value:.2f}%",
+    },
+    {
+        "name": "load_high",
+        "metric": "load.1m",
+        "aggregation": "avg",
+        "window_seconds": 60,
+        "operator": ">",
+        "threshold": 0.8,
+        "clear_threshold": 0.7,
+        "per_core": True,
+        "message": "Load average too high: {value:.2f} (threshold: {threshold:.2f})",
+    },
+]
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    name: str
+    metric: str
+    threshold: float
+    aggregation: Aggregation = "avg"
+    window_seconds: int = 60
+    operator: Comparison = ">"
+    clear_threshold: Optional[float] = None
+    level: str = "critical"
+    host: Optional[str] = None
+    per_core: bool = False
+    message: str = "{rule}: {metric} {aggregation} over {window_seconds}s is {value:.2f}"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AlertRule":
+        rule = cls(
+            name=str(data["name"]),
+            metric=str(data["metric"]),
+            threshold=float(data["threshold"]),
+            aggregation=data.get("aggregation", "avg"),
+            window_seconds=int(data.get("window_seconds", 60)),
+            operator=data.get("operator", ">"),
+            clear_threshold=(
+                float(data["clear_threshold"])
+                if data.get("clear_threshold") is not None
+                else None
+            ),
+            level=str(data.get("level", "critical")),
+            host=data.get("host"),
+            per_core=bool(data.get("per_core", False)),
+            message=str(data.get("message", cls.message)),
+        )
+
+        if rule.aggregation not in ("avg", "min", "max", "last", "rate"):
+            raise ValueError(f"rule {rule.name}: unknown aggregation {rule.aggregation!r}")
+        if rule.operator not in _OPERATORS:
+            raise ValueError(f"rule {rule.name}: unknown operator {rule.operator!r}")
+        if rule.window_seconds <= 0:
+            raise ValueError(f"rule {rule.name}: window_seconds must be positive")
+        try:
+            rule.format_message(metric=rule.metric, host="host", value=0.0, threshold=0.0)
+        except (KeyError, IndexError, ValueError, TypeError, AttributeError) as exc:
+            raise ValueError(f"rule {rule.name}: invalid message template: {exc}") from exc
+
+        return rule
+
+    def format_message(
+        self,
+        *,
+        metric: str,
+        host: str,
+        value: float,
+        threshold: float,
+        template: Optional[str] = None,
+    ) -> str:
+        return (template or self.message).format(
+            rule=self.name,
+            metric=metric,
+            host=host,
+            aggregation=self.aggregation,
+            window_seconds=self.window_seconds,
+            value=value,
+            threshold=threshold,
+        )
+
+    @property
+    def is_upper_bound(self) -> bool:
+        return self.operator in (">", ">=")
+
+
+@dataclass(frozen=True)
+class RuleEvaluation:
+    rule: AlertRule
+    host: str
+    metric: str
+    value: float
+    threshold: float
+    breaching: bool
+    clearing: bool
+    message: str
+
+
+def load_alert_rules(config: Dict[str, Any]) -> List[AlertRule]:
+    raw_rules = (config.get("alerts") or {}).get("rules")
+    if raw_rules is None:
+        raw_rules = DEFAULT_ALERT_RULES
+
+    rules: List[AlertRule] = []
+    for raw in raw_rules:
+        try:
+            rules.append(AlertRule.from_dict(raw))
+        except (KeyError, TypeError, ValueError):
+            logger.exception("Ignoring invalid alert rule %r", raw)
+
+    return rules
+
+
+def aggregate(
+    series: SeriesRingBuffer,
+    *,
+    aggregation: Aggregation,
+    ts_from_us: int,
+) -> Optional[float]:
+    """Aggregate the points of a series at or after ts_from_us."""
+    timestamps, values = series.window(ts_from_us)
+    if not values:
+        return None
+
+    if aggregation == "avg":
+        return sum(values) / len(values)
+    if aggregation == "min":
+        return min(values)
+    if aggregation == "max":
+        return max(values)
+    if aggregation == "last":
+        return values[-1]
+
+    if len(values) < 2:
+        return None
+
+    delta = values[-1] - values[0]
+    elapsed = (timestamps[-1] - timestamps[0]) / 1_000_000
+    if delta < 0 or elapsed <= 0:
+        # Counter reset inside the window.
+        return None
+
+    return delta / elapsed
+
+
+class AlertRuleEvaluator:
+    def __init__(self, rules: Iterable[AlertRule]) -> None:
+        self.rules = list(rules)
+        self._targets: List[Tuple[AlertRule, List[Tuple[str, str]]]] = []
+        self._buffer_version = -1
+
+    def _resolve_targets(self, buffer: MetricsRingBuffer) -> None:
+        if buffer.version == self._buffer_version:
+            return
+
+        keys = [key for key, _ in buffer.items()]
+        self._targets = [
+            (
+                rule,
+                [
+                    (host, metric)
+                    for host, metric in keys
+                    if fnmatchcase(metric, rule.metric)
+                    and (rule.host is None or rule.host == host)
+                ],
+            )
+            for rule in self.rules
+        ]
+        self._buffer_version = buffer.version
+
+    def evaluate(
+        self,
+        buffer: MetricsRingBuffer,
+        *,
+        cpu_cores: int,
+        now: Optional[datetime] = None,
+    ) -> List[RuleEvaluation]:
+        self._resolve_targets(buffer)
+
+        now_us = to_epoch_us(now or datetime.now(timezone.utc))
+        aggregates: Dict[Tuple[str, str, str, int], Optional[float]] = {}
+        evaluations: List[RuleEvaluation] = []
+
+        for rule, keys in self._targets:
+            compare = _OPERATORS[rule.operator]
+            scale = cpu_cores if rule.per_core else 1
+            threshold = rule.threshold * scale
+            clear_threshold = (
+                rule.clear_threshold * scale
+                if rule.clear_threshold is not None
+                else threshold
+            )
+
+            for host, metric in keys:
+                cache_key = (host, metric, rule.aggregation, rule.window_seconds)
+                if cache_key in aggregates:
+                    value = aggregates[cache_key]
+                else:
+                    series = buffer.series(host=host, metric=metric)
+                    value = (
+                        aggregate(
+                            series,
+                            aggregation=rule.aggregation,
+                            ts_from_us=now_us - rule.window_seconds * 1_000_000,
+                        )
+                        if series is not None
+                        else None
+                    )
+                    aggregates[cache_key] = value
+
+                if value is None:
+                    continue
+
+                breaching = compare(value, threshold)
+                clearing = (
+                    value < clear_threshold
+                    if rule.is_upper_bound
+                    else value > clear_threshold
+                )
+
+                # The message is only used when an alert fires.
+                message = (
+                    self._message(
+                        rule,
+                        metric=metric,
+                        host=host,
+                        value=value,
+                        threshold=threshold,
+                    )
+                    if breaching
+                    else ""
+                )
+
+                evaluations.append(
+                    RuleEvaluation(
+                        rule=rule,
+                        host=host,
+                        metric=metric,
+                        value=value,
+                        threshold=threshold,
+                        breaching=breaching,
+                        clearing=clearing,
+                        message=message,
+                    )
+                )
+
+        return evaluations
+
+    @staticmethod
+    def _message(
+        rule: AlertRule,
+        *,
+        metric: str,
+        host: str,
+        value: float,
+        threshold: float,
+    ) -> str:
+        try:
+            return rule.format_message(
+                metric=metric,
+                host=host,
+                value=value,
+                threshold=threshold,
+            )
+        except Exception:
+            logger.warning("rule %s: bad message template, using the default", rule.name)
+            return rule.format_message(
+                metric=metric,
+                host=host,
+                value=value,
+                threshold=threshold,
+                template=AlertRule.message,
+            )
+
+
+_evaluator: Optional[AlertRuleEvaluator] = None
+
+
+def get_alert_rule_evaluator() -> AlertRuleEvaluator:
+    """Return the process-wide evaluator built from the IRA config."""
+    global _evaluator
+
+    if _evaluator is None:
+        _evaluator = AlertRuleEvaluator(load_alert_rules(load_config()))
+        logger.info("Loaded %d alert rules", len(_evaluator.rules))
+
+    return _evaluator
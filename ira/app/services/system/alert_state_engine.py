@@ -0,0 +1,301 @@
+"""
+Long-lived alert state machine.
+
+Each (host, metric, rule) condition moves through ``ok -> pending -> firing ->
+resolved``. A condition must breach for ``pending_ticks`` consecutive
+evaluations before it fires, and must stay past its clear threshold for
+``clear_ticks`` evaluations before it resolves. While firing, the existing
+``system_alerts`` row is refreshed at most every ``touch_interval_seconds``
+instead of a new row being inserted on every tick.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Literal, Optional, Tuple
+from uuid import UUID
+
+from app.core.logger import get_logger
+from app.core.websocket_manager import ws_manager
+from app.repositories.system_alerts import SystemAlertRepository
+
+
+AlertPhase = Literal["ok", "pending", "firing", "resolved"]
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class AlertState:
+    host: str
+    metric: str
+    rule: Optional[str] = None
+    phase: AlertPhase = "ok"
+    breaches: int = 0
+    clears: int = 0
+    alert_id: Optional[UUID] = None
+    last_touched: float = 0.0
+
+
+class AlertStateEngine:
+    def __init__(
+        self,
+        *,
+        pending_ticks: int = 2,
+        clear_ticks: int = 3,
+        touch_interval_seconds: float = 60.0,
+    ) -> None:
+        self.pending_ticks = pending_ticks
+        self.clear_ticks = clear_ticks
+        self.touch_interval_seconds = touch_interval_seconds
+        self._states: Dict[Tuple[str, str, Optional[str]], AlertState] = {}
+        self._restored = False
+
+    def state(
+        self,
+        *,
+        host: str,
+        metric: str,
+        rule: Optional[str] = None,
+    ) -> Optional[AlertState]:
+        return self._states.get((host, metric, rule))
+
+    async def restore(self, repository: SystemAlertRepository) -> None:
+        """
+        Re-attach alerts left active by a previous process.
+
+        Runs once, so a restart during an incident keeps updating the same
+        row instead of opening a duplicate.
+        """
+        if self._restored:
+            return
+
+        for alert in await repository.list_active():
+            if alert.rule is None:
+                # Written before alert rules existed; nothing will ever
+                # evaluate it again, so close it.
+                await repository.resolve_alert(
+                    alert_id=alert.id,
+                    value=alert.value,
+                    resolved_at=datetime.now(timezone.utc),
+                )
+                continue
+
+            self._states[(alert.host, alert.metric, alert.rule)] = AlertState(
+                host=alert.host,
+                metric=alert.metric,
+                rule=alert.rule,
+                phase="firing",
+                alert_id=alert.id,
+                last_touched=time.monotonic(),
+            )
+
+        self._restored = True
+
+    async def observe(
+        self,
+        repository: SystemAlertRepository,
+        *,
+        host: str,
+        metric: str,
+        level: str,
+        value: float,
+        threshold: float,
+        breaching: bool,
+        clearing: bool,
+        message: str,
+        rule: Optional[str] = None,
+    ) -> AlertPhase:
+        """
+        Feed one evaluation of a condition and apply the resulting transition.
+
+        ``breaching`` means the value is past the firing threshold and
+        ``clearing`` that it is back past the (hysteresis) clear threshold.
+        A value between both thresholds keeps the current phase.
+        """
+        key = (host, metric, rule)
+        state = self._states.get(key)
+        if state is None:
+            state = AlertState(host=host, metric=metric, rule=rule)
+            self._states[key] = state
+
+        if state.phase == "firing":
+            await self._observe_firing(
+                repository,
+                state,
+                value=value,
+                clearing=clearing,
+            )
+            return state.phase
+
+        if not breaching:
+            state.breaches = 0
+            if state.phase == "pending":
+                state.phase = "ok"
+            return state.phase
+
+        state.breaches += 1
+        if state.breaches < self.pending_ticks:
+            state.phase = "pending"
+            return state.phase
+
+        await self._fire(
+            repository,
+            state,
+            level=level,
+            value=value,
+            threshold=threshold,
+            message=message,
+        )
+        return state.phase
+
+    async def _fire(
+        self,
+        repository: SystemAlertRepository,
+        state: AlertState,
+        *,
+        level: str,
+        value: float,
+        threshold: float,
+        message: str,
+    ) -> None:
+        try:
+            alert = await repository.open_alert(
+                host=state.host,
+                metric=state.metric,
+                rule=state.rule,
+                level=level,
+                value=value,
+                threshold=threshold,
+                message=message,
+            )
+        except Exception:
+            logger.exception(
+                "Failed to persist alert %s for %s",
+                state.metric,
+                state.host,
+            )
+            await repository.rollback()
+            state.phase = "pending"
+            return
+
+        state.phase = "firing"
+        state.clears = 0
+        state.alert_id = alert.id
+        state.last_touched = time.monotonic()
+
+        await ws_manager.broadcast(
+            "alerts",
+            {
+                "id": str(alert.id),
+                "level": level,
+                "status": "firing",
+                "type": state.metric,
+                "rule": state.rule,
+                "host": state.host,
+                "message": message,
+                "value": value,
+                "threshold": threshold,
+                "timestamp": alert.first_seen_at.isoformat(),
+            },
+        )
+
+        logger.info("Alert %s firing for %s: %s", state.metric, state.host, message)
+
+    async def _observe_firing(
+        self,
+        repository: SystemAlertRepository,
+        state: AlertState,
+        *,
+        value: float,
+        clearing: bool,
+    ) -> None:
+        if not clearing:
+            state.clears = 0
+            await self._touch(repository, state, value=value)
+            return
+
+        state.clears += 1
+        if state.clears < self.clear_ticks:
+            await self._touch(repository, state, value=value)
+            return
+
+        await self._resolve(repository, state, value=value)
+
+    async def _touch(
+        self,
+        repository: SystemAlertRepository,
+        state: AlertState,
+        *,
+        value: float,
+    ) -> None:
+        now = time.monotonic()
+        if state.alert_id is None or now - state.last_touched < self.touch_interval_seconds:
+            return
+
+        try:
+            await repository.touch_alert(
+                alert_id=state.alert_id,
+                value=value,
+                last_seen_at=datetime.now(timezone.utc),
+            )
+            state.last_touched = now
+        except Exception:
+            logger.exception(
+                "Failed to refresh alert %s for %s",
+                state.metric,
+                state.host,
+            )
+            await repository.rollback()
+
+    async def _resolve(
+        self,
+        repository: SystemAlertRepository,
+        state: AlertState,
+        *,
+        value: float,
+    ) -> None:
+        resolved_at = datetime.now(timezone.utc)
+
+        if state.alert_id is not None:
+            try:
+                await repository.resolve_alert(
+                    alert_id=state.alert_id,
+                    value=value,
+                    resolved_at=resolved_at,
+                )
+            except Exception:
+                logger.exception(
+                    "Failed to resolve alert %s for %s",
+                    state.metric,
+                    state.host,
+                )
+                await repository.rollback()
+                return
+
+        await ws_manager.broadcast(
+            "alerts",
+            {
+                "id": str(state.alert_id) if state.alert_id else None,
+                "level": "info",
+                "status": "resolved",
+                "type": state.metric,
+                "rule": state.rule,
+                "host": state.host,
+                "message": f"{state.metric} back to normal: {value:.2f}",
+                "value": value,
+                "timestamp": resolved_at.isoformat(),
+            },
+        )
+
+        logger.info("Alert %s resolved for %s", state.metric, state.host)
+
+        state.phase = "resolved"
+        state.breaches = 0
+        state.clears = 0
+        state.alert_id = None
+
+
+alert_state_engine = AlertStateEngine()
@@ -1,12 +1,13 @@
 from typing import List, Optional
 from app.models.dto.system_packages import (
     SystemPackages,
+    SystemPackagesMatch,
     SystemPackagesSortBy,
     SystemPackagesSortDir,
 )
 from app.models.dto.system_packages_history import SystemPackageHistoryEntry
-from app.modules.system.packages.apt_history import read_apt_history
-from app.modules.system.packages.apt_packages import installed_packages
+from app.modules.system.packages.apt_history import apt_history_store
+from app.modules.system.packages.apt_packages import installed_packages_cache
 from app.modules.system.packages.types import AptAction, AptHistoryEntry
 from app.extensions.ai_chat.tools.registry import tool_class
 
@@ -20,27 +21,29 @@ class SystemPackagesService:
         page: int,
         page_size: int,
         q: Optional[str] = None,
+        match: SystemPackagesMatch = "contains",
         sort_by: SystemPackagesSortBy = "name",
         sort_dir: SystemPackagesSortDir = "asc",
     ) -> SystemPackages:
-        packages = installed_packages()
+        index = installed_packages_cache.get()
 
-        if q:
-            needle = q.strip().lower()
-            packages = [p for p in packages if needle in p["name"].lower()]
+        if sort_by not in {"name", "version", "arch"}:
+            sort_by = "name"
 
-        reverse = sort_dir == "desc"
+        order = index.order(sort_by)
+        if sort_dir == "desc":
+            order = order[::-1]
 
-        if sort_by in {"name", "version", "arch"}:
-            packages = sorted(
-                packages,
-                key=lambda p: p[sort_by],
-                reverse=reverse,
+        if q:
+            needle = q.strip()
+            matches = set(
+                index.starting_with(needle)
+                if match == "prefix"
+                else index.containing(needle)
             )
+            packages = [index.packages[i] for i in order if i in matches]
+            total = len(packages)
 
-        total = len(packages)
-
-        if q:
             return {
                 "page": 1,
                 "page_size": total,
@@ -48,6 +51,7 @@ class SystemPackagesService:
                 "items": packages,
             }
 
+        total = len(order)
         start = (page - 1) * page_size
         end = start + page_size
 
@@ -55,7 +59,7 @@ class SystemPackagesService:
             "page": page,
             "page_size": page_size,
             "total": total,
-            "items": packages[start:end],
+            "items": [index.packages[i] for i in order[start:end]],
         }
 
     @staticmethod
@@ -69,29 +73,17 @@ class SystemPackagesService:
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
     ) -> dict:
-        entries: List[AptHistoryEntry] = read_apt_history(limit=2000)
-
-        if action:
-            entries = [e for e in entries if e["action"] == action]
-
-        if package:
-            needle = package.lower()
-            entries = [
-                e for e in entries if any(needle in p.lower() for p in e["packages"])
-            ]
-
-        if date_from:
-            entries = [e for e in entries if e["date"] >= date_from]
-
-        if date_to:
-            entries = [e for e in entries if e["date"] <= date_to]
-
-        entries = sorted(
-            entries,
-            key=lambda e: e["date"],
-            reverse=(sort_dir == "desc"),
+        entries: List[AptHistoryEntry] = apt_history_store.query(
+            action=action,
+            package=package,
+            date_from=date_from,
+            date_to=date_to,
         )
 
+        # Already oldest first.
+        if sort_dir == "desc":
+            entries = entries[::-1]
+
         total = len(entries)
         start = (page - 1) * page_size
         end = start + page_size
@@ -115,20 +107,12 @@ class SystemPackagesService:
 
     @staticmethod
     def get_installed_at(package: str) -> Optional[str]:
-        entries = read_apt_history(limit=5000)
-
-        for entry in reversed(entries):
-            if package in entry["packages"] and entry["action"] == "install":
-                return entry["date"]
-
-        return None
+        return apt_history_store.installed_at(package)
 
     @staticmethod
     def get_active_packages_history() -> List[SystemPackageHistoryEntry]:
-        installed = {p["name"] for p in installed_packages()}
-        entries = read_apt_history(limit=5000)
-
-        active = [e for e in entries if any(p in installed for p in e["packages"])]
+        installed = {p["name"] for p in installed_packages_cache.get().packages}
+        active = apt_history_store.with_packages(installed)
 
         return [
             {
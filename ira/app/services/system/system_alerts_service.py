@@ -1,168 +1,167 @@
+import base64
 import time
-from datetime import datetime, timezone
-from typing import Any, Dict
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
 
 from app.core.logger import get_logger
-from app.core.websocket_manager import ws_manager
+from app.core.metrics_buffer import metrics_buffer
+from app.models.entities.system_alert import SystemAlert
 from app.repositories.system_alerts import SystemAlertRepository
+from app.services.system.alert_rules import get_alert_rule_evaluator
+from app.services.system.alert_state_engine import alert_state_engine
 from app.extensions.ai_chat.tools.registry import tool_class
 
 
 logger = get_logger(__name__)
 
+ALERT_COUNT_TTL_SECONDS = 30.0
+ALERT_COUNT_CACHE_SIZE = 256
 
-@tool_class(name_prefix="system_alerts")
-class SystemAlertsService:
-    CPU_CRITICAL = 80
-    MEMORY_AVAILABLE_CRITICAL = 30
-    LOAD_FACTOR_CRITICAL = 80
+# Filters -> (counted_at, total), oldest first.
+_count_cache: "OrderedDict[Tuple[Optional[str], ...], Tuple[float, int]]" = OrderedDict()
 
-    _COOLDOWN_SECONDS = 30
 
-    def __init__(self, session) -> None:
-        self.alerts_repository = SystemAlertRepository(session)
-        self._last_alert_ts: Dict[str, float] = {}
+def encode_alert_cursor(alert: SystemAlert) -> str:
+    raw = f"{alert.last_seen_at.isoformat()}|{alert.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
-    async def notify_critical_alert(
-        self,
-        *,
-        alert: str,
-        host: str,
-        alert_type: str,
-        value: float,
-        threshold: float,
-    ) -> None:
-        now = time.time()
-        key = f"{host}:{alert_type}"
-
-        last_ts = self._last_alert_ts.get(key, 0)
-        if now - last_ts < self._COOLDOWN_SECONDS:
-            logger.debug(
-                "Critical alert for %s deferred because of cooldown (%s seconds remaining)",
-                key,
-                self._COOLDOWN_SECONDS - (now - last_ts),
-            )
-            return
-
-        self._last_alert_ts[key] = now
-
-        payload = {
-            "level": "critical",
-            "type": alert_type,
-            "host": host,
-            "message": alert,
-            "value": value,
-            "threshold": threshold,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
 
-        await self._save_critical_alert(
-            alert=alert,
-            host=host,
-            alert_type=alert_type,
-            value=value,
-            threshold=threshold,
+def decode_alert_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor produced by encode_alert_cursor, raising ValueError."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_seen_at, alert_id = (
+            base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
         )
+        return datetime.fromisoformat(last_seen_at), UUID(alert_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid alerts cursor") from exc
 
-        await ws_manager.broadcast("alerts", payload)
 
-        logger.info(
-            "Broadcasted critical alert %s for %s: %s",
-            alert_type,
-            host,
-            alert,
-        )
-
-    async def _save_critical_alert(
-        self,
-        *,
-        alert: str,
-        host: str,
-        alert_type: str,
-        value: float,
-        threshold: float,
-    ) -> None:
-        try:
-            await self.alerts_repository.insert_critical(
-                host=host,
-                metric=alert_type,
-                level="critical",
-                value=value,
-                threshold=threshold,
-                message=alert,
-            )
-        except Exception:
-            logger.exception(
-                "Failed to persist alert %s for %s",
-                alert_type,
-                host,
-            )
+@tool_class(name_prefix="system_alerts")
+class SystemAlertsService:
+    def __init__(self, session) -> None:
+        self.alerts_repository = SystemAlertRepository(session)
+        self._engine = alert_state_engine
 
     async def evaluate_alerts(
         self,
         *,
-        cpu_total: float,
-        memory_available_percent: float,
-        load_1m: float,
         cpu_cores: int,
-        host: str,
     ) -> None:
-        logger.debug(
-            "Evaluating metrics for %s: cpu_total=%.2f memory_available=%.2f load_1m=%.2f cores=%d",
-            host,
-            cpu_total,
-            memory_available_percent,
-            load_1m,
-            cpu_cores,
+        """Evaluate the configured alert rules over the recent metrics window."""
+        evaluations = get_alert_rule_evaluator().evaluate(
+            metrics_buffer,
+            cpu_cores=cpu_cores,
         )
 
-        if cpu_total > self.CPU_CRITICAL:
-            await self.notify_critical_alert(
-                alert=f"CPU usage critical: {cpu_total:.2f}%",
-                host=host,
-                alert_type="cpu.total",
-                value=cpu_total,
-                threshold=self.CPU_CRITICAL,
+        logger.debug("Evaluated %d alert rule targets", len(evaluations))
+
+        await self._engine.restore(self.alerts_repository)
+
+        for evaluation in evaluations:
+            await self._engine.observe(
+                self.alerts_repository,
+                host=evaluation.host,
+                metric=evaluation.metric,
+                rule=evaluation.rule.name,
+                level=evaluation.rule.level,
+                value=evaluation.value,
+                threshold=evaluation.threshold,
+                breaching=evaluation.breaching,
+                clearing=evaluation.clearing,
+                message=evaluation.message,
             )
 
-        if memory_available_percent < self.MEMORY_AVAILABLE_CRITICAL:
-            await self.notify_critical_alert(
-                alert=f"Low available memory: {memory_available_percent:.2f}%",
-                host=host,
-                alert_type="memory.available.percent",
-                value=memory_available_percent,
-                threshold=self.MEMORY_AVAILABLE_CRITICAL,
-            )
+    async def _count_alerts(
+        self,
+        *,
+        host: Optional[str],
+        metric: Optional[str],
+        status: Optional[str],
+        level: Optional[str],
+    ) -> Tuple[int, bool]:
+        """
+        Return (total, estimated) for the listing.
+
+        Unfiltered listings use the planner estimate; filtered counts are
+        exact but cached for ALERT_COUNT_TTL_SECONDS.
+        """
+        filters = (host, metric, status, level)
+
+        if filters == (None, None, None, None):
+            estimate = await self.alerts_repository.estimate_system_alerts()
+            if estimate is not None:
+                return estimate, True
+
+        cached = _count_cache.get(filters)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < ALERT_COUNT_TTL_SECONDS:
+            return cached[1], True
+
+        total = await self.alerts_repository.count_system_alerts(
+            host=host,
+            metric=metric,
+            status=status,
+            level=level,
+        )
+        _count_cache[filters] = (now, total)
+        _count_cache.move_to_end(filters)
 
-        load_threshold = cpu_cores * self.LOAD_FACTOR_CRITICAL
-        if load_1m > load_threshold:
-            await self.notify_critical_alert(
-                alert=f"Load average too high: {load_1m:.2f} (cores: {cpu_cores})",
-                host=host,
-                alert_type="load.1m",
-                value=load_1m,
-                threshold=load_threshold,
-            )
+        # Entries are in insertion order, so expired ones are at the front.
+        while _count_cache:
+            counted_at, _ = next(iter(_count_cache.values()))
+            fresh = now - counted_at < ALERT_COUNT_TTL_SECONDS
+            if fresh and len(_count_cache) <= ALERT_COUNT_CACHE_SIZE:
+                break
+            _count_cache.popitem(last=False)
+
+        return total, False
 
     async def get_system_alerts_paginated(
         self,
         *,
-        page: int,
         page_size: int,
+        cursor: Optional[str] = None,
+        host: Optional[str] = None,
+        metric: Optional[str] = None,
+        status: Optional[str] = None,
+        level: Optional[str] = None,
     ) -> Dict[str, Any]:
-        offset = (page - 1) * page_size
+        before = decode_alert_cursor(cursor) if cursor else None
 
-        alerts, total = await self.alerts_repository.get_system_alerts(
-            limit=page_size,
-            offset=offset,
+        # One extra row tells whether another page exists.
+        alerts = list(
+            await self.alerts_repository.list_system_alerts(
+                limit=page_size + 1,
+                before=before,
+                host=host,
+                metric=metric,
+                status=status,
+                level=level,
+            )
+        )
+
+        next_cursor = None
+        if len(alerts) > page_size:
+            alerts = alerts[:page_size]
+            next_cursor = encode_alert_cursor(alerts[-1])
+
+        total, estimated = await self._count_alerts(
+            host=host,
+            metric=metric,
+            status=status,
+            level=level,
         )
 
         return {
             "items": alerts,
             "pagination": {
-                "page": page,
                 "page_size": page_size,
+                "next_cursor": next_cursor,
                 "total": total,
-                "total_pages": (total + page_size - 1) // page_size,
+                "total_estimated": estimated,
             },
         }
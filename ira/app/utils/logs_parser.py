@@ -1,4 +1,4 @@
-from typing import Optional, Tuple, Set
+from typing import Iterable, List, Optional, Tuple, Set, Union
 from datetime import datetime
 import json
 import re
@@ -13,79 +13,178 @@ LEVEL_BY_NUMBER = {
     60: "fatal",
 }
 
-TEXT_LEVEL_REGEX: list[tuple[re.Pattern, str]] = [
-    (re.compile(r"\bTRACE\b", re.I), "trace"),
-    (re.compile(r"\bDEBUG\b", re.I), "debug"),
-    (re.compile(r"\bINFO\b", re.I), "info"),
-    (re.compile(r"\bWARN(ING)?\b", re.I), "warn"),
-    (re.compile(r"\bERROR\b", re.I), "error"),
-    (re.compile(r"\bFATAL\b", re.I), "fatal"),
-]
+LEVEL_BY_NAME = {
+    "TRACE": "trace",
+    "DEBUG": "debug",
+    "INFO": "info",
+    "WARN": "warn",
+    "WARNING": "warn",
+    "ERROR": "error",
+    "FATAL": "fatal",
+}
+
+# One pass finds the first level keyword of the line.
+LEVEL_REGEX = re.compile(r"\b(TRACE|DEBUG|INFO|WARN(?:ING)?|ERROR|FATAL)\b", re.I)
 
 ANSI_REGEX = re.compile(r"\x1b\[[0-9;]*m")
 
+ParsedLine = Tuple[str, Optional[str], Optional[datetime], Optional[str]]
+
+_decode_json = json.JSONDecoder().decode
+
 
 def normalize_line(line: str) -> str:
-    return ANSI_REGEX.sub("", line).strip()
+    if "\x1b" in line:
+        line = ANSI_REGEX.sub("", line)
+    return line.strip()
+
+
+def _parse_json_line(normalized: str) -> Optional[ParsedLine]:
+    try:
+        payload = _decode_json(normalized)
+    except ValueError:
+        return None
+
+    if not isinstance(payload, dict):
+        return None
+
+    level = None
+    raw_level = payload.get("level")
+    if isinstance(raw_level, int):
+        level = LEVEL_BY_NUMBER.get(raw_level)
+    elif isinstance(raw_level, str):
+        level = raw_level.lower()
+    else:
+        level_name = payload.get("level_name")
+        if isinstance(level_name, str):
+            level = level_name.lower()
+
+    ts_value = payload.get("time") or payload.get("timestamp") or payload.get("ts")
+    timestamp = None
+    if isinstance(ts_value, (int, float)):
+        timestamp = datetime.fromtimestamp(ts_value / 1000)
+    elif isinstance(ts_value, str):
+        try:
+            timestamp = datetime.fromisoformat(ts_value)
+        except ValueError:
+            pass
+
+    message = payload.get("msg") or payload.get("message") or normalized
+    context = payload.get("name") or payload.get("context")
+
+    return str(message), level, timestamp, context
 
 
-def parse_log_line(
-    line: str,
-) -> Tuple[str, Optional[str], Optional[datetime], Optional[str]]:
+def parse_log_line(line: str) -> ParsedLine:
     normalized = normalize_line(line)
 
     if not normalized:
         return "", None, None, None
 
-    if normalized.startswith("{") and normalized.endswith("}"):
-        try:
-            payload = json.loads(normalized)
-
-            level = None
-            if isinstance(payload.get("level"), int):
-                level = LEVEL_BY_NUMBER.get(payload["level"])
-            elif isinstance(payload.get("level"), str):
-                level = payload["level"].lower()
-            elif isinstance(payload.get("level_name"), str):
-                level = payload["level_name"].lower()
-
-            ts_value = payload.get("time") or payload.get("timestamp") or payload.get("ts")
-            timestamp = None
-            if isinstance(ts_value, (int, float)):
-                timestamp = datetime.fromtimestamp(ts_value / 1000)
-            elif isinstance(ts_value, str):
-                try:
-                    timestamp = datetime.fromisoformat(ts_value)
-                except ValueError:
-                    pass
-
-            message = payload.get("msg") or payload.get("message") or normalized
-            context = payload.get("name") or payload.get("context")
-
-            return str(message), level, timestamp, context
-        except Exception:
-            pass
+    if normalized[0] == "{" and normalized[-1] == "}":
+        parsed = _parse_json_line(normalized)
+        if parsed is not None:
+            return parsed
 
-    for regex, level in TEXT_LEVEL_REGEX:
-        if regex.search(normalized):
-            return normalized, level, None, None
+    match = LEVEL_REGEX.search(normalized)
+    if match is not None:
+        return normalized, LEVEL_BY_NAME[match.group(1).upper()], None, None
 
     return normalized, None, None, None
 
 
-def passes_filters(
-    *,
-    level: Optional[str],
-    message: str,
-    allowed_levels: Optional[Set[str]],
-    search_term: Optional[str],
-) -> bool:
-    if allowed_levels is not None:
-        if level not in allowed_levels:
+def parse_log_lines(lines: Iterable[str]) -> List[ParsedLine]:
+    """Parse a batch of lines, e.g. a history page or a tailer read."""
+    parse = parse_log_line
+    return [parse(line) for line in lines]
+
+
+class LogLineFilter:
+    """
+    Level and search filter compiled once per viewer.
+
+    ``accepts_raw`` rejects most non-matching lines from their raw text or
+    bytes, before they are parsed; ``accepts`` is the exact check on the
+    parsed level and message.
+    """
+
+    def __init__(
+        self,
+        *,
+        levels: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> None:
+        self.allowed_levels: Optional[Set[str]] = None
+        if levels:
+            self.allowed_levels = {
+                level.strip().lower() for level in levels.split(",") if level.strip()
+            }
+
+        self.search_term = search.lower() if search else None
+
+        # Plain text lines can only get a level from one of these keywords.
+        self._raw_levels: Optional[re.Pattern] = None
+        self._raw_levels_bytes: Optional[re.Pattern] = None
+        if self.allowed_levels is not None:
+            keywords = "|".join(
+                name
+                for name, level in LEVEL_BY_NAME.items()
+                if level in self.allowed_levels
+            ) or "(?!)"
+            self._raw_levels = re.compile(rf"\b(?:{keywords})\b", re.I)
+            self._raw_levels_bytes = re.compile(rf"\b(?:{keywords})\b".encode(), re.I)
+
+        self._search: Optional[re.Pattern] = None
+        self._raw_search: Optional[re.Pattern] = None
+        self._raw_search_bytes: Optional[re.Pattern] = None
+        if self.search_term:
+            self._search = re.compile(re.escape(self.search_term), re.I)
+            # JSON messages may escape non-ASCII characters, quotes and
+            # slashes, so only plain ASCII terms are looked up in the raw line.
+            if self.search_term.isascii() and not set(self.search_term) & set('"\\/'):
+                self._raw_search = self._search
+                self._raw_search_bytes = re.compile(
+                    re.escape(self.search_term.encode()),
+                    re.I,
+                )
+
+    @property
+    def is_empty(self) -> bool:
+        return self.allowed_levels is None and self.search_term is None
+
+    def accepts_raw(self, raw: Union[str, bytes]) -> bool:
+        if self.is_empty:
+            return True
+
+        if isinstance(raw, bytes):
+            escape, brace = b"\x1b", b"{"
+            search, levels = self._raw_search_bytes, self._raw_levels_bytes
+        else:
+            escape, brace = "\x1b", "{"
+            search, levels = self._raw_search, self._raw_levels
+
+        # ANSI codes can split words that are contiguous once stripped.
+        if escape in raw:
+            return True
+
+        if search is not None and search.search(raw) is None:
+            return False
+
+        if (
+            levels is not None
+            and not raw.lstrip().startswith(brace)
+            and levels.search(raw) is None
+        ):
+            return False
+
+        return True
+
+    def accepts(self, *, level: Optional[str], message: str) -> bool:
+        if self.allowed_levels is not None and level not in self.allowed_levels:
             return False
 
-    if search_term:
-        if search_term not in message.lower():
+        if self._search is not None and self._search.search(message) is None:
             return False
 
-    return True
+        return True
+
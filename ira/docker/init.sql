@@ -23,6 +23,11 @@ CREATE INDEX IF NOT EXISTS idx_applications_last_seen ON applications (last_seen
 
 CREATE INDEX IF NOT EXISTS idx_applications_status ON applications (status);
 
+ALTER TABLE applications
+ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS idx_applications_deleted ON applications (deleted_at) WHERE deleted_at IS NOT NULL;
+
 -- ======================
 -- APPLICATION LOG PATHS
 -- ======================
@@ -58,6 +63,23 @@ CREATE INDEX IF NOT EXISTS idx_metrics_points_metric_ts ON metrics_points (metri
 
 CREATE INDEX IF NOT EXISTS idx_metrics_points_ts ON metrics_points (ts);
 
+CREATE TABLE
+    IF NOT EXISTS network_events (
+        id BIGSERIAL PRIMARY KEY,
+        host TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        started_at TIMESTAMPTZ NOT NULL,
+        last_seen_at TIMESTAMPTZ NOT NULL,
+        closed_at TIMESTAMPTZ,
+        samples INTEGER NOT NULL,
+        sum_value DOUBLE PRECISION NOT NULL,
+        max_value DOUBLE PRECISION NOT NULL
+    );
+
+CREATE INDEX IF NOT EXISTS idx_network_events_host_kind_last_seen ON network_events (host, kind, last_seen_at);
+
+CREATE INDEX IF NOT EXISTS idx_network_events_open ON network_events (kind) WHERE closed_at IS NULL;
+
 -- ======================
 -- SYSTEM ALERTS
 -- ======================
@@ -76,6 +98,20 @@ CREATE TABLE
         resolved_at TIMESTAMPTZ
     );
 
+ALTER TABLE system_alerts
+ADD COLUMN IF NOT EXISTS rule TEXT;
+
+-- Keyset pagination of /alerts on (last_seen_at, id), optionally filtered.
+CREATE INDEX IF NOT EXISTS idx_system_alerts_last_seen ON system_alerts (last_seen_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_system_alerts_host_last_seen ON system_alerts (host, last_seen_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_system_alerts_metric_last_seen ON system_alerts (metric, last_seen_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_system_alerts_status_last_seen ON system_alerts (status, last_seen_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_system_alerts_level_last_seen ON system_alerts (level, last_seen_at DESC, id DESC);
+
 CREATE TABLE
     extensions (
         id TEXT PRIMARY KEY,
@@ -0,0 +1,86 @@
+-- Benchmark: latest metrics row per application at 50M application_metrics rows.
+--
+-- Compares the former max(ts) GROUP BY join used by
+-- ApplicationMetricsService.list_runtime_snapshots with the LATERAL
+-- ORDER BY ts DESC LIMIT 1 plan that replaced it.
+--
+-- Everything is created in a throwaway "bench" schema, so it can be run
+-- against the IRA database without touching real data:
+--
+--   psql "$DATABASE_URL" -f docs/benchmarks/application_runtime_latest.sql
+--
+-- Loading 50M rows takes several minutes and roughly 6 GB of disk.
+\timing on
+
+DROP SCHEMA IF EXISTS bench CASCADE;
+CREATE SCHEMA bench;
+
+CREATE TABLE bench.applications (
+    id UUID PRIMARY KEY,
+    name TEXT NOT NULL,
+    enabled BOOLEAN NOT NULL DEFAULT true
+);
+
+CREATE TABLE bench.application_metrics (
+    id BIGSERIAL PRIMARY KEY,
+    application_id UUID NOT NULL REFERENCES bench.applications (id),
+    ts TIMESTAMPTZ NOT NULL,
+    cpu_percent DOUBLE PRECISION,
+    memory_mb DOUBLE PRECISION,
+    memory_percent DOUBLE PRECISION,
+    status TEXT NOT NULL
+);
+
+-- 500 applications x 100 000 samples (~5.8 days at a 5 s interval) = 50M rows.
+INSERT INTO bench.applications (id, name)
+SELECT gen_random_uuid (), 'app-' || n
+FROM generate_series(1, 500) AS n;
+
+INSERT INTO bench.application_metrics (
+    application_id, ts, cpu_percent, memory_mb, memory_percent, status
+)
+SELECT
+    a.id,
+    now () - make_interval(secs => s * 5),
+    random () * 100,
+    random () * 2048,
+    random () * 100,
+    'running'
+FROM bench.applications AS a
+CROSS JOIN generate_series(1, 100000) AS s;
+
+-- Same indexes as docker/init.sql.
+CREATE INDEX ON bench.application_metrics (application_id, ts);
+CREATE INDEX ON bench.application_metrics (ts);
+
+VACUUM ANALYZE bench.applications;
+VACUUM ANALYZE bench.application_metrics;
+
+-- Before: aggregates the full history on every call.
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT a.*, m.*
+FROM bench.applications AS a
+LEFT JOIN (
+    SELECT application_id, max(ts) AS max_ts
+    FROM bench.application_metrics
+    GROUP BY application_id
+) AS latest ON latest.application_id = a.id
+LEFT JOIN bench.application_metrics AS m
+    ON m.application_id = latest.application_id
+   AND m.ts = latest.max_ts
+WHERE a.enabled IS true;
+
+-- After: one backward index probe per application.
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT a.*, m.*
+FROM bench.applications AS a
+LEFT JOIN LATERAL (
+    SELECT *
+    FROM bench.application_metrics
+    WHERE application_id = a.id
+    ORDER BY ts DESC
+    LIMIT 1
+) AS m ON true
+WHERE a.enabled IS true;
+
+DROP SCHEMA bench CASCADE;
@@ -0,0 +1,110 @@
+"""
+Benchmark: app.utils.logs_parser over a corpus of log lines.
+
+Measures per-line parsing, batch parsing, and the level/search filter with
+and without the raw prefilter that runs before parsing.
+
+The corpus is read from the files given on the command line, e.g. the IRA
+logs themselves:
+
+    python docs/benchmarks/log_parser.py logs/ira.log*
+
+Without arguments, a built-in sample mixing the formats seen in practice
+(Python logging, uvicorn with ANSI colors, pino/bunyan JSON, nginx access
+logs, Java stack traces) is used.
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.utils.logs_parser import LogLineFilter, parse_log_line, parse_log_lines  # noqa: E402
+
+
+CORPUS_SIZE = 200_000
+ROUNDS = 5
+
+SAMPLE_LINES = [
+    "2025-12-19 10:15:02,114 [INFO] app.services.metrics_scheduler - Collected 42 metrics",
+    "2025-12-19 10:15:02,871 [WARNING] app.core.websocket_manager - slow client on metrics",
+    "2025-12-19 10:15:03,002 [ERROR] app.api.logs - Failed to open /var/log/app/app.log",
+    "\x1b[32mINFO\x1b[0m:     127.0.0.1:51234 - \"GET /applications HTTP/1.1\" 200 OK",
+    "\x1b[33mWARNING\x1b[0m:  StatReload detected changes in 'app/main.py'. Reloading...",
+    '{"level":30,"time":1734600000000,"pid":812,"hostname":"web-1","name":"api","msg":"request completed","responseTime":12}',
+    '{"level":50,"time":1734600000412,"pid":812,"hostname":"web-1","name":"api","msg":"upstream timeout","err":{"type":"Error"}}',
+    '{"level":"debug","timestamp":"2025-12-19T10:15:04.120Z","message":"cache hit","context":"CacheService"}',
+    '192.168.1.20 - - [19/Dec/2025:10:15:04 +0000] "GET /static/app.js HTTP/1.1" 200 48213 "-" "Mozilla/5.0"',
+    "Exception in thread \"main\" java.lang.IllegalStateException: connection closed",
+    "\tat com.example.db.Pool.acquire(Pool.java:212)",
+    "2025-12-19T10:15:05.331+01:00 DEBUG 1 --- [nio-8080-exec-3] o.s.web.servlet.DispatcherServlet : Completed 200 OK",
+]
+
+
+def load_corpus(paths: List[str]) -> List[str]:
+    lines: List[str] = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            lines.extend(line.rstrip("\n") for line in f)
+
+    if not lines:
+        lines = list(SAMPLE_LINES)
+
+    return (lines * (CORPUS_SIZE // len(lines) + 1))[:CORPUS_SIZE]
+
+
+def bench(name: str, corpus: List[str], run: Callable[[List[str]], object]) -> None:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        run(corpus)
+        best = min(best, time.perf_counter() - start)
+
+    print(
+        f"{name:<56} {best * 1000:9.1f} ms "
+        f"{len(corpus) / best / 1e6:6.2f} M lines/s"
+    )
+
+
+def filter_parsed(line_filter: LogLineFilter, corpus: List[str]) -> int:
+    matched = 0
+    for message, level, _, _ in parse_log_lines(corpus):
+        if line_filter.accepts(level=level, message=message):
+            matched += 1
+    return matched
+
+
+def filter_prefiltered(line_filter: LogLineFilter, corpus: List[str]) -> int:
+    candidates = [line for line in corpus if line_filter.accepts_raw(line)]
+    return filter_parsed(line_filter, candidates)
+
+
+def main() -> None:
+    corpus = load_corpus(sys.argv[1:])
+    raw_corpus = [line.encode("utf-8") for line in corpus]
+    print(f"{len(corpus)} lines, best of {ROUNDS} rounds\n")
+
+    bench("parse_log_line", corpus, lambda c: [parse_log_line(line) for line in c])
+    bench("parse_log_lines", corpus, parse_log_lines)
+
+    for levels, search in (("error", None), (None, "timeout"), ("warn,error", "client")):
+        line_filter = LogLineFilter(levels=levels, search=search)
+        label = f"levels={levels} search={search}"
+
+        bench(f"parse + filter ({label})", corpus, lambda c: filter_parsed(line_filter, c))
+        bench(
+            f"prefilter + parse ({label})",
+            corpus,
+            lambda c: filter_prefiltered(line_filter, c),
+        )
+        bench(
+            f"bytes prefilter only ({label})",
+            raw_corpus,
+            lambda c: [line for line in c if line_filter.accepts_raw(line)],
+        )
+
+
+if __name__ == "__main__":
+    main()